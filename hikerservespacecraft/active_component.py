@@ -18,7 +18,7 @@ class ActiveComponent(Component, Tickable):
         status_text = "activated" if is_active else "deactivated"
         return CommandResponse(success=True,
                                device_type=self.__class__.__name__,
-                               message=f"{self.name} {status_text}.")
+                               message="{} {}.", message_args=(self.name, status_text))
 
     @command
     def activate(self) -> CommandResponse:
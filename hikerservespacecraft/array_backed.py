@@ -0,0 +1,197 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class ArrayField:
+    """
+    Data descriptor for a component attribute that can be backed by a fleet engine array.
+
+    While the owning component is unbound the value lives in the instance ``__dict__`` under
+    the same name, so ``vars()``, ``get_component_data`` and serialization behave as before.
+    Once the component is added to a ``ComponentArrayEngine`` reads and writes go straight to
+    the engine's column at the component's slot.
+    """
+
+    def __init__(self, dtype=np.float64, optional: bool = False, shape: tuple = ()):
+        self.dtype = np.dtype(dtype)
+        self.optional = optional
+        self.shape = tuple(shape)
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def to_array_value(self, value):
+        if value is None:
+            return np.nan if self.optional else 0
+        return value
+
+    def from_array_value(self, value):
+        if self.shape:
+            # vector fields are returned as copies; assign the whole value to change it
+            return np.array(value)
+        if self.dtype == np.bool_:
+            return bool(value)
+        value = float(value)
+        if self.optional and value != value:
+            return None
+        return value
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        engine = obj.__dict__.get("_array_engine")
+        if engine is None:
+            try:
+                return obj.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+        return self.from_array_value(engine.columns[self.name][obj.__dict__["_array_slot"]])
+
+    def __set__(self, obj, value):
+        engine = obj.__dict__.get("_array_engine")
+        if engine is None:
+            obj.__dict__[self.name] = value
+        else:
+            engine.columns[self.name][obj.__dict__["_array_slot"]] = self.to_array_value(value)
+
+
+class ArrayBacked:
+    """Mixin for components whose ``ArrayField`` attributes can live in a fleet engine."""
+
+    def get_array_engine(self):
+        return self.__dict__.get("_array_engine")
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_array_engine", None)
+        state.pop("_array_slot", None)
+        engine = self.__dict__.get("_array_engine")
+        if engine is not None:
+            state.update(engine.read(self))
+        return state
+
+
+def is_array_bound(component: Any) -> bool:
+    """Return True if the component is stepped by a fleet engine rather than its own tick()."""
+    return getattr(component, "__dict__", {}).get("_array_engine") is not None
+
+
+class ComponentArrayEngine:
+    """
+    Struct-of-arrays store for a homogeneous family of ``ArrayBacked`` components.
+
+    Each bound component owns one slot; every field listed in ``fields`` is a contiguous
+    column. Removal swaps the last slot into the hole so live slots stay in ``[0, size)``
+    and vectorized steps never need a mask.
+    """
+
+    fields: Dict[str, ArrayField] = {}
+    component_class: type = None
+
+    def __init__(self, initial_capacity: int = 64):
+        capacity = max(1, int(initial_capacity))
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros((capacity,) + field.shape, dtype=field.dtype) for name, field in self.fields.items()
+        }
+        self.groups: np.ndarray = np.full(capacity, -1, dtype=np.int64)
+        self.components: List[ArrayBacked] = []
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def _grow(self, minimum: int) -> None:
+        capacity = self.capacity
+        while capacity < minimum:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        groups = np.full(capacity, -1, dtype=np.int64)
+        groups[:self.size] = self.groups[:self.size]
+        self.groups = groups
+
+    def accepts(self, component: Any) -> bool:
+        return self.component_class is not None and isinstance(component, self.component_class)
+
+    def add(self, component: ArrayBacked, group: int = -1) -> int:
+        """Bind a component to a new slot. `group` tags the slot, e.g. with its power bus index."""
+        if not self.accepts(component):
+            raise TypeError(f"{self.__class__.__name__} cannot hold {component.__class__.__name__}")
+        if is_array_bound(component):
+            raise ValueError(f"{component.name} is already bound to an engine")
+
+        if self.size == self.capacity:
+            self._grow(self.size + 1)
+
+        slot = self.size
+        for name, field in self.fields.items():
+            self.columns[name][slot] = field.to_array_value(component.__dict__.get(name))
+        self.groups[slot] = group
+
+        component.__dict__["_array_engine"] = self
+        component.__dict__["_array_slot"] = slot
+        self.components.append(component)
+        self.size += 1
+        return slot
+
+    def remove(self, component: ArrayBacked) -> None:
+        if component.__dict__.get("_array_engine") is not self:
+            raise ValueError(f"{component.name} is not bound to this engine")
+
+        slot = component.__dict__["_array_slot"]
+        component.__dict__.update(self.read(component))
+        del component.__dict__["_array_engine"]
+        del component.__dict__["_array_slot"]
+
+        last = self.size - 1
+        if slot != last:
+            moved = self.components[last]
+            for column in self.columns.values():
+                column[slot] = column[last]
+            self.groups[slot] = self.groups[last]
+            self.components[slot] = moved
+            moved.__dict__["_array_slot"] = slot
+        self.components.pop()
+        self.size -= 1
+
+    def add_spacecraft(self, spacecraft, group: int = -1) -> int:
+        """Bind every eligible component on the spacecraft's power bus. Returns the number bound."""
+        bound = 0
+        for component in spacecraft.power_bus.components.values():
+            if self.accepts(component) and not is_array_bound(component):
+                self.add(component, group=group)
+                bound += 1
+        return bound
+
+    def remove_spacecraft(self, spacecraft) -> int:
+        """Unbind every component of the spacecraft held by this engine. Returns the number unbound."""
+        unbound = 0
+        for component in spacecraft.power_bus.components.values():
+            if self.slot_of(component) is not None:
+                self.remove(component)
+                unbound += 1
+        return unbound
+
+    def read(self, component: ArrayBacked) -> Dict[str, Any]:
+        slot = component.__dict__["_array_slot"]
+        return {name: field.from_array_value(self.columns[name][slot]) for name, field in self.fields.items()}
+
+    def view(self, name: str) -> np.ndarray:
+        """Return the live portion of a column (a view, not a copy)."""
+        return self.columns[name][:self.size]
+
+    def group_view(self) -> np.ndarray:
+        return self.groups[:self.size]
+
+    def slot_of(self, component: ArrayBacked) -> Optional[int]:
+        if component.__dict__.get("_array_engine") is not self:
+            return None
+        return component.__dict__["_array_slot"]
@@ -1,18 +1,82 @@
+import copy
 import datetime
+import time
+
+# wall-clock time at monotonic zero, so monotonic stamps can be shown as dates
+_WALL_CLOCK_OFFSET = time.time() - time.monotonic()
+
+
+def _format_timestamp(monotonic_s: float) -> str:
+    return datetime.datetime.fromtimestamp(_WALL_CLOCK_OFFSET + monotonic_s).isoformat()
 
 
 class CommandResponse:
-    def __init__(self, success: bool = False, message: str = "", device_type: str = None, return_data: dict = None):
+    """
+    Result of a command.
+
+    Kept cheap to create: the timestamp is a monotonic clock reading formatted only when
+    `datestamp` is read, `return_data` and `log` are only allocated when used, and a message
+    given with `message_args` is only formatted (`message.format(*message_args)`) when read.
+    """
+    __slots__ = ("success", "device_type", "_message", "_message_args", "_created_s", "_return_data", "_log")
+
+    def __init__(self, success: bool = False, message: str = "", device_type: str = None, return_data: dict = None,
+                 message_args: tuple = None):
         self.success: bool = success
-        self.message: str = message
         self.device_type: str = device_type
-        self.datestamp = datetime.datetime.now().isoformat()
-        self.return_data: dict = return_data if return_data is not None else {}
-        self.log: list[str] = []
+        self._message = message
+        self._message_args = message_args
+        self._created_s = time.monotonic()
+        self._return_data = return_data
+        self._log = None
+
+    @property
+    def message(self) -> str:
+        if self._message_args is not None:
+            self._message = self._message.format(*self._message_args)
+            self._message_args = None
+        return self._message
+
+    @message.setter
+    def message(self, message: str):
+        self._message = message
+        self._message_args = None
+
+    @property
+    def datestamp(self) -> str:
+        return _format_timestamp(self._created_s)
+
+    @property
+    def return_data(self) -> dict:
+        if self._return_data is None:
+            self._return_data = {}
+        return self._return_data
+
+    @return_data.setter
+    def return_data(self, return_data: dict):
+        self._return_data = return_data
+
+    @property
+    def log(self) -> list[str]:
+        if self._log is None:
+            return []
+        return [f"[{_format_timestamp(stamp)}] {entry}" for stamp, entry in self._log]
 
     def add_log_entry(self, entry: str):
-        timestamp = datetime.datetime.now().isoformat()
-        self.log.append(f"[{timestamp}] {entry}")
+        if self._log is None:
+            self._log = []
+        self._log.append((time.monotonic(), entry))
+
+    def copy(self) -> "CommandResponse":
+        """An independent response with the same contents, e.g. to hand out a cached answer."""
+        duplicate = CommandResponse(success=self.success, device_type=self.device_type, message=self._message,
+                                    message_args=self._message_args)
+        duplicate._created_s = self._created_s
+        if self._return_data is not None:
+            duplicate._return_data = copy.deepcopy(self._return_data)
+        if self._log is not None:
+            duplicate._log = list(self._log)
+        return duplicate
 
     def to_dict(self) -> dict:
         return {
@@ -24,3 +88,4 @@ class CommandResponse:
     def __repr__(self):
         return (f"CommandResponse(success={self.success}, message='{self.message}', "
                 f"device_type='{self.device_type}', datestamp='{self.datestamp}', return_data={self.return_data})")
+
@@ -1,17 +1,198 @@
 import abc
 import inspect
+import math
+import numbers
+import re
+import typing
 from functools import wraps
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
+from hikerservespacecraft.command_response import CommandResponse
+
+
+def command(func=None, *, query: bool = False):
+    """
+    Mark a method as a command. `@command(query=True)` marks a pure query: it only reads
+    state, so the spacecraft computer may answer repeated calls from a cache until the
+    next tick or mutating command on the same device.
+    """
+    if func is None:
+        return lambda f: command(f, query=query)
 
-def command(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         func.command = True
         return func(*args, **kwargs)
     wrapper.command = True
+    wrapper.query = query
     return wrapper
 
+
+# returned by a coercer when a value cannot be converted to the annotated type
+_INVALID = object()
+
+_FLOAT_PATTERN = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+_INT_PATTERN = re.compile(r"[+-]?\d+")
+_BOOL_STRINGS = {"true": True, "false": False}
+
+
+def _coerce_float(value):
+    if type(value) is not float:
+        if isinstance(value, bool):
+            return _INVALID
+        if isinstance(value, numbers.Real):
+            value = float(value)
+        elif isinstance(value, str) and _FLOAT_PATTERN.fullmatch(value.strip()):
+            value = float(value)
+        else:
+            return _INVALID
+    return value if math.isfinite(value) else _INVALID
+
+
+def _coerce_int(value):
+    if type(value) is int:
+        return value
+    if isinstance(value, bool):
+        return _INVALID
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and _INT_PATTERN.fullmatch(value.strip()):
+        return int(value)
+    return _INVALID
+
+
+def _coerce_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return _BOOL_STRINGS.get(value.strip().lower(), _INVALID)
+    return _INVALID
+
+
+def _coerce_str(value):
+    return value if isinstance(value, str) else _INVALID
+
+
+def _passthrough(value):
+    return value
+
+
+_COERCERS: Dict[type, Callable] = {float: _coerce_float, int: _coerce_int, bool: _coerce_bool, str: _coerce_str}
+
+
+def _optional(coerce: Callable) -> Callable:
+    def coerce_optional(value):
+        return None if value is None else coerce(value)
+    return coerce_optional
+
+
+def _coercer_for(annotation) -> Callable:
+    """Coercer for a parameter annotation; unknown or missing annotations accept anything."""
+    if annotation in _COERCERS:
+        return _COERCERS[annotation]
+    if typing.get_origin(annotation) is typing.Union:
+        members = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(members) == 1 and len(typing.get_args(annotation)) == 2:
+            return _optional(_coercer_for(members[0]))
+    return _passthrough
+
+
+class CommandParameter:
+
+    def __init__(self, name: str, annotation, default):
+        self.name = name
+        self.annotation = annotation
+        self.default = default
+        self.required = default is inspect.Parameter.empty
+        self.coerce = _coercer_for(annotation)
+
+    def type_name(self) -> str:
+        return getattr(self.annotation, "__name__", str(self.annotation))
+
+
+class CommandSpec:
+    """Metadata of one @command method of a class, computed once per class."""
+
+    def __init__(self, name: str, function: Callable):
+        self.name = name
+        self.function = function
+        self.query: bool = getattr(function, "query", False)
+
+        signature = inspect.signature(function)
+        try:
+            hints = typing.get_type_hints(inspect.unwrap(function))
+        except Exception:
+            hints = {}
+        params = list(signature.parameters.values())[1:]  # drop self
+
+        # *args/**kwargs commands are dispatched unchecked
+        self.variadic = any(p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD) for p in params)
+        self.parameters: List[CommandParameter] = [
+            CommandParameter(p.name, hints.get(p.name, p.annotation), p.default)
+            for p in params if p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)]
+        self._by_name: Dict[str, CommandParameter] = {p.name: p for p in self.parameters}
+
+    def bind(self, args: Union[list, tuple, dict, None]) -> Tuple[Optional[list], Optional[str]]:
+        """
+        Check and coerce command arguments (a positional list or tuple, a keyword dict or None
+        for no arguments) against the method signature. Returns (positional values, None) on
+        success or (None, reason).
+        """
+        if args is None:
+            args = []
+        elif not isinstance(args, (list, tuple, dict)):
+            return None, f"arguments must be a list or a dict, got {type(args).__name__}"
+        if self.variadic:
+            return None, None
+
+        parameters = self.parameters
+        if isinstance(args, dict):
+            for key in args:
+                if key not in self._by_name:
+                    return None, f"unexpected argument '{key}'"
+            values = [args.get(p.name, p.default) for p in parameters]
+        else:
+            if len(args) > len(parameters):
+                return None, f"takes {len(parameters)} argument(s) but {len(args)} were given"
+            values = list(args) + [p.default for p in parameters[len(args):]]
+
+        for i, parameter in enumerate(parameters):
+            value = values[i]
+            if value is inspect.Parameter.empty:
+                return None, f"missing argument '{parameter.name}'"
+            if value is parameter.default:
+                continue
+            value = parameter.coerce(value)
+            if value is _INVALID:
+                return None, f"argument '{parameter.name}' must be {parameter.type_name()}, got {values[i]!r}"
+            values[i] = value
+        return values, None
+
+    def __repr__(self):
+        return f"CommandSpec(name={self.name})"
+
+
+_command_specs: Dict[type, Dict[str, CommandSpec]] = {}
+
+
+def get_command_specs(cls: type) -> Dict[str, CommandSpec]:
+    """Return the @command methods of cls by name. Introspection runs once per class."""
+    specs = _command_specs.get(cls)
+    if specs is None:
+        specs = {name: CommandSpec(name, function)
+                 for name, function in inspect.getmembers(cls, predicate=inspect.isfunction)
+                 if getattr(function, "command", False)}
+        _command_specs[cls] = specs
+    return specs
+
+
+def invalid_arguments_response(component, command_: str, error: str) -> CommandResponse:
+    return CommandResponse(success=False, return_data={}, device_type=component.__class__.__name__,
+                           message=f"Invalid arguments for {command_}: {error}")
+
+
 class Commandable(abc.ABC):
 
     def execute(self, **args):
@@ -21,8 +202,15 @@ class Commandable(abc.ABC):
         except AttributeError:
             return None
         args = args['args']
-        if len(args) > 0:
-            if isinstance(args, list):
+        spec = get_command_specs(self.__class__).get(cmd)
+        if spec is not None:
+            values, error = spec.bind(args)
+            if error is not None:
+                return invalid_arguments_response(self, cmd, error)
+            if values is not None:
+                return bar(*values)
+        if args:
+            if isinstance(args, (list, tuple)):
                 return bar(*args)
             else:
                 return bar(**args)
@@ -1,6 +1,9 @@
 
 
-class Component:
+from hikerservespacecraft.dirty_tracking import DirtyTracked
+
+
+class Component(DirtyTracked):
     category = ""
 
     def __init__(self, name: str, description: str, mass: float, volume: float):
@@ -0,0 +1,103 @@
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from hikerservespacecraft.component import Component
+
+CATEGORY = "category"
+POWER_TYPE = "power_type"
+CLASS = "class"
+
+
+class ComponentRegistry:
+    """
+    Components indexed by name, category, power_type and class hierarchy.
+
+    A component is filed under its category and every parent category ("power/storage" is
+    also found under "power"), its power_type if it has one, and every class in its MRO, so
+    `by_class(PowerComponent)` returns all power components. Indexes are updated
+    incrementally on add/remove; the `by_*` lookups return tuples cached per key until a
+    component under that key changes.
+    """
+
+    def __init__(self, components: Iterable[Component] = ()):
+        self.components: Dict[str, Component] = {}
+        # bumped on every membership change so dependants can invalidate caches
+        self.version: int = 0
+        self._indexes: Dict[str, Dict[object, Dict[str, Component]]] = {CATEGORY: {}, POWER_TYPE: {}, CLASS: {}}
+        self._views: Dict[Tuple[str, object], tuple] = {}
+        for component in components:
+            self.add(component)
+
+    @staticmethod
+    def _index_keys(component: Component) -> Iterator[Tuple[str, object]]:
+        parts = (component.category or "").split("/")
+        for depth in range(1, len(parts) + 1):
+            yield CATEGORY, "/".join(parts[:depth])
+
+        power_type = getattr(component, "power_type", None)
+        if power_type is not None:
+            yield POWER_TYPE, power_type
+
+        for cls in type(component).__mro__:
+            if cls is not object:
+                yield CLASS, cls
+
+    def add(self, component: Component) -> bool:
+        """Register the component. Returns False if a component with that name is already registered."""
+        if component.name in self.components:
+            return False
+        self.components[component.name] = component
+        for kind, key in self._index_keys(component):
+            self._indexes[kind].setdefault(key, {})[component.name] = component
+            self._views.pop((kind, key), None)
+        self.version += 1
+        return True
+
+    def remove(self, name: str) -> Optional[Component]:
+        component = self.components.pop(name, None)
+        if component is None:
+            return None
+        for kind, key in self._index_keys(component):
+            members = self._indexes[kind][key]
+            del members[name]
+            if not members:
+                del self._indexes[kind][key]
+            self._views.pop((kind, key), None)
+        self.version += 1
+        return component
+
+    def get(self, name: str) -> Optional[Component]:
+        return self.components.get(name)
+
+    def _view(self, kind: str, key) -> tuple:
+        view = self._views.get((kind, key))
+        if view is None:
+            view = tuple(self._indexes[kind].get(key, {}).values())
+            self._views[(kind, key)] = view
+        return view
+
+    def by_category(self, category: str) -> tuple:
+        return self._view(CATEGORY, category)
+
+    def by_power_type(self, power_type: int) -> tuple:
+        return self._view(POWER_TYPE, power_type)
+
+    def by_class(self, cls: type) -> tuple:
+        return self._view(CLASS, cls)
+
+    def has_category(self, category: str) -> bool:
+        return category in self._indexes[CATEGORY]
+
+    def has_power_type(self, power_type: int) -> bool:
+        return power_type in self._indexes[POWER_TYPE]
+
+    def has_class(self, cls: type) -> bool:
+        return cls in self._indexes[CLASS]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.components
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def __iter__(self) -> Iterator[Component]:
+        return iter(self.components.values())
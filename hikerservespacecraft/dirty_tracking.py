@@ -0,0 +1,46 @@
+from typing import FrozenSet
+
+
+def _install_assignment_hook(cls: type) -> None:
+    """Make assignments on instances of cls record the attribute name once tracking started."""
+    if cls.__dict__.get("_records_assignments"):
+        return
+    inherited = cls.__setattr__
+
+    def __setattr__(self, name, value):
+        inherited(self, name, value)
+        dirty = self.__dict__.get("_dirty_attributes")
+        if dirty is not None:
+            dirty.add(name)
+
+    cls.__setattr__ = __setattr__
+    cls._records_assignments = True
+
+
+class DirtyTracked:
+    """
+    Mixin recording which attributes were assigned since the last ``mark_clean()``, so delta
+    snapshots only need to emit those.
+
+    The assignment hook is installed on a class by the first ``mark_clean()`` of one of its
+    instances, so classes that are never tracked keep plain attribute assignment. Mutating a
+    container attribute in place is not an assignment: reassign it or call
+    ``mark_dirty(name)``. Fields held in a fleet engine array are written without assignment
+    too, which delta snapshots account for separately.
+    """
+    __serialize_exclude__ = {"_dirty_attributes"}
+
+    def mark_dirty(self, name: str) -> None:
+        dirty = self.__dict__.get("_dirty_attributes")
+        if dirty is not None:
+            dirty.add(name)
+
+    def mark_clean(self) -> None:
+        _install_assignment_hook(type(self))
+        self.__dict__["_dirty_attributes"] = set()
+
+    def is_tracking_changes(self) -> bool:
+        return "_dirty_attributes" in self.__dict__
+
+    def get_dirty_attributes(self) -> FrozenSet[str]:
+        return frozenset(self.__dict__.get("_dirty_attributes", ()))
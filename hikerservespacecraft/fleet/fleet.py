@@ -0,0 +1,185 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from hikerservespacecraft.fleet.generation_engine import GenerationEngine
+from hikerservespacecraft.fleet.power_dispatch import solve_dispatch
+from hikerservespacecraft.fleet.propagator import ThrusterEngine, TranslationalPropagator
+from hikerservespacecraft.fleet.storage_engine import StorageEngine
+from hikerservespacecraft.payloads.computer.spacecraft_computer import is_command_success
+from hikerservespacecraft.power_component import POWER_PRODUCER, POWER_STORAGE
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.tickable import Tickable
+
+# "spacecraft" value of a command addressed to every spacecraft in the fleet
+ALL_SPACECRAFT = "*"
+
+
+class Fleet(Tickable):
+    """
+    A set of spacecraft whose homogeneous components are stepped by shared array engines.
+
+    Spacecraft whose producers and storage can all be bound to the engines have their power
+    buses balanced together in one vectorized dispatch pass. Any other spacecraft falls back
+    to its own PowerBus.tick, while still sharing the engines for the components they accept.
+    Every spacecraft is moved by the shared TranslationalPropagator.
+    """
+
+    def __init__(self, initial_capacity: int = 64, acceleration_field=None):
+        self.spacecraft: Dict[str, Spacecraft] = {}
+        self.generation = GenerationEngine(initial_capacity=initial_capacity)
+        self.storage = StorageEngine(initial_capacity=initial_capacity)
+        self.thrusters = ThrusterEngine(initial_capacity=initial_capacity)
+        self.propagator = TranslationalPropagator(initial_capacity=initial_capacity,
+                                                  acceleration_field=acceleration_field)
+        self.last_generated_energy: np.ndarray = np.zeros(0)
+        self.last_power_balance: Dict[str, np.ndarray] = {}
+        self._fallback_balances: Dict[str, dict] = {}
+
+        self._bus_index: Dict[str, int] = {}
+        self._free_bus_indices: List[int] = []
+        self._bus_count: int = 0
+
+        self._ship_index: Dict[str, int] = {}
+        self._free_ship_indices: List[int] = []
+        self._ship_count: int = 0
+
+    def get_engines(self) -> list:
+        return [self.generation, self.storage, self.thrusters, self.propagator]
+
+    def _is_vectorizable(self, spacecraft: Spacecraft) -> bool:
+        for component in spacecraft.power_bus.components.values():
+            if component.power_type == POWER_PRODUCER and not self.generation.accepts(component):
+                return False
+            if component.power_type == POWER_STORAGE and not self.storage.accepts(component):
+                return False
+        return True
+
+    def add_spacecraft(self, spacecraft: Spacecraft) -> None:
+        if spacecraft.ident in self.spacecraft:
+            raise ValueError(f"Spacecraft {spacecraft.ident} is already part of the fleet")
+        self.spacecraft[spacecraft.ident] = spacecraft
+
+        bus_group = -1
+        if self._is_vectorizable(spacecraft):
+            if self._free_bus_indices:
+                bus_group = self._free_bus_indices.pop()
+            else:
+                bus_group = self._bus_count
+                self._bus_count += 1
+            self._bus_index[spacecraft.ident] = bus_group
+
+        if self._free_ship_indices:
+            ship_group = self._free_ship_indices.pop()
+        else:
+            ship_group = self._ship_count
+            self._ship_count += 1
+        self._ship_index[spacecraft.ident] = ship_group
+
+        self.generation.add_spacecraft(spacecraft, group=bus_group)
+        self.storage.add_spacecraft(spacecraft, group=bus_group)
+        self.thrusters.add_spacecraft(spacecraft, group=ship_group)
+        self.propagator.add_spacecraft(spacecraft, group=ship_group)
+
+    def remove_spacecraft(self, ident: str) -> Spacecraft:
+        spacecraft = self.spacecraft.pop(ident)
+        for engine in self.get_engines():
+            engine.remove_spacecraft(spacecraft)
+        if ident in self._bus_index:
+            self._free_bus_indices.append(self._bus_index.pop(ident))
+        self._free_ship_indices.append(self._ship_index.pop(ident))
+        self._fallback_balances.pop(ident, None)
+        return spacecraft
+
+    def get_spacecraft(self) -> List[Spacecraft]:
+        return list(self.spacecraft.values())
+
+    def route_commands(self, cmds: List[dict], stop_on_failure: bool = False) -> List[tuple]:
+        """
+        Route commands to many spacecraft in one call. Each command carries the target's
+        ident under "spacecraft", or ALL_SPACECRAFT to address every spacecraft in the fleet.
+        Commands are batched per spacecraft through SpacecraftComputer.route_commands, and
+        (ident, response) pairs are returned in command order, with a broadcast command
+        expanded in fleet order. With stop_on_failure, spacecraft after the first failing
+        one are not commanded and get "skipped" errors.
+        """
+        batches: Dict[str, List[int]] = {}
+        targets: List[List[str]] = []
+        for i, cmd in enumerate(cmds):
+            ident = cmd.get("spacecraft")
+            idents = list(self.spacecraft) if ident == ALL_SPACECRAFT else [ident]
+            targets.append(idents)
+            for target in idents:
+                batches.setdefault(target, []).append(i)
+
+        responses: Dict[Tuple[str, int], object] = {}
+        failed = False
+        for ident, indices in batches.items():
+            spacecraft = self.spacecraft.get(ident)
+            if spacecraft is None or failed:
+                message = f"Spacecraft {ident} not found" if spacecraft is None else "skipped after an earlier failure"
+                results = [{"cmd": cmds[i].get("command", "-"), "args": None, "return": None, "status": -1,
+                            "message": message} for i in indices]
+            else:
+                results = spacecraft.spacecraft_computer.route_commands([cmds[i] for i in indices],
+                                                                        stop_on_failure=stop_on_failure)
+            for i, result in zip(indices, results):
+                responses[(ident, i)] = result
+            if stop_on_failure and not all(is_command_success(result) for result in results):
+                failed = True
+
+        return [(ident, responses[(ident, i)]) for i, idents in enumerate(targets) for ident in idents]
+
+    def get_power_balance(self, ident: str) -> dict:
+        """Power balance of one spacecraft from the last tick, in the same shape as PowerBus.dispatch."""
+        if ident in self._bus_index:
+            index = self._bus_index[ident]
+            return {key: float(values[index]) for key, values in self.last_power_balance.items()}
+        return self._fallback_balances.get(ident, {})
+
+    def _dispatch(self, dt_s: float) -> Dict[str, np.ndarray]:
+        generation_groups = self.generation.group_view()
+        in_solve = generation_groups >= 0
+        produced = np.bincount(generation_groups[in_solve], self.generation.delivered_power()[in_solve],
+                               minlength=self._bus_count)
+
+        demand = np.zeros(self._bus_count)
+        for ident, index in self._bus_index.items():
+            demand[index] = self.spacecraft[ident].power_bus.get_power_demand()
+
+        storage_groups = self.storage.group_view()
+        balance = solve_dispatch(net_power=produced - demand,
+                                 storage_group=storage_groups,
+                                 level=self.storage.view("current_energy_level_GJ"),
+                                 capacity=self.storage.view("max_capacity_GJ"),
+                                 max_charge=self.storage.view("max_charging_rate_A"),
+                                 max_discharge=self.storage.view("max_discharging_rate_A"),
+                                 dt_s=dt_s)
+
+        flow = self.storage.view("current_power_flow_A")
+        in_solve = storage_groups >= 0
+        flow[in_solve] = balance.pop("flows")[in_solve]
+        balance["produced"] = produced
+        balance["demand"] = demand
+        return balance
+
+    def tick(self, dt_s: float) -> None:
+        for spacecraft in self.spacecraft.values():
+            spacecraft.spacecraft_computer.invalidate_query_cache()
+        self.last_generated_energy = self.generation.step(dt_s)
+
+        # spacecraft outside the vectorized solve set their own storage flows here
+        for ident, spacecraft in self.spacecraft.items():
+            if ident not in self._bus_index:
+                self._fallback_balances[ident] = spacecraft.power_bus.tick(dt_s)
+                spacecraft.spacecraft_bus.tick(dt_s)
+
+        self.last_power_balance = self._dispatch(dt_s)
+        self.storage.step(dt_s)
+
+        for ident in self._bus_index:
+            spacecraft = self.spacecraft[ident]
+            spacecraft.power_bus.tick_consumers(dt_s)
+            spacecraft.spacecraft_bus.tick(dt_s)
+
+        self.propagator.step(dt_s, self.thrusters.net_thrust(self._ship_count))
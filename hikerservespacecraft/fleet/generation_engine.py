@@ -0,0 +1,59 @@
+import numpy as np
+
+from hikerservespacecraft.array_backed import ComponentArrayEngine
+from hikerservespacecraft.payloads.energy_generation.energy_generation_component import EnergyGenerationComponent
+
+
+class GenerationEngine(ComponentArrayEngine):
+    """
+    Fleet-wide struct-of-arrays engine for EnergyGenerationComponent ramping.
+
+    Bound generators become thin views onto the engine columns, so their commands keep
+    working, while `step` advances the ramp/clamp/efficiency logic of every generator in
+    one vectorized pass. Generators that override `tick` are rejected by `accepts` and
+    must keep being ticked individually.
+    """
+
+    component_class = EnergyGenerationComponent
+    fields = {
+        name: EnergyGenerationComponent.__dict__[name]
+        for name in ("current_power_output", "target_output", "maximum_power_output",
+                     "ramp_rate", "efficiency", "enabled")
+    }
+
+    def accepts(self, component) -> bool:
+        return (isinstance(component, EnergyGenerationComponent)
+                and type(component).tick is EnergyGenerationComponent.tick)
+
+    def step(self, dt_s: float) -> np.ndarray:
+        """
+        Advance every bound generator by dt_s seconds.
+        Mirrors EnergyGenerationComponent.tick and returns the energy generated by each
+        slot over the interval in joules.
+        """
+        n = self.size
+        if dt_s <= 0 or n == 0:
+            return np.zeros(n)
+
+        current = self.columns["current_power_output"][:n]
+        target = self.columns["target_output"][:n]
+        maximum = self.columns["maximum_power_output"][:n]
+        ramp_rate = self.columns["ramp_rate"][:n]
+        efficiency = self.columns["efficiency"][:n]
+        enabled = self.columns["enabled"][:n]
+
+        desired = np.where(np.isnan(target), maximum, target)
+        np.minimum(desired, maximum, out=desired)
+        np.maximum(desired, 0.0, out=desired)
+        desired[~enabled] = 0.0
+
+        delta_allowed = ramp_rate * float(dt_s)
+        diff = desired - current
+        ramped = current + np.copysign(delta_allowed, diff)
+        current[:] = np.where(np.abs(diff) <= delta_allowed, desired, ramped)
+
+        return current * efficiency * float(dt_s)
+
+    def delivered_power(self) -> np.ndarray:
+        """Power currently delivered to the bus by each slot, after efficiency."""
+        return self.view("current_power_output") * self.view("efficiency")
@@ -0,0 +1,47 @@
+from typing import Dict
+
+import numpy as np
+
+
+def solve_dispatch(net_power: np.ndarray, storage_group: np.ndarray, level: np.ndarray, capacity: np.ndarray,
+                   max_charge: np.ndarray, max_discharge: np.ndarray, dt_s: float) -> Dict[str, np.ndarray]:
+    """
+    Balance many power buses in one array pass.
+
+    `net_power` holds produced minus demanded power per bus. Storage slots are tagged with
+    their bus in `storage_group` (-1 for slots that are not part of the solve). Mirrors
+    PowerBus.dispatch: surplus or deficit is split across a bus' storage proportionally to
+    each slot's available charge/discharge rate.
+
+    Returns per-slot `flows` (0 where `storage_group < 0`) and per-bus
+    `storage_flow`, `curtailed` and `unserved` arrays.
+    """
+    n_bus = len(net_power)
+    charge = np.maximum(max_charge, 0.0)
+    discharge = np.maximum(max_discharge, 0.0)
+    if dt_s > 0:
+        charge = np.minimum(charge, np.maximum(capacity - level, 0.0) / dt_s)
+        discharge = np.minimum(discharge, np.maximum(level, 0.0) / dt_s)
+
+    in_solve = storage_group >= 0
+    group = storage_group[in_solve]
+    charge = charge[in_solve]
+    discharge = discharge[in_solve]
+    total_charge = np.bincount(group, charge, minlength=n_bus)
+    total_discharge = np.bincount(group, discharge, minlength=n_bus)
+
+    charging = net_power >= 0
+    wanted = np.abs(net_power)
+    total_limit = np.where(charging, total_charge, total_discharge)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(total_limit > 0, np.minimum(wanted / total_limit, 1.0), 0.0)
+
+    flows = np.zeros(len(storage_group))
+    flows[in_solve] = np.where(charging[group], charge, -discharge) * fraction[group]
+    served = total_limit * fraction
+    return {
+        "flows": flows,
+        "storage_flow": np.where(charging, served, -served),
+        "curtailed": np.where(charging, wanted - served, 0.0),
+        "unserved": np.where(charging, 0.0, wanted - served),
+    }
@@ -0,0 +1,231 @@
+import itertools
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from hikerservespacecraft.fleet.fleet import Fleet
+from hikerservespacecraft.spacecraft import Spacecraft
+
+# per-spacecraft values published to shared memory after every tick, one column each
+TICK_METRICS = ("produced", "demand", "storage_flow", "curtailed", "unserved")
+# longest a tick may take before the run is failed
+DEFAULT_TICK_TIMEOUT_S = 60.0
+
+
+def _response_to_dict(response) -> dict:
+    if hasattr(response, "to_dict"):
+        return response.to_dict()
+    return response
+
+
+def _route(fleet: Fleet, ident: str, cmd: dict) -> dict:
+    """Route one command, answering with a failed response if it raises."""
+    try:
+        return _response_to_dict(fleet.spacecraft[ident].spacecraft_computer.route_command(cmd))
+    except Exception as e:
+        return {"success": False, "message": f"{cmd.get('command', '-')} on {ident} failed: {e!r}", "return": None}
+
+
+def _worker_main(worker_index: int, shard: List[Spacecraft], rows: List[int], shm_name: str, n_rows: int,
+                 connection) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        results = np.ndarray((n_rows, len(TICK_METRICS)), dtype=np.float64, buffer=shm.buf)
+        fleet = Fleet(initial_capacity=max(1, len(shard)))
+        for spacecraft in shard:
+            fleet.add_spacecraft(spacecraft)
+        row_of = dict(zip((sc.ident for sc in shard), rows))
+
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            dt_s, commands = message
+
+            # commands run one at a time in submission order, so one that raises fails alone
+            responses = [(ticket, _route(fleet, ident, cmd)) for ticket, ident, cmd in commands]
+
+            fleet.tick(dt_s)
+            for ident, row in row_of.items():
+                balance = fleet.get_power_balance(ident)
+                results[row] = [balance.get(metric, 0.0) for metric in TICK_METRICS]
+
+            connection.send((True, responses))
+    except EOFError:
+        pass
+    except Exception as e:
+        connection.send((False, f"worker {worker_index} failed: {e!r}"))
+    finally:
+        shm.close()
+
+
+class ShardedFleetRunner:
+    """
+    Runs a fleet across worker processes in lockstep.
+
+    Spacecraft are partitioned into contiguous shards once, at start; each worker owns its
+    shard (as a Fleet) for the whole run, so nothing is pickled per tick but the commands.
+    Every tick the coordinator sends each worker the tick length and the commands routed to
+    it over a pipe, and waits until all of them have applied the commands, ticked and
+    answered. Per-spacecraft power balances are written into a shared memory array
+    (`results`, one row per spacecraft in the order given, columns as in TICK_METRICS).
+    Command responses come back with the answer as `to_dict()` payloads; a command that
+    raises is answered with a failed response and the run carries on.
+
+    While waiting the coordinator also watches the worker processes, so a worker that exits
+    (killed, or crashed in native code) fails the tick at once, and a tick that takes longer
+    than `tick_timeout_s` fails it too; tick() then raises RuntimeError naming the failed
+    workers, and the runner has to be stopped.
+    """
+
+    def __init__(self, spacecraft: Sequence[Spacecraft], workers: Optional[int] = None,
+                 start_method: Optional[str] = None, tick_timeout_s: float = DEFAULT_TICK_TIMEOUT_S):
+        self.spacecraft: List[Spacecraft] = list(spacecraft)
+        self.idents: List[str] = [sc.ident for sc in self.spacecraft]
+        if len(set(self.idents)) != len(self.idents):
+            raise ValueError("Spacecraft idents must be unique")
+
+        self.workers: int = max(1, min(workers or multiprocessing.cpu_count(), len(self.spacecraft) or 1))
+        self.tick_timeout_s = tick_timeout_s
+        self._ctx = multiprocessing.get_context(start_method)
+
+        self._owner: Dict[str, int] = {}
+        self._shards: List[List[int]] = [list(rows) for rows in np.array_split(range(len(self.spacecraft)),
+                                                                                self.workers)]
+        for worker_index, rows in enumerate(self._shards):
+            for row in rows:
+                self._owner[self.idents[row]] = worker_index
+
+        self._tickets = itertools.count()
+        self._pending: List[List[tuple]] = [[] for _ in range(self.workers)]
+        self._responses: Dict[int, dict] = {}
+        self._processes: List = []
+        self._connections: List = []
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self.results: Optional[np.ndarray] = None
+        self.tick_count: int = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self) -> None:
+        if self._processes:
+            raise RuntimeError("Runner already started")
+
+        n_rows = len(self.spacecraft)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, n_rows * len(TICK_METRICS) * 8))
+        self.results = np.ndarray((n_rows, len(TICK_METRICS)), dtype=np.float64, buffer=self._shm.buf)
+        self.results[:] = 0.0
+
+        for worker_index, rows in enumerate(self._shards):
+            shard = [self.spacecraft[row] for row in rows]
+            connection, child_connection = self._ctx.Pipe()
+            process = self._ctx.Process(target=_worker_main, daemon=True,
+                                        args=(worker_index, shard, rows, self._shm.name, n_rows, child_connection))
+            process.start()
+            # only the worker keeps its end open, so the pipe reports EOF once the worker is gone
+            child_connection.close()
+            self._processes.append(process)
+            self._connections.append(connection)
+
+    def _failure(self, reason: str) -> RuntimeError:
+        exited = []
+        for index, process in enumerate(self._processes):
+            if wait([process.sentinel], timeout=0):
+                # it is gone already; reap it so its exit code is known
+                process.join()
+                exited.append(f"worker {index} exited with code {process.exitcode}")
+        return RuntimeError(f"Fleet worker failed: {'; '.join(exited) or reason}")
+
+    def submit_command(self, ident: str, cmd: dict) -> int:
+        """Queue a command for the spacecraft; it is routed by its owning worker at the next tick."""
+        if ident not in self._owner:
+            raise ValueError(f"Spacecraft {ident} is not part of this runner")
+        ticket = next(self._tickets)
+        self._pending[self._owner[ident]].append((ticket, ident, cmd))
+        return ticket
+
+    def tick(self, dt_s: float) -> np.ndarray:
+        """
+        Advance every shard by one lockstep tick and return the shared results array.
+        The array is a view on shared memory that is released by stop(); copy what you keep.
+        """
+        if not self._processes:
+            raise RuntimeError("Runner not started")
+
+        for connection, pending in zip(self._connections, self._pending):
+            try:
+                connection.send((float(dt_s), pending))
+            except OSError as e:
+                raise self._failure(f"could not send the tick: {e!r}") from e
+            pending.clear()
+
+        # wait for every answer, but also for any worker to exit, so a dead one cannot hang the run
+        answering = dict(zip(self._connections, range(self.workers)))
+        sentinels = [process.sentinel for process in self._processes]
+        deadline = time.monotonic() + self.tick_timeout_s
+        while answering:
+            ready = wait(list(answering) + sentinels, timeout=max(0.0, deadline - time.monotonic()))
+            if not ready:
+                raise self._failure(f"tick not completed within {self.tick_timeout_s} s")
+            for connection in [item for item in ready if item in answering]:
+                try:
+                    succeeded, payload = connection.recv()
+                except (EOFError, OSError) as e:
+                    raise self._failure(f"worker {answering[connection]} closed its pipe") from e
+                if not succeeded:
+                    raise RuntimeError(f"Fleet worker failed: {payload}")
+                self._responses.update(payload)
+                del answering[connection]
+            if answering and any(sentinel in ready for sentinel in sentinels):
+                raise self._failure("a worker exited during the tick")
+
+        self.tick_count += 1
+        return self.results
+
+    def run(self, n_ticks: int, dt_s: float) -> np.ndarray:
+        for _ in range(n_ticks):
+            self.tick(dt_s)
+        return self.results
+
+    def collect_command_responses(self) -> Dict[int, dict]:
+        """
+        Return the responses of every command routed since the last call, keyed by the ticket
+        returned from submit_command. Commands still waiting for their tick are not included.
+        """
+        responses, self._responses = self._responses, {}
+        return responses
+
+    def get_metric(self, metric: str) -> np.ndarray:
+        return self.results[:, TICK_METRICS.index(metric)]
+
+    def stop(self) -> None:
+        if self._processes:
+            for connection in self._connections:
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            for connection in self._connections:
+                connection.close()
+            self._processes = []
+            self._connections = []
+
+        if self._shm is not None:
+            self.results = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
@@ -0,0 +1,36 @@
+import numpy as np
+
+from hikerservespacecraft.array_backed import ComponentArrayEngine
+from hikerservespacecraft.payloads.power_storage.energy_storage_component import EnergyStorageComponent
+
+
+class StorageEngine(ComponentArrayEngine):
+    """
+    Fleet-wide batch integrator for EnergyStorageComponent charge state.
+
+    Energy level, flow and capacity of every bound battery live in contiguous columns and
+    are advanced with a single multiply-add and `np.clip` per tick. Nothing is written back
+    to the components; a bound battery reads its slot only when queried, e.g. through
+    `get_current_capacity`.
+    """
+
+    component_class = EnergyStorageComponent
+    fields = {
+        name: EnergyStorageComponent.__dict__[name]
+        for name in ("current_energy_level_GJ", "max_capacity_GJ", "current_power_flow_A",
+                     "max_charging_rate_A", "max_discharging_rate_A")
+    }
+
+    def accepts(self, component) -> bool:
+        return (isinstance(component, EnergyStorageComponent)
+                and type(component).tick is EnergyStorageComponent.tick)
+
+    def step(self, dt_s: float) -> None:
+        """Advance every bound battery by dt_s seconds. Mirrors EnergyStorageComponent.tick."""
+        n = self.size
+        if n == 0:
+            return
+
+        level = self.columns["current_energy_level_GJ"][:n]
+        level += self.columns["current_power_flow_A"][:n] * float(dt_s)
+        np.clip(level, 0.0, self.columns["max_capacity_GJ"][:n], out=level)
@@ -0,0 +1,229 @@
+"""
+Built-in timing instrumentation, off by default.
+
+While disabled the hooks in command routing and the bus tick loops cost one module
+attribute lookup. `enable()` installs a recorder that keeps:
+
+- a latency histogram per (device, command) routed through a SpacecraftComputer,
+- call counts, total time and a latency histogram per component class ticked by a bus,
+- net allocated memory blocks (sys.getallocatedblocks deltas) per command and per class.
+
+Export with `snapshot()` as a dict or `write_prometheus(path)` as a Prometheus text file.
+"""
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# log-linear buckets: values below 2 ** _SUB_BUCKET_BITS are exact, above that each power
+# of two is split into 2 ** (_SUB_BUCKET_BITS - 1) buckets, i.e. at most 12.5% relative error
+_SUB_BUCKET_BITS = 4
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_HALF_SUB_BUCKETS = _SUB_BUCKETS // 2
+_MAX_VALUE_BITS = 64
+_BUCKET_COUNT = _SUB_BUCKETS + (_MAX_VALUE_BITS - _SUB_BUCKET_BITS) * _HALF_SUB_BUCKETS
+
+_getallocatedblocks = getattr(sys, "getallocatedblocks", lambda: 0)
+
+
+def bucket_index(value: int) -> int:
+    if value < _SUB_BUCKETS:
+        return max(value, 0)
+    shift = value.bit_length() - _SUB_BUCKET_BITS
+    return _SUB_BUCKETS + (shift - 1) * _HALF_SUB_BUCKETS + (value >> shift) - _HALF_SUB_BUCKETS
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Largest value that falls into the bucket."""
+    if index < _SUB_BUCKETS:
+        return index
+    shift, sub = divmod(index - _SUB_BUCKETS, _HALF_SUB_BUCKETS)
+    return ((sub + _HALF_SUB_BUCKETS + 1) << (shift + 1)) - 1
+
+
+class LatencyHistogram:
+    """HDR-style histogram of nanosecond latencies over fixed log-linear buckets."""
+
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * _BUCKET_COUNT
+        self.count: int = 0
+        self.total_ns: int = 0
+        self.min_ns: int = 0
+        self.max_ns: int = 0
+
+    def record(self, value_ns: int) -> None:
+        self.counts[bucket_index(value_ns)] += 1
+        if self.count == 0 or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+        self.count += 1
+        self.total_ns += value_ns
+
+    def percentile(self, q: float) -> int:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 100), in ns."""
+        if self.count == 0:
+            return 0
+        rank = max(1, round(self.count * q / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """(bucket upper bound in ns, cumulative count) for every non-empty bucket."""
+        cumulative = 0
+        result = []
+        for index, count in enumerate(self.counts):
+            if count:
+                cumulative += count
+                result.append((bucket_upper_bound(index), cumulative))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "p50_ns": self.percentile(50),
+            "p90_ns": self.percentile(90),
+            "p99_ns": self.percentile(99),
+            "p999_ns": self.percentile(99.9),
+        }
+
+
+class _Series:
+    __slots__ = ("latency", "allocated_blocks")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.allocated_blocks: int = 0
+
+
+class Instrumentation:
+
+    def __init__(self, track_allocations: bool = True):
+        self.track_allocations = track_allocations
+        self.commands: Dict[Tuple[str, str], _Series] = {}
+        self.ticks: Dict[str, _Series] = {}
+
+    def _series(self, table: dict, key) -> _Series:
+        series = table.get(key)
+        if series is None:
+            series = table[key] = _Series()
+        return series
+
+    def time_command(self, device_id: str, command_: str, function, *args):
+        """Call function(*args) and record its latency under (device_id, command_)."""
+        blocks = _getallocatedblocks() if self.track_allocations else 0
+        start = time.perf_counter_ns()
+        try:
+            return function(*args)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            series = self._series(self.commands, (str(device_id), str(command_)))
+            series.latency.record(elapsed)
+            if self.track_allocations:
+                series.allocated_blocks += _getallocatedblocks() - blocks
+
+    def time_tick(self, component, dt_s: float):
+        """Tick the component and record the call under its class name."""
+        blocks = _getallocatedblocks() if self.track_allocations else 0
+        start = time.perf_counter_ns()
+        try:
+            return component.tick(dt_s)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            series = self._series(self.ticks, type(component).__name__)
+            series.latency.record(elapsed)
+            if self.track_allocations:
+                series.allocated_blocks += _getallocatedblocks() - blocks
+
+    def reset(self) -> None:
+        self.commands.clear()
+        self.ticks.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "commands": {f"{device_id}/{command_}": {**series.latency.snapshot(),
+                                                     "allocated_blocks": series.allocated_blocks}
+                         for (device_id, command_), series in self.commands.items()},
+            "ticks": {class_name: {**series.latency.snapshot(), "allocated_blocks": series.allocated_blocks}
+                      for class_name, series in self.ticks.items()},
+        }
+
+    def to_prometheus(self, prefix: str = "hikerverse") -> str:
+        lines: List[str] = []
+        self._export_histograms(lines, f"{prefix}_command_latency_seconds", "Command routing latency",
+                                [({"device": device_id, "command": command_}, series)
+                                 for (device_id, command_), series in self.commands.items()])
+        self._export_histograms(lines, f"{prefix}_component_tick_seconds", "Component tick time per class",
+                                [({"component_class": class_name}, series)
+                                 for class_name, series in self.ticks.items()])
+
+        if self.track_allocations:
+            name = f"{prefix}_allocated_blocks"
+            lines.append(f"# HELP {name} Net allocated memory blocks")
+            lines.append(f"# TYPE {name} gauge")
+            for (device_id, command_), series in self.commands.items():
+                labels = _labels({"device": device_id, "command": command_})
+                lines.append(f"{name}{labels} {series.allocated_blocks}")
+            for class_name, series in self.ticks.items():
+                lines.append(f"{name}{_labels({'component_class': class_name})} {series.allocated_blocks}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _export_histograms(lines: List[str], name: str, help_text: str, series_list: list) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, series in series_list:
+            histogram = series.latency
+            for upper_ns, cumulative in histogram.buckets():
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': repr(upper_ns / 1e9)})} {cumulative}")
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.total_ns / 1e9!r}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def write_prometheus(self, path: str, prefix: str = "hikerverse") -> None:
+        """Write the Prometheus text dump atomically, for node_exporter's textfile collector."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            f.write(self.to_prometheus(prefix=prefix))
+        os.replace(temporary, path)
+
+
+def _labels(labels: dict) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+# the installed recorder; None while instrumentation is off
+active: Optional[Instrumentation] = None
+
+
+def enable(track_allocations: bool = True) -> Instrumentation:
+    global active
+    if active is None:
+        active = Instrumentation(track_allocations=track_allocations)
+    return active
+
+
+def disable() -> Optional[Instrumentation]:
+    """Stop recording and return the recorder that was active, for a final export."""
+    global active
+    recorder, active = active, None
+    return recorder
+
+
+def snapshot() -> dict:
+    return active.snapshot() if active is not None else {"commands": {}, "ticks": {}}
+
+
+def write_prometheus(path: str, prefix: str = "hikerverse") -> None:
+    (active or Instrumentation()).write_prometheus(path, prefix=prefix)
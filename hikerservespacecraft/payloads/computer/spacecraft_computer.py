@@ -1,13 +1,41 @@
-from typing import Optional, List, Union
+from typing import Callable, Dict, Optional, List, Tuple, Union
 
+from hikerservespacecraft import instrumentation
 from hikerservespacecraft.active_component import ActiveComponent
 from hikerservespacecraft.command_response import CommandResponse
-from hikerservespacecraft.commandable import Commandable, command
-from hikerservespacecraft.power_component import PowerComponent, POWER_PRODUCER, POWER_STORAGE
-from hikerservespacecraft.utils.class_utils import find_methods_with_wrapper
+from hikerservespacecraft.commandable import Commandable, command, get_command_specs, invalid_arguments_response
+from hikerservespacecraft.power_component import POWER_PRODUCER, POWER_STORAGE
+
+
+# args value that cannot be used as a cache key
+_UNCACHEABLE = object()
+
+
+def _freeze_args(args):
+    try:
+        frozen = tuple(sorted(args.items())) if isinstance(args, dict) else tuple(args)
+        hash(frozen)
+    except TypeError:
+        return _UNCACHEABLE
+    return frozen
+
+
+def is_command_success(response) -> bool:
+    """True for a successful CommandResponse (or its to_dict() payload); error dicts never are."""
+    if isinstance(response, CommandResponse):
+        return bool(response.success)
+    if isinstance(response, dict):
+        return bool(response.get("success", False))
+    return False
 
 
 class SpacecraftComputer(ActiveComponent, Commandable):
+    __serialize_exclude__ = {'command_listeners', '_dispatch_table', '_dispatch_devices', '_dispatch_versions',
+                             '_query_cache', 'command_journal'}
+
+    # receives journal.record(device_id, command, args) for every state-changing command that succeeded
+    command_journal = None
+
     category = "computer/spacecraft_computer"
 
     def __init__(self, name: str, description: str,
@@ -20,6 +48,44 @@ class SpacecraftComputer(ActiveComponent, Commandable):
         self.is_booted = False
         self.is_active = True
 
+        # callables invoked as listener(device_id, command) after a command reached its device
+        self.command_listeners: List[Callable[[str, str], None]] = []
+
+    def _get_query_cache(self) -> Dict[str, dict]:
+        cache = self.__dict__.get("_query_cache")
+        if cache is None:
+            cache = self._query_cache = {}
+        return cache
+
+    def invalidate_query_cache(self, device_id: Optional[str] = None) -> None:
+        """
+        Forget cached query responses, for one device or all of them. Tick drivers call this
+        once per tick; mutating commands call it for the device they were routed to.
+        """
+        cache = self._get_query_cache()
+        if device_id is None:
+            if cache:
+                cache.clear()
+        else:
+            cache.pop(device_id, None)
+
+    def _get_command_listeners(self) -> List[Callable[[str, str], None]]:
+        # not serialized, so a deserialized computer starts without one
+        listeners = self.__dict__.get("command_listeners")
+        if listeners is None:
+            listeners = self.command_listeners = []
+        return listeners
+
+    def add_command_listener(self, listener: Callable[[str, str], None]) -> None:
+        listeners = self._get_command_listeners()
+        if listener not in listeners:
+            listeners.append(listener)
+
+    def remove_command_listener(self, listener: Callable[[str, str], None]) -> None:
+        listeners = self._get_command_listeners()
+        if listener in listeners:
+            listeners.remove(listener)
+
 
     @command
     def list_commandable_devices(self) -> CommandResponse:
@@ -60,16 +126,13 @@ class SpacecraftComputer(ActiveComponent, Commandable):
             cmd_res.message = f"{self.name} is already booted."
             return cmd_res
 
-        has_energy_storage = any(
-            comp for comp in self.power_bus.components.values() if
-            isinstance(comp, PowerComponent) and comp.power_type == POWER_STORAGE)
+        power_components = self.power_bus.get_registry()
+        has_energy_storage = power_components.has_power_type(POWER_STORAGE)
 
         cmd_res.add_log_entry(f"Checking for energy storage components: "
                               f"{'found' if has_energy_storage else 'not found'}")
 
-        has_energy_generation = any(
-            comp for comp in self.power_bus.components.values() if
-            isinstance(comp, PowerComponent) and comp.power_type == POWER_PRODUCER)
+        has_energy_generation = power_components.has_power_type(POWER_PRODUCER)
 
         cmd_res.add_log_entry(f"Checking for energy generation components: "
                               f"{'found' if has_energy_generation else 'not found'}")
@@ -97,19 +160,97 @@ class SpacecraftComputer(ActiveComponent, Commandable):
     def list_commands(self, device_id: str) -> dict[str, Union[str, list[str]]]:
         ret = {}
 
-        bus_components = {**(self.spacecraft_bus.components or {}), **(self.power_bus.components or {}),
-                          self.name: self}
+        bus_components = self._get_dispatch_devices()
         if device_id in bus_components:
             component = bus_components[device_id]
             if isinstance(component, Commandable):
-                cmd_methods = find_methods_with_wrapper(cls=component.__class__, wrapper_name="command")
-                for meth in cmd_methods:
+                for meth in get_command_specs(component.__class__):
                     ret[meth] = component.get_docstring(meth)
 
         return ret
 
-    def route_command(self, cmd: dict[str, Union[str, list[str]]]):
+    def _refresh_dispatch_table(self) -> None:
+        """
+        Rebuild the (device_id, command) -> (bound method, component, CommandSpec) table when bus membership
+        changed since it was last built. Command discovery itself is cached per class.
+        """
+        versions = (self.spacecraft_bus.version, self.power_bus.version)
+        if self.__dict__.get("_dispatch_versions") == versions:
+            return
+
+        devices = {**(self.spacecraft_bus.components or {}), **(self.power_bus.components or {}),
+                   self.name: self}
+        table: Dict[Tuple[str, str], tuple] = {}
+        for device_id, component in devices.items():
+            if isinstance(component, Commandable) and isinstance(component, ActiveComponent):
+                for name, spec in get_command_specs(component.__class__).items():
+                    table[(device_id, name)] = (getattr(component, name), component, spec)
+
+        self._dispatch_devices = devices
+        self._dispatch_table = table
+        self._dispatch_versions = versions
+
+    def _get_dispatch_devices(self) -> dict:
+        self._refresh_dispatch_table()
+        return self._dispatch_devices
 
+    def route_command(self, cmd: dict[str, Union[str, list[str]]]):
+        recorder = instrumentation.active
+        if recorder is not None:
+            return recorder.time_command(cmd.get("device_id", "-"), cmd.get("command", "-"), self.__route_command, cmd)
+        return self.__route_command(cmd)
+
+    def __route_command(self, cmd: dict[str, Union[str, list[str]]]):
+        resolved = self.__resolve_command(cmd)
+        if isinstance(resolved, dict):
+            return resolved
+        return self.__execute_command(*resolved)
+
+    def route_commands(self, cmds: List[dict], stop_on_failure: bool = False) -> list:
+        """
+        Route a batch of commands and return their responses, in the order given.
+
+        The whole batch is validated up front; with stop_on_failure nothing runs if any
+        command is malformed or addressed to an unknown device or command, and after the
+        first failed command the rest are answered with a "skipped" error instead of being
+        routed. Commands are executed grouped by device, keeping their relative order within
+        a device; commands addressed to this computer (e.g. boot) run first.
+        """
+        results: list = [None] * len(cmds)
+        groups: Dict[str, List[int]] = {}
+        plans: list = [None] * len(cmds)
+        for i, cmd in enumerate(cmds):
+            # booting may happen within the batch, so that check is left to execution
+            resolved = self.__resolve_command(cmd, check_boot=False)
+            if isinstance(resolved, dict):
+                results[i] = resolved
+            else:
+                plans[i] = resolved
+                groups.setdefault(resolved[0], []).append(i)
+
+        failed = stop_on_failure and any(result is not None for result in results)
+        order = sorted(groups, key=lambda device_id: device_id != self.name)
+        for device_id in order:
+            for i in groups[device_id]:
+                if failed:
+                    results[i] = self.__get_error_response(plans[i][1], None, "skipped after an earlier failure")
+                    continue
+                recorder = instrumentation.active
+                if recorder is not None:
+                    results[i] = recorder.time_command(device_id, plans[i][1], self.__execute_command, *plans[i])
+                else:
+                    results[i] = self.__execute_command(*plans[i])
+                if stop_on_failure and not is_command_success(results[i]):
+                    failed = True
+
+        return results
+
+    def __resolve_command(self, cmd: dict, check_boot: bool = True):
+        """
+        Validate a command against the dispatch table. Returns an error response, or a
+        (device_id, command, args, entry) tuple where entry is None for commandables that
+        are not active components and dispatch through execute().
+        """
         device_id: Optional[str] = cmd.get("device_id", None)
         if device_id is None:
             return self.__get_error_response("-", None, "Device ID not specified")
@@ -122,42 +263,104 @@ class SpacecraftComputer(ActiveComponent, Commandable):
         if args is None:
             return self.__get_error_response("-", None, "args not specified")
 
-        if not self.is_booted and command_ != "boot":
+        if check_boot and not self.is_booted and command_ != "boot":
             return self.__get_error_response("-", None, "Spacecraft Computer is not booted")
 
-        bus_components = {**(self.spacecraft_bus.components or {}), **(self.power_bus.components or {}),
-                          self.name: self}
+        self._refresh_dispatch_table()
+        entry = self._dispatch_table.get((device_id, command_))
+        if entry is not None:
+            return device_id, command_, args, entry
 
+        # not in the table: work out which error applies
+        bus_components = self._dispatch_devices
         if device_id in bus_components:
             component = bus_components[device_id]
             if isinstance(component, Commandable):
                 if isinstance(component, ActiveComponent):
-
-                    cmd_methods = find_methods_with_wrapper(cls=component.__class__, wrapper_name="command")
-
-                    if command_ not in cmd_methods:
-                        return self.__get_error_response("-", None, f"Command {command_} not found for {device_id}")
-
-                    if not component.is_active and command_ != "activate":
-                        return {
-                            "cmd": "capacity",
-                            "args": None,
-                            "return_type": None,
-                            "value": 0,
-                            "status": 1,
-                            "message": f"{component.__class__.__name__} is offline"
-                        }
-
-                cmd_return = component.execute(cmd=command_, args=args)
-                if cmd_return is None:
-                    return self.__get_error_response("-", None, f"{device_id} not found")
-                else:
-                    return cmd_return
+                    return self.__get_error_response("-", None, f"Command {command_} not found for {device_id}")
+                return device_id, command_, args, None
             else:
                 return self.__get_error_response("-", None, f"{component.name} is not commandable")
         else:
             return self.__get_error_response("-", None, f"{device_id} not found")
 
+    def __execute_command(self, device_id: str, command_: str, args, entry):
+        if not self.is_booted and command_ != "boot":
+            return self.__get_error_response("-", None, "Spacecraft Computer is not booted")
+
+        if entry is None:
+            cmd_return = self._dispatch_devices[device_id].execute(cmd=command_, args=args)
+            self.__after_mutation(device_id, command_, args, cmd_return)
+            return self.__finish_command(device_id, command_, cmd_return)
+
+        method, component, spec = entry
+        if not component.is_active and command_ != "activate":
+            return self.__get_offline_response(component)
+
+        if spec.query:
+            return self.__run_query(device_id, command_, args, method, component, spec)
+
+        values, error = spec.bind(args)
+        if error is not None:
+            return invalid_arguments_response(component, command_, error)
+        cmd_return = self.__invoke(method, values, args)
+        self.__after_mutation(device_id, command_, args, cmd_return)
+        return self.__finish_command(device_id, command_, cmd_return)
+
+    def __after_mutation(self, device_id: str, command_: str, args, cmd_return) -> None:
+        self.invalidate_query_cache(device_id)
+        journal = self.command_journal
+        if journal is not None and is_command_success(cmd_return):
+            journal.record(device_id, command_, args)
+
+    def __run_query(self, device_id: str, command_: str, args, method, component, spec):
+        """
+        Answer a pure query from the cache when possible. Every caller gets its own copy of
+        the cached response, and cache hits do not notify command listeners.
+        """
+        key = (command_, _freeze_args(args))
+        device_cache = self._get_query_cache().get(device_id)
+        if device_cache is not None:
+            cached = device_cache.get(key)
+            if cached is not None:
+                return cached.copy()
+
+        values, error = spec.bind(args)
+        if error is not None:
+            return invalid_arguments_response(component, command_, error)
+        cmd_return = self.__invoke(method, values, args)
+        response = self.__finish_command(device_id, command_, cmd_return)
+        if key[1] is not _UNCACHEABLE and getattr(response, "success", False):
+            self._get_query_cache().setdefault(device_id, {})[key] = response.copy()
+        return response
+
+    @staticmethod
+    def __invoke(method, values: Optional[list], args):
+        # values is None for commands whose signature is not checked
+        if values is not None:
+            return method(*values)
+        if args:
+            return method(*args) if isinstance(args, (list, tuple)) else method(**args)
+        return method()
+
+    def __finish_command(self, device_id: str, command_: str, cmd_return):
+        for listener in self._get_command_listeners():
+            listener(device_id, command_)
+        if cmd_return is None:
+            return self.__get_error_response("-", None, f"{device_id} not found")
+        return cmd_return
+
+    @staticmethod
+    def __get_offline_response(component) -> dict:
+        return {
+            "cmd": "capacity",
+            "args": None,
+            "return_type": None,
+            "value": 0,
+            "status": 1,
+            "message": f"{component.__class__.__name__} is offline"
+        }
+
     @staticmethod
     def __get_error_response(cmd: str, args: Optional[List[str]], message: str) -> dict:
         return {
@@ -1,5 +1,7 @@
+import math
 from typing import Optional, Dict
 
+from hikerservespacecraft.array_backed import ArrayBacked, ArrayField
 from hikerservespacecraft.command_response import CommandResponse
 from hikerservespacecraft.commandable import Commandable, command
 from hikerservespacecraft.power_component import PowerComponent, POWER_PRODUCER
@@ -7,8 +9,17 @@ from hikerservespacecraft.reference.component_attributes import get_component_da
 from hikerservespacecraft.tickable import Tickable
 
 
-class EnergyGenerationComponent(Commandable, PowerComponent, Tickable):
+class EnergyGenerationComponent(ArrayBacked, Commandable, PowerComponent, Tickable):
     category = "power/generation"
+    supports_fast_forward = True
+
+    # runtime state; stored in the fleet GenerationEngine arrays while bound to one
+    current_power_output = ArrayField()
+    target_output = ArrayField(optional=True)
+    maximum_power_output = ArrayField()
+    ramp_rate = ArrayField()
+    efficiency = ArrayField()
+    enabled = ArrayField(dtype=bool)
 
     def __init__(
         self,
@@ -58,14 +69,15 @@ class EnergyGenerationComponent(Commandable, PowerComponent, Tickable):
         return self._set_active_state(False)
 
 
-    @command
+    @command(query=True)
     def get_current_power_output(self):
         """Get the current power output in watts."""
         return_data = {"current_power_output": self.current_power_output}
         return CommandResponse(success=True,
                                return_data=return_data,
                                device_type=self.__class__.__name__,
-                               message=f"{self.name} current power output: {self.current_power_output}")
+                               message="{} current power output: {}",
+                               message_args=(self.name, self.current_power_output))
 
 
 
@@ -81,6 +93,41 @@ class EnergyGenerationComponent(Commandable, PowerComponent, Tickable):
             "enabled": 1.0 if self.enabled else 0.0,
         }
 
+    def get_delivered_power(self) -> float:
+        """Power delivered to the bus after efficiency."""
+        return float(self.current_power_output) * float(self.efficiency)
+
+    def _desired_output(self) -> float:
+        if not self.enabled:
+            # ramp down to zero
+            return 0.0
+        desired = (
+            float(self.target_output)
+            if self.target_output is not None
+            else float(self.maximum_power_output)
+        )
+        desired = min(desired, self.maximum_power_output)
+        return max(0.0, desired)
+
+    def is_steady_state(self) -> bool:
+        return self.current_power_output == self._desired_output()
+
+    def time_to_discontinuity(self) -> float:
+        """Seconds until the output ramp reaches its desired value."""
+        diff = abs(self._desired_output() - self.current_power_output)
+        if diff == 0:
+            return math.inf
+        if self.ramp_rate <= 0:
+            return math.inf
+        return diff / self.ramp_rate
+
+    def get_delivered_power_slope(self) -> float:
+        """Rate of change of the delivered power while ramping, in power units per second."""
+        diff = self._desired_output() - self.current_power_output
+        if diff == 0:
+            return 0.0
+        return math.copysign(self.ramp_rate, diff) * float(self.efficiency)
+
     def tick(self, dt_s) -> Optional[float]:
         """
         Advance internal state by delta_seconds.
@@ -90,17 +137,7 @@ class EnergyGenerationComponent(Commandable, PowerComponent, Tickable):
         if dt_s <= 0:
             return 0.0
 
-        if not self.enabled:
-            # ramp down to zero
-            desired = 0.0
-        else:
-            desired = (
-                float(self.target_output)
-                if self.target_output is not None
-                else float(self.maximum_power_output)
-            )
-            desired = min(desired, self.maximum_power_output)
-            desired = max(0.0, desired)
+        desired = self._desired_output()
 
         delta_allowed = self.ramp_rate * float(dt_s)
         diff = desired - self.current_power_output
@@ -131,7 +168,8 @@ class EnergyGenerationComponent(Commandable, PowerComponent, Tickable):
 
         self.target_output = min(target_power, self.maximum_power_output)
         return CommandResponse(success=True, return_data={"target_output": self.target_output},
-                               device_type=self.__class__.__name__, message=f"Target set to {self.target_output} W")
+                               device_type=self.__class__.__name__,
+                               message="Target set to {} W", message_args=(self.target_output,))
 
 
     @command
@@ -21,6 +21,7 @@ class SolarArray(EnergyGenerationComponent):
 
 class G1SiliconSolarArray(SolarArray):
     category = "power/generation"
+    supports_fast_forward = False
 
     def __init__(self, name, description, mass, volume):
         super().__init__(name=name, description=description, mass=mass, volume=volume)
@@ -1,5 +1,6 @@
+import math
 
-
+from hikerservespacecraft.array_backed import ArrayBacked, ArrayField
 from hikerservespacecraft.command_response import CommandResponse
 from hikerservespacecraft.commandable import Commandable, command
 from hikerservespacecraft.power_component import PowerComponent, POWER_STORAGE
@@ -7,12 +8,20 @@ from hikerservespacecraft.reference.component_attributes import get_component_da
 from hikerservespacecraft.tickable import Tickable
 
 
-class EnergyStorageComponent(Commandable, PowerComponent, Tickable):
+class EnergyStorageComponent(ArrayBacked, Commandable, PowerComponent, Tickable):
     """
     Energy storage component.
     Note: attribute names kept for compatibility with the rest of the codebase.
     """
     category = "power/storage"
+    supports_fast_forward = True
+
+    # integrated state; stored in the fleet StorageEngine arrays while bound to one
+    current_energy_level_GJ = ArrayField()
+    max_capacity_GJ = ArrayField()
+    current_power_flow_A = ArrayField()
+    max_charging_rate_A = ArrayField()
+    max_discharging_rate_A = ArrayField()
 
     def __init__(self, name: str, description: str, mass: float, volume: float):
         super().__init__(name=name, description=description, mass=mass, volume=volume, power_type=POWER_STORAGE)
@@ -32,46 +41,67 @@ class EnergyStorageComponent(Commandable, PowerComponent, Tickable):
         """Return the currently requested/flowing power value (units as stored)."""
         return float(self.current_power_flow_A)
 
-    @command
+    @command(query=True)
     def get_current_capacity(self) -> CommandResponse:
         return_data = {"current_level_GJ": float(self.current_energy_level_GJ)}
         return CommandResponse(
             success=True,
             return_data=return_data,
             device_type=self.__class__.__name__,
-            message=f"{self.name} current charge level: {self.current_energy_level_GJ}",
+            message="{} current charge level: {}",
+            message_args=(self.name, self.current_energy_level_GJ),
         )
 
-    @command
+    @command(query=True)
     def get_max_capacity(self) -> CommandResponse:
         return_data = {"max_capacity_GJ": float(self.max_capacity_GJ)}
         return CommandResponse(
             success=True,
             return_data=return_data,
             device_type=self.__class__.__name__,
-            message=f"{self.name} current charge level: {self.max_capacity_GJ}",
+            message="{} current charge level: {}",
+            message_args=(self.name, self.max_capacity_GJ),
         )
 
-    @command
+    @command(query=True)
     def get_max_charging_rate(self) -> CommandResponse:
         return_data = {"max_charging_rate_A": float(self.max_charging_rate_A)}
         return CommandResponse(
             success=True,
             return_data=return_data,
             device_type=self.__class__.__name__,
-            message=f"{self.name} max charging ratel: {self.max_charging_rate_A}",
+            message="{} max charging ratel: {}",
+            message_args=(self.name, self.max_charging_rate_A),
         )
 
-    @command
+    @command(query=True)
     def get_max_discharging_rate(self) -> CommandResponse:
         return_data = {"max_discharging_rate_A": float(self.max_discharging_rate_A)}
         return CommandResponse(
             success=True,
             return_data=return_data,
             device_type=self.__class__.__name__,
-            message=f"{self.name} max discharging ratel: {self.max_discharging_rate_A}",
+            message="{} max discharging ratel: {}",
+            message_args=(self.name, self.max_discharging_rate_A),
         )
 
+    def is_steady_state(self) -> bool:
+        flow = self.current_power_flow_A
+        if flow > 0:
+            return self.current_energy_level_GJ >= self.max_capacity_GJ
+        if flow < 0:
+            return self.current_energy_level_GJ <= 0.0
+        return True
+
+    def time_to_discontinuity(self) -> float:
+        """Seconds until the current flow fills or empties the storage."""
+        flow = self.current_power_flow_A
+        if flow > 0 and self.current_energy_level_GJ < self.max_capacity_GJ:
+            return (self.max_capacity_GJ - self.current_energy_level_GJ) / flow
+        if flow < 0 and self.current_energy_level_GJ > 0.0:
+            return self.current_energy_level_GJ / -flow
+        return math.inf
+
     def tick(self, dt_s: float) -> None:
         """
         Advance state by dt_s seconds.
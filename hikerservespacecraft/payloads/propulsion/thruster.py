@@ -1,11 +1,21 @@
+import numpy as np
+
+from hikerservespacecraft.array_backed import ArrayBacked, ArrayField
 from hikerservespacecraft.command_response import CommandResponse
 from hikerservespacecraft.commandable import Commandable, command
 from hikerservespacecraft.power_component import PowerComponent, POWER_CONSUMER
 from hikerservespacecraft.payloads.propulsion.thrust_profile import ThrustProfile
 
 
-class Thruster(Commandable, PowerComponent):
+class Thruster(ArrayBacked, Commandable, PowerComponent):
     category = "propulsion/thruster"
+    supports_fast_forward = True
+
+    # state read by the fleet propagator; stored in the ThrusterEngine arrays while bound to one
+    is_active = ArrayField(dtype=bool)
+    current_thrust = ArrayField()
+    current_power = ArrayField()
+    thrust_vector = ArrayField(shape=(3,))
 
     def __init__(self, name: str, description: str, mass: float, volume: float,
                  thrust_profile: ThrustProfile = None):
@@ -15,23 +25,36 @@ class Thruster(Commandable, PowerComponent):
         self.current_power: float = 0.0
         self.thrust_vector = (0.0, 0.0, 1.0)  # Default thrust vector pointing forward
 
+    def get_thrust_force(self) -> np.ndarray:
+        """Thrust force vector currently produced, zero while inactive."""
+        if not self.is_active:
+            return np.zeros(3)
+        return float(self.current_thrust) * np.asarray(self.thrust_vector, dtype=float)
+
+    def get_power_demand(self) -> float:
+        return float(self.current_power) if self.is_active else 0.0
+
+    def is_steady_state(self) -> bool:
+        # thrust and power only change through commands
+        return True
 
     @command
     def set_thrust(self, thrust: float) -> CommandResponse:
         """Set the thruster's thrust level. Args: thrust (float): Desired thrust level."""
         if thrust < 0 or thrust > self.thrust_profile.max_thrust:
-            raise ValueError(f"Thrust must be between 0 and {self.thrust_profile.max_thrust}")
+            return CommandResponse(success=False, return_data={}, device_type=self.__class__.__name__,
+                                   message=f"Thrust must be between 0 and {self.thrust_profile.max_thrust}")
         self.current_thrust = thrust
         self.current_power = self.thrust_profile.get_power_at(thrust=self.current_thrust)
         return CommandResponse(success=True,
                                device_type=self.__class__.__name__,
-                               message=f"{self.name} thrust set to: {thrust}")
+                               message="{} thrust set to: {}", message_args=(self.name, thrust))
 
-    @command
+    @command(query=True)
     def get_thrust(self) -> CommandResponse:
         """Get the current thrust level of the thruster."""
         return_data = {"thrust": self.current_thrust}
         return CommandResponse(success=True,
                                return_data=return_data,
                                device_type=self.__class__.__name__,
-                               message=f"{self.name} current thrust: {self.current_thrust}")
+                               message="{} current thrust: {}", message_args=(self.name, self.current_thrust))
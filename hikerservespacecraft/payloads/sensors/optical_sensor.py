@@ -16,6 +16,7 @@ class OpticalSensor(ActiveComponent, Commandable, UniverseAware):
 
     """Optical imaging sensor."""
     category = "sensor/optical"
+    tick_period_s = 1.0
 
 
 
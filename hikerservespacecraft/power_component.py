@@ -12,3 +12,7 @@ class PowerComponent(ActiveComponent, ABC):
     def __init__(self, name, description, mass, volume, power_type):
         super().__init__(name, description, mass, volume)
         self.power_type = power_type
+
+    def get_power_demand(self) -> float:
+        """Power drawn from the bus this tick. Consumers override this."""
+        return 0.0
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+from hikerservespacecraft.runtime.command_journal import CommandJournal
+from hikerservespacecraft.spacecraft import Spacecraft
+
+
+class _Batch:
+
+    def __init__(self, commands: List[dict], stop_on_failure: bool):
+        self.commands = commands
+        self.stop_on_failure = stop_on_failure
+
+
+class AsyncSimulationRuntime:
+    """
+    asyncio real-time loop around a Spacecraft.
+
+    The tick coroutine advances simulation time in fixed `dt_s` steps paced against a
+    monotonic wall clock (scaled by `time_scale`). When it falls behind it catches up by
+    running the missed ticks back to back, with the same dt each, so results only depend on
+    the tick at which each command was applied. Commands submitted from any coroutine land
+    in an inbox that is drained, in arrival order, before every tick; `submit` returns an
+    awaitable resolved with the route_command result.
+    """
+
+    def __init__(self, spacecraft: Spacecraft, dt_s: float = 1.0, time_scale: float = 1.0,
+                 max_catch_up_ticks: int = 100, clock: Callable[[], float] = time.monotonic,
+                 journal: Optional[CommandJournal] = None):
+        if dt_s <= 0:
+            raise ValueError("dt_s must be positive")
+        self.spacecraft = spacecraft
+        # records routed commands; committed once per tick
+        self.journal = journal
+        if journal is not None:
+            journal.attach(spacecraft.spacecraft_computer)
+        self.dt_s = dt_s
+        self.time_scale = time_scale
+        self.max_catch_up_ticks = max_catch_up_ticks
+        self.clock = clock
+
+        self.tick_count: int = 0
+        self.commands_routed: int = 0
+        # largest wall-clock delay of a tick behind its deadline, and wall-clock ticks given up after overruns
+        self.max_lag_s: float = 0.0
+        self.dropped_ticks: int = 0
+
+        self._inbox: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._epoch: float = 0.0
+        self._epoch_tick: int = 0
+
+    @property
+    def sim_time_s(self) -> float:
+        return self.tick_count * self.dt_s
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _get_inbox(self) -> asyncio.Queue:
+        if self._inbox is None:
+            self._inbox = asyncio.Queue()
+        return self._inbox
+
+    def submit(self, cmd: dict) -> asyncio.Future:
+        """Queue a command for the next tick boundary and return a future for its response."""
+        future = asyncio.get_running_loop().create_future()
+        self._get_inbox().put_nowait((cmd, future))
+        return future
+
+    def submit_batch(self, cmds: List[dict], stop_on_failure: bool = False) -> asyncio.Future:
+        """Queue a batch for SpacecraftComputer.route_commands at the next tick boundary."""
+        future = asyncio.get_running_loop().create_future()
+        self._get_inbox().put_nowait((_Batch(cmds, stop_on_failure), future))
+        return future
+
+    async def execute(self, cmd: dict):
+        return await self.submit(cmd)
+
+    def drain_inbox(self) -> int:
+        """Route every queued command. Returns how many were routed."""
+        inbox = self._get_inbox()
+        routed = 0
+        while not inbox.empty():
+            cmd, future = inbox.get_nowait()
+            if future.cancelled():
+                continue
+            computer = self.spacecraft.spacecraft_computer
+            try:
+                if isinstance(cmd, _Batch):
+                    response = computer.route_commands(cmd.commands, stop_on_failure=cmd.stop_on_failure)
+                else:
+                    response = computer.route_command(cmd=cmd)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(response)
+            routed += len(cmd.commands) if isinstance(cmd, _Batch) else 1
+        self.commands_routed += routed
+        return routed
+
+    def step(self) -> dict:
+        """Apply pending commands and advance one tick, without pacing."""
+        self.drain_inbox()
+        balance = self.spacecraft.tick(self.dt_s)
+        if self.journal is not None:
+            self.journal.end_tick(self.dt_s)
+        self.tick_count += 1
+        return balance
+
+    def _deadline(self, tick: int) -> float:
+        return self._epoch + (tick - self._epoch_tick) * self.dt_s / self.time_scale
+
+    async def run(self, max_ticks: Optional[int] = None) -> None:
+        self._epoch = self.clock()
+        self._epoch_tick = self.tick_count
+        stop_tick = None if max_ticks is None else self.tick_count + max_ticks
+
+        while stop_tick is None or self.tick_count < stop_tick:
+            deadline = self._deadline(self.tick_count + 1)
+            delay = deadline - self.clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                behind = int(-delay * self.time_scale / self.dt_s)
+                if behind > self.max_catch_up_ticks:
+                    # too far behind to catch up; re-anchor the clock instead of spiralling
+                    self.dropped_ticks += behind
+                    self._epoch = self.clock()
+                    self._epoch_tick = self.tick_count
+                    deadline = self._epoch
+                # let command producers run between back-to-back catch-up ticks
+                await asyncio.sleep(0)
+
+            self.max_lag_s = max(self.max_lag_s, self.clock() - deadline)
+            self.step()
+
+    def start(self, max_ticks: Optional[int] = None) -> asyncio.Task:
+        if self.running:
+            raise RuntimeError("Runtime already running")
+        self._get_inbox()
+        self._task = asyncio.get_running_loop().create_task(self.run(max_ticks=max_ticks))
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # answer commands that will never see a tick
+        self.drain_inbox()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+from typing import Dict, List, Optional
+
+from hikerservespacecraft.runtime.command_protocol import BATCH, COMMAND, ERROR, ProtocolError, encode_frame, \
+    read_frame
+
+
+class CommandError(RuntimeError):
+    """The server could not route a request (as opposed to a command that failed)."""
+
+
+class _Connection:
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = itertools.count(1)
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_responses())
+
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+
+    async def send(self, requests: List[tuple]) -> List[asyncio.Future]:
+        """
+        Write (kind, payload) requests in one go and return a future per request, once the
+        transport buffer has drained below its high-water mark.
+        """
+        loop = asyncio.get_running_loop()
+        frames = []
+        futures = []
+        for kind, payload in requests:
+            request_id = next(self._request_ids) & 0xFFFFFFFF
+            future = loop.create_future()
+            self.pending[request_id] = future
+            frames.append(encode_frame(request_id, kind, payload))
+            futures.append(future)
+        self.writer.write(b"".join(frames))
+        await self.writer.drain()
+        return futures
+
+    async def _read_responses(self) -> None:
+        error: Exception = ConnectionError("Connection closed by the command server")
+        try:
+            while True:
+                request_id, kind, payload = await read_frame(self.reader)
+                future = self.pending.pop(request_id, None)
+                if kind == ERROR:
+                    message = payload.get("message") if isinstance(payload, dict) else payload
+                    if future is None:
+                        error = CommandError(message)
+                        return
+                    if not future.done():
+                        future.set_exception(CommandError(message))
+                elif future is not None and not future.done():
+                    future.set_result(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ProtocolError as e:
+            error = e
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.pending.clear()
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+
+class CommandClient:
+    """
+    Client for a CommandServer with a small connection pool.
+
+    Each request goes out on the least busy open connection; a new connection is opened
+    (up to `pool_size`) only when every open one already has requests in flight. Responses
+    are the to_dict() payloads of the routed commands. `execute_many` pipelines many
+    commands in a single write; `execute_batch` sends them as one batch request.
+    """
+
+    def __init__(self, path: Optional[str] = None, host: str = "127.0.0.1", port: Optional[int] = None,
+                 pool_size: int = 4):
+        if (path is None) == (port is None):
+            raise ValueError("Give either a Unix socket path or a TCP port")
+        self.path = path
+        self.host = host
+        self.port = port
+        self.pool_size = max(1, pool_size)
+        self._connections: List[_Connection] = []
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _open(self) -> _Connection:
+        if self.path is not None:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        return _Connection(reader, writer)
+
+    async def _acquire(self) -> _Connection:
+        self._connections = [connection for connection in self._connections if not connection.closed]
+        idle = min(self._connections, key=lambda connection: len(connection.pending), default=None)
+        if idle is not None and (not idle.pending or len(self._connections) >= self.pool_size):
+            return idle
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if len(self._connections) < self.pool_size:
+                self._connections.append(await self._open())
+        return min(self._connections, key=lambda connection: len(connection.pending))
+
+    async def execute(self, cmd: dict) -> dict:
+        connection = await self._acquire()
+        (future,) = await connection.send([(COMMAND, cmd)])
+        return await future
+
+    async def execute_many(self, cmds: List[dict]) -> List[dict]:
+        """Pipeline the commands on one connection; responses come back in command order."""
+        if not cmds:
+            return []
+        connection = await self._acquire()
+        futures = await connection.send([(COMMAND, cmd) for cmd in cmds])
+        return list(await asyncio.gather(*futures))
+
+    async def execute_batch(self, cmds: List[dict], stop_on_failure: bool = False) -> List[dict]:
+        """Route the commands server-side with SpacecraftComputer.route_commands."""
+        connection = await self._acquire()
+        (future,) = await connection.send([(BATCH, {"commands": cmds, "stop_on_failure": stop_on_failure})])
+        return await future
+
+    async def close(self) -> None:
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            await connection.close()
@@ -0,0 +1,161 @@
+"""
+Length-prefixed binary framing for the command server.
+
+Every frame is a big-endian header `length (u32) | request id (u32) | kind (u8)` followed
+by `length - 5` bytes of payload, where `length` counts everything after itself. Payloads
+use a small tagged binary encoding of None, bool, int, float, str, bytes, list and dict,
+which is all a command or a command response carries. Requests are answered with a frame
+carrying the same request id, so clients can pipeline any number of requests.
+"""
+import asyncio
+import numbers
+import struct
+from typing import Any, List, Tuple
+
+COMMAND = 1
+BATCH = 2
+RESPONSE = 0x81
+BATCH_RESPONSE = 0x82
+ERROR = 0xFF
+
+HEADER = struct.Struct(">IIB")
+_LENGTH = struct.Struct(">I")
+_INT64 = struct.Struct(">q")
+_FLOAT64 = struct.Struct(">d")
+
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+MAX_NESTING = 64
+
+_NONE, _TRUE, _FALSE, _INT, _BIG_INT, _FLOAT, _STR, _BYTES, _LIST, _DICT = b"NTFiIdsblm"
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def _encode(value: Any, out: List[bytes], depth: int) -> None:
+    if depth > MAX_NESTING:
+        raise ProtocolError("Value nested too deeply")
+    if value is None:
+        out.append(b"N")
+    elif value is True:
+        out.append(b"T")
+    elif value is False:
+        out.append(b"F")
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(b"s" + _LENGTH.pack(len(data)))
+        out.append(data)
+    elif isinstance(value, numbers.Integral):
+        value = int(value)
+        if _INT64_MIN <= value <= _INT64_MAX:
+            out.append(b"i" + _INT64.pack(value))
+        else:
+            data = str(value).encode("ascii")
+            out.append(b"I" + _LENGTH.pack(len(data)))
+            out.append(data)
+    elif isinstance(value, numbers.Real):
+        out.append(b"d" + _FLOAT64.pack(float(value)))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        out.append(b"b" + _LENGTH.pack(len(data)))
+        out.append(data)
+    elif isinstance(value, (list, tuple)):
+        out.append(b"l" + _LENGTH.pack(len(value)))
+        for item in value:
+            _encode(item, out, depth + 1)
+    elif isinstance(value, dict):
+        out.append(b"m" + _LENGTH.pack(len(value)))
+        for key, item in value.items():
+            _encode(str(key), out, depth + 1)
+            _encode(item, out, depth + 1)
+    elif hasattr(value, "to_dict"):
+        _encode(value.to_dict(), out, depth)
+    elif hasattr(value, "tolist"):
+        _encode(value.tolist(), out, depth)
+    else:
+        raise ProtocolError(f"Cannot encode {type(value).__name__}")
+
+
+def encode_value(value: Any) -> bytes:
+    out: List[bytes] = []
+    _encode(value, out, 0)
+    return b"".join(out)
+
+
+def _decode(data: memoryview, offset: int, depth: int) -> Tuple[Any, int]:
+    if depth > MAX_NESTING:
+        raise ProtocolError("Value nested too deeply")
+    if offset >= len(data):
+        raise ProtocolError("Truncated payload")
+    tag = data[offset]
+    offset += 1
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _INT:
+        return _INT64.unpack_from(data, offset)[0], offset + 8
+    if tag == _FLOAT:
+        return _FLOAT64.unpack_from(data, offset)[0], offset + 8
+    if tag in (_STR, _BIG_INT, _BYTES):
+        (size,) = _LENGTH.unpack_from(data, offset)
+        offset += 4
+        if offset + size > len(data):
+            raise ProtocolError("Truncated payload")
+        raw = bytes(data[offset:offset + size])
+        offset += size
+        if tag == _BYTES:
+            return raw, offset
+        text = raw.decode("utf-8")
+        return (int(text) if tag == _BIG_INT else text), offset
+    if tag == _LIST:
+        (count,) = _LENGTH.unpack_from(data, offset)
+        offset += 4
+        items = []
+        for _ in range(count):
+            item, offset = _decode(data, offset, depth + 1)
+            items.append(item)
+        return items, offset
+    if tag == _DICT:
+        (count,) = _LENGTH.unpack_from(data, offset)
+        offset += 4
+        result = {}
+        for _ in range(count):
+            key, offset = _decode(data, offset, depth + 1)
+            if not isinstance(key, str):
+                raise ProtocolError(f"Dictionary keys must be strings, got {type(key).__name__}")
+            result[key], offset = _decode(data, offset, depth + 1)
+        return result, offset
+    raise ProtocolError(f"Unknown tag {tag!r}")
+
+
+def decode_value(data: bytes) -> Any:
+    view = memoryview(data)
+    try:
+        value, offset = _decode(view, 0, 0)
+    except ProtocolError:
+        raise
+    except (struct.error, ValueError) as e:
+        raise ProtocolError(f"Malformed payload: {e}") from e
+    if offset != len(view):
+        raise ProtocolError("Trailing bytes after payload")
+    return value
+
+
+def encode_frame(request_id: int, kind: int, value: Any) -> bytes:
+    payload = encode_value(value)
+    return HEADER.pack(len(payload) + HEADER.size - _LENGTH.size, request_id, kind) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, Any]:
+    """Read one frame and return (request id, kind, decoded payload). Raises IncompleteReadError at EOF."""
+    header = await reader.readexactly(HEADER.size)
+    length, request_id, kind = HEADER.unpack(header)
+    if length < HEADER.size - _LENGTH.size or length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Invalid frame length {length}")
+    payload = await reader.readexactly(length - (HEADER.size - _LENGTH.size))
+    return request_id, kind, decode_value(payload)
@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import os
+from typing import Optional, Set
+
+from hikerservespacecraft.runtime.async_runtime import AsyncSimulationRuntime
+from hikerservespacecraft.runtime.command_protocol import BATCH, BATCH_RESPONSE, COMMAND, ERROR, RESPONSE, \
+    ProtocolError, encode_frame, read_frame
+from hikerservespacecraft.spacecraft import Spacecraft
+
+
+class CommandServer:
+    """
+    Serves a spacecraft's command router over a Unix domain socket or localhost TCP.
+
+    Clients send COMMAND frames (one command dict) or BATCH frames
+    ({"commands": [...], "stop_on_failure": bool}, routed with route_commands) and may
+    pipeline as many as they like; every request is answered, in order, with a frame
+    carrying its request id. With a `runtime`, commands go through its inbox and are
+    applied at the next tick boundary; otherwise they are routed immediately.
+    """
+
+    def __init__(self, spacecraft: Spacecraft, runtime: Optional[AsyncSimulationRuntime] = None):
+        self.spacecraft = spacecraft
+        self.runtime = runtime
+        self.commands_served: int = 0
+        self.connections: int = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._unix_path: Optional[str] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        self._check_not_started()
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=path)
+        self._unix_path = path
+        return self._server
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        self._check_not_started()
+        self._server = await asyncio.start_server(self._handle_connection, host=host, port=port)
+        return self._server
+
+    def _check_not_started(self) -> None:
+        if self._server is not None:
+            raise RuntimeError("Command server already started")
+
+    @property
+    def address(self):
+        """Socket path, or (host, port) of the first TCP listener."""
+        if self._server is None:
+            return None
+        return self._server.sockets[0].getsockname()
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        # drop open connections too; wait_closed only returns once they are gone
+        handlers = list(self._handlers)
+        for handler in handlers:
+            handler.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        if self._unix_path is not None and os.path.exists(self._unix_path):
+            os.unlink(self._unix_path)
+        self._unix_path = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _dispatch(self, kind: int, payload) -> asyncio.Future:
+        if not isinstance(payload, dict):
+            raise ProtocolError("Request payload must be a dict")
+
+        if kind == BATCH:
+            commands = payload.get("commands")
+            if not isinstance(commands, list):
+                raise ProtocolError("Batch payload needs a list of commands")
+            stop_on_failure = bool(payload.get("stop_on_failure", False))
+            self.commands_served += len(commands)
+            if self.runtime is not None:
+                return self.runtime.submit_batch(commands, stop_on_failure=stop_on_failure)
+            route = functools.partial(self.spacecraft.spacecraft_computer.route_commands, commands,
+                                      stop_on_failure=stop_on_failure)
+        elif kind == COMMAND:
+            self.commands_served += 1
+            if self.runtime is not None:
+                return self.runtime.submit(payload)
+            route = functools.partial(self.spacecraft.spacecraft_computer.route_command, cmd=payload)
+        else:
+            raise ProtocolError(f"Unknown request kind {kind}")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            future.set_result(route())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        responses: asyncio.Queue = asyncio.Queue()
+        writer_task = asyncio.get_running_loop().create_task(self._write_responses(responses, writer))
+        try:
+            while True:
+                try:
+                    request_id, kind, payload = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ProtocolError as e:
+                    # framing is lost; report and drop the connection
+                    responses.put_nowait((0, ERROR, _failed(e)))
+                    break
+
+                try:
+                    future = self._dispatch(kind, payload)
+                except ProtocolError as e:
+                    future = _failed(e)
+                responses.put_nowait((request_id, kind, future))
+        except asyncio.CancelledError:
+            writer_task.cancel()
+        finally:
+            responses.put_nowait(None)
+            try:
+                await writer_task
+            except asyncio.CancelledError:
+                # closed by close() while responses were still owed
+                pass
+            writer.close()
+            self._handlers.discard(handler)
+            self.connections -= 1
+
+    @staticmethod
+    async def _write_responses(responses: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            request_id, kind, future = item
+            try:
+                result = await future
+                frame = encode_frame(request_id, BATCH_RESPONSE if kind == BATCH else RESPONSE, result)
+            except Exception as e:
+                frame = encode_frame(request_id, ERROR, {"message": f"{type(e).__name__}: {e}"})
+            try:
+                writer.write(frame)
+                # coalesce the responses to a pipelined burst into as few writes as possible
+                if responses.empty():
+                    await writer.drain()
+            except ConnectionError:
+                return
+
+
+def _failed(error: Exception) -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    future.set_exception(error)
+    return future
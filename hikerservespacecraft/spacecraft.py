@@ -1,7 +1,12 @@
 import uuid
-from typing import List
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from hikerservespacecraft.active_component import ActiveComponent
+from hikerservespacecraft.array_backed import ArrayBacked, ArrayField, is_array_bound
+from hikerservespacecraft.component_registry import ComponentRegistry
+from hikerservespacecraft.dirty_tracking import DirtyTracked
 from hikerservespacecraft.hull import Hull
 from hikerservespacecraft.payloads.computer.spacecraft_computer import SpacecraftComputer
 from hikerservespacecraft.payloads.propulsion.thruster import Thruster
@@ -10,8 +15,14 @@ from hikerservespacecraft.spacecraft_bus import SpacecraftBus, PowerBus
 from hikerservespacecraft.tickable import Tickable
 
 
-class Spacecraft(Tickable):
+class Spacecraft(ArrayBacked, DirtyTracked, Tickable):
     """A spacecraft with various components, a spacecraft bus, and a power bus."""
+    __serialize_exclude__ = {"_registry"}
+
+    # translational state; stored in the fleet TranslationalPropagator arrays while bound to one
+    position_m = ArrayField(shape=(3,))
+    velocity_m_s = ArrayField(shape=(3,))
+    mass = ArrayField()
 
     def __init__(self, name, ident: str = None, hull: Hull = None):
         self.name: str = name
@@ -28,15 +39,46 @@ class Spacecraft(Tickable):
                                                       mass=10,
                                                       volume=0.1)
         self.mass: float = 0  # in kg
-
-    def get_propulsion_components(self) -> List[ActiveComponent]:
-        propulsion_components = []
-        for component in self.spacecraft_components:
-            if isinstance(component, Thruster):
-                propulsion_components.append(component)
-        return propulsion_components
+        self.position_m: np.ndarray = np.zeros(3)
+        self.velocity_m_s: np.ndarray = np.zeros(3)
+
+    def get_component_registry(self) -> ComponentRegistry:
+        """Indexes over spacecraft_components by name, category, power_type and class."""
+        # derived from spacecraft_components, so it is not serialized and is rebuilt on first use after loading
+        registry = self.__dict__.get("_registry")
+        if registry is None:
+            registry = self._registry = ComponentRegistry(self.spacecraft_components)
+        return registry
+
+    def get_component(self, name: str) -> Optional[ActiveComponent]:
+        return self.get_component_registry().get(name)
+
+    def get_propulsion_components(self) -> Tuple[ActiveComponent, ...]:
+        return self.get_component_registry().by_class(Thruster)
+
+    def get_net_thrust(self) -> np.ndarray:
+        """Sum of the thrust force vectors of all propulsion components."""
+        thrust = np.zeros(3)
+        for component in self.get_propulsion_components():
+            thrust += component.get_thrust_force()
+        return thrust
+
+    def propagate(self, dt_s: float) -> None:
+        """
+        Integrate translational motion over dt_s under the current net thrust.
+        Thrust is constant within a call, so the update is exact (and identical to the
+        fleet propagator's velocity Verlet step without an external field).
+        """
+        if dt_s <= 0:
+            return
+        acceleration = self.get_net_thrust() / self.mass if self.mass > 0 else np.zeros(3)
+        velocity = np.asarray(self.velocity_m_s, dtype=float)
+        self.position_m = self.position_m + velocity * dt_s + 0.5 * acceleration * dt_s * dt_s
+        self.velocity_m_s = velocity + acceleration * dt_s
 
     def add_spacecraft_component(self, component: ActiveComponent) -> None:
+        if not self.get_component_registry().add(component):
+            raise ValueError(f"{self.name} already has a component named {component.name}")
         self.spacecraft_components.append(component)
         self.mass += component.mass
 
@@ -45,17 +87,44 @@ class Spacecraft(Tickable):
         else:
             self.spacecraft_bus.add_component(component)
 
+    def remove_spacecraft_component(self, name: str) -> ActiveComponent:
+        component = self.get_component_registry().remove(name)
+        if component is None:
+            raise KeyError(f"{self.name} has no component named {name}")
+        self.spacecraft_components.remove(component)
+        self.mass -= component.mass
 
-
-    def tick(self, dt_s):
-
-        for component in self.power_bus.components.values():
-            component.tick(dt_s)
-
-        for component in self.spacecraft_bus.components.values():
-            component.tick(dt_s)
-
-
+        if isinstance(component, PowerComponent):
+            self.power_bus.remove_component(name)
+        else:
+            self.spacecraft_bus.remove_component(name)
+        # a detached component steps on its own again; schedulers drop it when they see the bus change
+        if is_array_bound(component):
+            component.get_array_engine().remove(component)
+        return component
+
+
+    def tick(self, dt_s) -> dict:
+        self.spacecraft_computer.invalidate_query_cache()
+        power_balance = self.power_bus.tick(dt_s)
+        self.spacecraft_bus.tick(dt_s)
+        # a fleet propagator moves bound spacecraft
+        if not is_array_bound(self):
+            self.propagate(dt_s)
+        return power_balance
+
+    def advance(self, duration_s: float, max_step_s: float = 1.0) -> dict:
+        """
+        Fast-forward the spacecraft by duration_s without commands in between.
+        Components with an analytic form jump in closed form; the rest are stepped at max_step_s.
+        """
+        self.spacecraft_computer.invalidate_query_cache()
+        power_balance = self.power_bus.advance(duration_s, max_step_s)
+        self.spacecraft_bus.advance(duration_s, max_step_s)
+        # a fleet propagator moves bound spacecraft
+        if not is_array_bound(self):
+            self.propagate(duration_s)
+        return power_balance
 
     def __repr__(self):
         return f"Spacecraft(name={self.name}, ident={self.ident}, hull={self.hull})"
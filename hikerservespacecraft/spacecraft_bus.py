@@ -1,22 +1,301 @@
-from typing import Dict
+import math
+from typing import Dict, List, Optional, Tuple
 
+from hikerservespacecraft import instrumentation
 from hikerservespacecraft.active_component import ActiveComponent
-from hikerservespacecraft.power_component import PowerComponent
+from hikerservespacecraft.array_backed import is_array_bound
+from hikerservespacecraft.component_registry import ComponentRegistry
+from hikerservespacecraft.dirty_tracking import DirtyTracked
+from hikerservespacecraft.power_component import PowerComponent, POWER_PRODUCER, POWER_CONSUMER, POWER_STORAGE
+from hikerservespacecraft.tickable import fast_forward, has_analytic_form
 
+# events closer than this (in seconds) are treated as already reached when fast-forwarding
+_FAST_FORWARD_EPS = 1e-12
+
+
+def storage_charge_limit(component, dt_s: float) -> float:
+    """Largest charging flow the storage can accept this tick (rate limit and remaining headroom)."""
+    limit = max(0.0, float(getattr(component, "max_charging_rate_A", 0.0)))
+    if dt_s > 0:
+        headroom = float(component.max_capacity_GJ) - float(component.current_energy_level_GJ)
+        limit = min(limit, max(0.0, headroom) / dt_s)
+    return limit
+
+
+def storage_discharge_limit(component, dt_s: float) -> float:
+    """Largest discharging flow the storage can deliver this tick (rate limit and stored energy)."""
+    limit = max(0.0, float(getattr(component, "max_discharging_rate_A", 0.0)))
+    if dt_s > 0:
+        limit = min(limit, max(0.0, float(component.current_energy_level_GJ)) / dt_s)
+    return limit
+
+
+def _first_positive_root(c0: float, c1: float, c2: float) -> float:
+    """Smallest t > 0 with c0 + c1 * t + c2 * t ** 2 == 0, or inf."""
+    if c2 == 0:
+        if c1 == 0:
+            return math.inf
+        t = -c0 / c1
+        return t if t > _FAST_FORWARD_EPS else math.inf
+
+    discriminant = c1 * c1 - 4 * c2 * c0
+    if discriminant < 0:
+        return math.inf
+    root = math.sqrt(discriminant)
+    candidates = [t for t in ((-c1 - root) / (2 * c2), (-c1 + root) / (2 * c2)) if t > _FAST_FORWARD_EPS]
+    return min(candidates, default=math.inf)
+
+
+def _tick_component(recorder, component, dt_s: float) -> None:
+    if recorder is None:
+        component.tick(dt_s)
+    else:
+        recorder.time_tick(component, dt_s)
+
+
+def _get_bus_registry(bus) -> ComponentRegistry:
+    # derived from bus.components, so it is not serialized and is rebuilt on first use after loading
+    registry = bus.__dict__.get("_registry")
+    if registry is None:
+        registry = bus._registry = ComponentRegistry(bus.components.values())
+    return registry
+
+
+def _remove_bus_component(bus, name: str):
+    component = bus.components.pop(name, None)
+    if component is not None:
+        bus.get_registry().remove(name)
+        bus.version += 1
+    return component
+
+
+class PowerBus(DirtyTracked):
+    """
+    Power bus connecting producers, consumers and storage.
+
+    Each tick the bus advances its producers, balances their delivered power against
+    consumer demand and routes the surplus or deficit to storage, split proportionally
+    to each storage's available charge/discharge rate. Power values are summed as-is;
+    keep units consistent across the components on one bus.
+    """
+    __serialize_exclude__ = {"_registry"}
+    tick_period_s = 0.1
 
-class PowerBus:
     def __init__(self):
         self.components: Dict[str, PowerComponent] = {}
+        # bumped on every membership change so dependants can invalidate caches
+        self.version: int = 0
+
+    def get_registry(self) -> ComponentRegistry:
+        return _get_bus_registry(self)
 
     def add_component(self, component: PowerComponent):
-        if component.name not in self.components:
+        if self.get_registry().add(component):
             self.components[component.name] = component
+            self.version += 1
+
+    def remove_component(self, name: str) -> Optional[PowerComponent]:
+        return _remove_bus_component(self, name)
+
+    def get_components_by_power_type(self, power_type: int) -> tuple:
+        return self.get_registry().by_power_type(power_type)
+
+    def tick_producers(self, dt_s: float) -> float:
+        """Tick producers not owned by a fleet engine and return the total delivered power."""
+        produced = 0.0
+        recorder = instrumentation.active
+        for component in self.get_components_by_power_type(POWER_PRODUCER):
+            if not is_array_bound(component):
+                _tick_component(recorder, component, dt_s)
+            produced += component.get_delivered_power()
+        return produced
+
+    def get_power_demand(self) -> float:
+        return sum(comp.get_power_demand() for comp in self.get_components_by_power_type(POWER_CONSUMER))
+
+    def dispatch(self, dt_s: float, produced: float, demand: float) -> dict:
+        """
+        Route the net power on the bus to storage by setting each storage's current_power_flow_A.
+        Returns the balance: storage flow (positive when charging), plus curtailed surplus and
+        unserved demand that storage could not absorb or cover.
+        """
+        storage = self.get_components_by_power_type(POWER_STORAGE)
+        net = produced - demand
+
+        if net >= 0:
+            limits = [storage_charge_limit(comp, dt_s) for comp in storage]
+            sign = 1.0
+        else:
+            limits = [storage_discharge_limit(comp, dt_s) for comp in storage]
+            sign = -1.0
+
+        total_limit = sum(limits)
+        wanted = abs(net)
+        fraction = min(wanted / total_limit, 1.0) if total_limit > 0 else 0.0
 
-class SpacecraftBus:
+        for comp, limit in zip(storage, limits):
+            comp.current_power_flow_A = sign * limit * fraction
+
+        served = total_limit * fraction
+        return {
+            "produced": produced,
+            "demand": demand,
+            "storage_flow": sign * served,
+            "curtailed": wanted - served if net >= 0 else 0.0,
+            "unserved": wanted - served if net < 0 else 0.0,
+        }
+
+    def tick_storage(self, dt_s: float) -> None:
+        recorder = instrumentation.active
+        for component in self.get_components_by_power_type(POWER_STORAGE):
+            if not is_array_bound(component):
+                _tick_component(recorder, component, dt_s)
+
+    def tick_consumers(self, dt_s: float) -> None:
+        recorder = instrumentation.active
+        for component in self.get_components_by_power_type(POWER_CONSUMER):
+            if not is_array_bound(component):
+                _tick_component(recorder, component, dt_s)
+
+    def is_steady_state(self) -> bool:
+        """
+        True when no producer is ramping and no storage can change its level, so that
+        dispatching again would reproduce the same flows.
+        """
+        return all(comp.is_steady_state() for comp in self.components.values())
+
+    def tick(self, dt_s: float) -> dict:
+        produced = self.tick_producers(dt_s)
+        balance = self.dispatch(dt_s, produced, self.get_power_demand())
+        self.tick_storage(dt_s)
+        self.tick_consumers(dt_s)
+        return balance
+
+    def can_fast_forward(self) -> bool:
+        return all(has_analytic_form(comp) for comp in self.components.values())
+
+    @staticmethod
+    def _continuous_limits(storage: list) -> Tuple[List[float], List[float]]:
+        # the dt -> 0 limit of storage_charge_limit/storage_discharge_limit
+        charge = [0.0 if comp.current_energy_level_GJ >= comp.max_capacity_GJ
+                  else max(0.0, float(getattr(comp, "max_charging_rate_A", 0.0))) for comp in storage]
+        discharge = [0.0 if comp.current_energy_level_GJ <= 0.0
+                     else max(0.0, float(getattr(comp, "max_discharging_rate_A", 0.0))) for comp in storage]
+        return charge, discharge
+
+    @staticmethod
+    def _flow_coefficients(net0: float, slope: float, charge: List[float], discharge: List[float],
+                           span: float) -> List[Tuple[float, float]]:
+        """
+        Storage flows over a segment as (flow at t=0, d flow/dt), for a net power of net0 + slope * t
+        whose regime (charging or not, saturated or not) does not change within `span` seconds.
+        """
+        mid = net0 + slope * span / 2
+        limits = charge if mid >= 0 else discharge
+        total = sum(limits)
+        if total <= 0:
+            return [(0.0, 0.0) for _ in limits]
+        if abs(mid) >= total:
+            sign = 1.0 if mid >= 0 else -1.0
+            return [(sign * limit, 0.0) for limit in limits]
+        return [(limit * net0 / total, limit * slope / total) for limit in limits]
+
+    def advance(self, duration_s: float, max_step_s: float = 1.0) -> dict:
+        """
+        Advance the bus by duration_s in closed form.
+
+        Between discontinuities (a ramp completing, net power changing sign, storage
+        saturating or a storage filling or emptying) delivered power is linear in time, so
+        storage flows are linear and levels quadratic; the bus jumps from one such event to
+        the next. The result is the dt -> 0 limit of repeated tick() calls. Buses holding a
+        component without an analytic form are stepped at max_step_s instead.
+        """
+        if max_step_s <= 0:
+            raise ValueError("max_step_s must be positive")
+        if not self.can_fast_forward():
+            steps = max(1, math.ceil(duration_s / max_step_s))
+            balance = {}
+            for _ in range(steps):
+                balance = self.tick(duration_s / steps)
+            return balance
+
+        producers = self.get_components_by_power_type(POWER_PRODUCER)
+        storage = self.get_components_by_power_type(POWER_STORAGE)
+        demand = self.get_power_demand()
+
+        remaining = float(duration_s)
+        while remaining > 0:
+            net0 = sum(comp.get_delivered_power() for comp in producers) - demand
+            slope = sum(comp.get_delivered_power_slope() for comp in producers)
+            charge, discharge = self._continuous_limits(storage)
+
+            span = min([remaining] + [comp.time_to_discontinuity() for comp in producers])
+            if slope != 0:
+                for boundary in (0.0, sum(charge), -sum(discharge)):
+                    t = (boundary - net0) / slope
+                    if t > _FAST_FORWARD_EPS:
+                        span = min(span, t)
+
+            coefficients = self._flow_coefficients(net0, slope, charge, discharge, span)
+            for comp, (r0, r1) in zip(storage, coefficients):
+                level = comp.current_energy_level_GJ
+                span = min(span,
+                           _first_positive_root(level - comp.max_capacity_GJ, r0, r1 / 2),
+                           _first_positive_root(level, r0, r1 / 2))
+
+            for comp in producers:
+                comp.tick(span)
+            for comp, (r0, r1) in zip(storage, coefficients):
+                level = comp.current_energy_level_GJ + r0 * span + r1 * span * span / 2
+                comp.current_energy_level_GJ = min(max(level, 0.0), float(comp.max_capacity_GJ))
+            for comp in self.get_components_by_power_type(POWER_CONSUMER):
+                fast_forward(comp, span)
+            remaining -= span
+
+        # leave the storage flows as an instantaneous dispatch of the final state would
+        produced = sum(comp.get_delivered_power() for comp in producers)
+        charge, discharge = self._continuous_limits(storage)
+        coefficients = self._flow_coefficients(produced - demand, 0.0, charge, discharge, 0.0)
+        for comp, (r0, _) in zip(storage, coefficients):
+            comp.current_power_flow_A = r0
+
+        net = produced - demand
+        served = sum(r0 for r0, _ in coefficients)
+        return {
+            "produced": produced,
+            "demand": demand,
+            "storage_flow": served,
+            "curtailed": net - served if net >= 0 else 0.0,
+            "unserved": served - net if net < 0 else 0.0,
+        }
+
+
+class SpacecraftBus(DirtyTracked):
+    __serialize_exclude__ = {"_registry"}
 
     def __init__(self):
         self.components: Dict[str, ActiveComponent] = {}
+        # bumped on every membership change so dependants can invalidate caches
+        self.version: int = 0
+
+    def get_registry(self) -> ComponentRegistry:
+        return _get_bus_registry(self)
 
     def add_component(self, active_component: ActiveComponent):
-        if active_component.name not in self.components:
+        if self.get_registry().add(active_component):
             self.components[active_component.name] = active_component
+            self.version += 1
+
+    def remove_component(self, name: str) -> Optional[ActiveComponent]:
+        return _remove_bus_component(self, name)
+
+    def tick(self, dt_s: float) -> None:
+        # components bound to a fleet engine are stepped by that engine, not here
+        recorder = instrumentation.active
+        for component in self.components.values():
+            if not is_array_bound(component):
+                _tick_component(recorder, component, dt_s)
+
+    def advance(self, duration_s: float, max_step_s: float = 1.0) -> None:
+        for component in self.components.values():
+            fast_forward(component, duration_s, max_step_s)
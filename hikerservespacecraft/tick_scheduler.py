@@ -0,0 +1,141 @@
+import heapq
+import itertools
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from hikerservespacecraft.array_backed import is_array_bound
+from hikerservespacecraft.tickable import Tickable
+
+POWER_BUS_ENTRY = "power_bus"
+
+
+class _ScheduleEntry:
+
+    def __init__(self, name: str, target, period_s: float):
+        self.name = name
+        self.target = target
+        self.period_s = period_s
+        self.last_tick_s = 0.0
+        self.sleeping = False
+
+
+class TickScheduler(Tickable):
+    """
+    Multi-rate tick driver for a single spacecraft.
+
+    The power bus (ticked as one unit so dispatch stays consistent) and every spacecraft
+    bus component are scheduled at their class' `tick_period_s` from a priority queue keyed
+    on next-due time; each tick receives the time elapsed since that entry last ran.
+    Entries that are inactive or report `is_steady_state()` go to sleep and are not ticked
+    again until woken by a command routed through the spacecraft computer, by a registered
+    watch predicate turning true, or by an explicit `wake()`. Components added to or removed
+    from the spacecraft bus are picked up on the next tick. Like Spacecraft.tick, every
+    scheduler tick also propagates the spacecraft unless a fleet propagator moves it.
+    """
+
+    def __init__(self, spacecraft):
+        self.spacecraft = spacecraft
+        self.now_s: float = 0.0
+        self.tick_calls: int = 0
+
+        self._entries: Dict[str, _ScheduleEntry] = {}
+        self._queue: List[Tuple[float, int, _ScheduleEntry]] = []
+        self._sequence = itertools.count()
+        self._watches: List[Tuple[Callable[[], bool], Tuple[str, ...]]] = []
+        self._bus_version = None
+
+        self.rebuild()
+        spacecraft.spacecraft_computer.add_command_listener(self.on_command)
+
+    def rebuild(self) -> None:
+        """(Re)collect schedulable entries, e.g. after components were added to the spacecraft."""
+        self._entries = {POWER_BUS_ENTRY: _ScheduleEntry(POWER_BUS_ENTRY, self.spacecraft.power_bus,
+                                                         self.spacecraft.power_bus.tick_period_s)}
+        for name, component in self.spacecraft.spacecraft_bus.components.items():
+            if not is_array_bound(component):
+                self._entries[name] = _ScheduleEntry(name, component, component.tick_period_s)
+
+        self._queue = []
+        for entry in self._entries.values():
+            entry.last_tick_s = self.now_s
+            self._push(entry, self.now_s)
+        self._bus_version = self.spacecraft.spacecraft_bus.version
+
+    def _sync_components(self) -> None:
+        components = self.spacecraft.spacecraft_bus.components
+        for name, entry in list(self._entries.items()):
+            if name != POWER_BUS_ENTRY and components.get(name) is not entry.target:
+                del self._entries[name]
+                # its queued slot is skipped like a sleeping entry's
+                entry.sleeping = True
+        for name, component in components.items():
+            if name not in self._entries and not is_array_bound(component):
+                entry = _ScheduleEntry(name, component, component.tick_period_s)
+                entry.last_tick_s = self.now_s
+                self._entries[name] = entry
+                self._push(entry, self.now_s)
+        self._bus_version = self.spacecraft.spacecraft_bus.version
+
+    def _push(self, entry: _ScheduleEntry, due_s: float) -> None:
+        heapq.heappush(self._queue, (due_s, next(self._sequence), entry))
+
+    def wake(self, name: str) -> None:
+        entry = self._entries.get(name)
+        if entry is None or not entry.sleeping:
+            return
+        # nothing changed while asleep, so the idle time is not integrated
+        entry.sleeping = False
+        entry.last_tick_s = self.now_s
+        self._push(entry, self.now_s)
+
+    def on_command(self, device_id: str, command: str) -> None:
+        if device_id in self.spacecraft.power_bus.components:
+            self.wake(POWER_BUS_ENTRY)
+        else:
+            self.wake(device_id)
+
+    def watch(self, predicate: Callable[[], bool], wake: Iterable[str]) -> None:
+        """Wake the named entries whenever predicate() is true before a scheduler tick."""
+        self._watches.append((predicate, tuple(wake)))
+
+    def _is_idle(self, entry: _ScheduleEntry) -> bool:
+        if not getattr(entry.target, "is_active", True):
+            return True
+        return entry.target.is_steady_state()
+
+    def tick(self, dt_s: float) -> None:
+        if self.spacecraft.spacecraft_bus.version != self._bus_version:
+            self._sync_components()
+
+        for predicate, names in self._watches:
+            if predicate():
+                for name in names:
+                    self.wake(name)
+
+        self.now_s += dt_s
+
+        queue = self._queue
+        ran = []
+        while queue and queue[0][0] <= self.now_s:
+            _, _, entry = heapq.heappop(queue)
+            if entry.sleeping:
+                continue
+
+            elapsed = self.now_s - entry.last_tick_s
+            if elapsed > 0 and getattr(entry.target, "is_active", True):
+                entry.target.tick(elapsed)
+                self.tick_calls += 1
+            entry.last_tick_s = self.now_s
+            ran.append(entry)
+
+        if ran:
+            self.spacecraft.spacecraft_computer.invalidate_query_cache()
+        # a fleet propagator moves bound spacecraft
+        if not is_array_bound(self.spacecraft):
+            self.spacecraft.propagate(dt_s)
+
+        # re-queue after draining so zero-period entries run once per scheduler tick
+        for entry in ran:
+            if self._is_idle(entry):
+                entry.sleeping = True
+            else:
+                self._push(entry, self.now_s + entry.period_s)
@@ -1,7 +1,50 @@
 import abc
+import math
 
 
 class Tickable(abc.ABC):
+    # preferred update period for the TickScheduler; 0 means every scheduler tick
+    tick_period_s: float = 0.0
+    # True if tick(dt) is exact for any dt up to time_to_discontinuity(), so it can be fast-forwarded
+    supports_fast_forward: bool = False
 
     def tick(self, dt_s: float) -> dict:
         pass
+
+    def is_steady_state(self) -> bool:
+        """Return True if tick() would leave the state unchanged until something external changes it."""
+        return False
+
+    def time_to_discontinuity(self) -> float:
+        """Seconds until the dynamics change form, e.g. a ramp completes. Only used when fast-forwarding."""
+        return math.inf
+
+
+def has_analytic_form(tickable: Tickable) -> bool:
+    """True if the tickable can be advanced in closed form; components without a tick() trivially can."""
+    return tickable.supports_fast_forward or type(tickable).tick is Tickable.tick
+
+
+def fast_forward(tickable: Tickable, duration_s: float, max_step_s: float = 1.0) -> None:
+    """
+    Advance a single tickable by duration_s.
+    Analytic tickables jump from discontinuity to discontinuity; others are stepped at max_step_s.
+    """
+    if max_step_s <= 0:
+        raise ValueError("max_step_s must be positive")
+    if duration_s <= 0 or type(tickable).tick is Tickable.tick:
+        return
+
+    if tickable.supports_fast_forward:
+        remaining = duration_s
+        while remaining > 0:
+            step = min(remaining, tickable.time_to_discontinuity())
+            if step <= 0:
+                step = remaining
+            tickable.tick(step)
+            remaining -= step
+        return
+
+    steps = max(1, math.ceil(duration_s / max_step_s))
+    for _ in range(steps):
+        tickable.tick(duration_s / steps)
@@ -0,0 +1,333 @@
+"""
+Delta snapshots of a spacecraft, built from attribute-level dirty tracking.
+
+A DeltaTracker takes one full snapshot (the serialize() document) and then emits deltas
+holding only what changed since the previous document of the chain:
+
+    {"__delta__": DELTA_VERSION, "ident": ..., "sequence": n,
+     "objects": {"spacecraft" | "power_bus" | "spacecraft_bus" | "spacecraft_computer" | "hull":
+                 {attribute: serialized value}},
+     "components": {component name: {attribute: serialized value}},
+     "removed": [component name, ...],
+     "added": [{"name": ..., "buses": [...], "document": serialized component}, ...]}
+
+Changed attributes are the ones assigned since the last document (see DirtyTracked) plus,
+for objects bound to a fleet engine, the ArrayFields whose value moved, since the engines
+write those in place. Every serialized value in a delta is numbered on its own; applying
+it renumbers its "__id__"s and "__ref__"s past the ones already in the document.
+`compact` folds a base document and a chain of deltas back into a full document that
+deserialize() accepts.
+"""
+import copy
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from hikerservespacecraft.array_backed import ArrayField, is_array_bound
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.ser import _plan_for, serialize
+
+DELTA_VERSION = 1
+
+_BUSES = ("power_bus", "spacecraft_bus")
+_PLAIN_TYPES = (int, float, str, bool, type(None))
+_ARRAY_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def _array_fields(cls: type) -> Tuple[str, ...]:
+    names = _ARRAY_FIELDS.get(cls)
+    if names is None:
+        names = _ARRAY_FIELDS[cls] = tuple(dict.fromkeys(
+            name for klass in cls.__mro__ for name, value in vars(klass).items() if isinstance(value, ArrayField)))
+    return names
+
+
+def _serialize_value(value):
+    return value if type(value) in _PLAIN_TYPES else serialize(value)
+
+
+def _same_value(a, b) -> bool:
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    return a == b
+
+
+def _changed_attributes(obj, array_values: dict) -> dict:
+    """
+    Serialized values of the attributes of obj assigned since it was marked clean. For an
+    object bound to a fleet engine, its ArrayFields whose value differs from the one recorded
+    in array_values (which is updated) are included as well.
+    """
+    dirty = obj.get_dirty_attributes()
+    bound = is_array_bound(obj)
+    if not dirty and not bound:
+        return {}
+    plan = _plan_for(type(obj))
+    excluded = plan.exclusions_for(obj)
+    state = plan.get_state(obj)
+    names = set(dirty)
+    if bound:
+        previous = array_values.setdefault(id(obj), {})
+        for name in _array_fields(type(obj)):
+            value = state.get(name)
+            if name not in previous or not _same_value(previous[name], value):
+                previous[name] = value
+                names.add(name)
+    return {name: _serialize_value(state[name]) for name in sorted(names) if name not in excluded and name in state}
+
+
+def is_delta(document) -> bool:
+    return isinstance(document, dict) and "__delta__" in document
+
+
+class DeltaTracker:
+    """Full and delta snapshots of one spacecraft. Call `snapshot()` to start a chain."""
+
+    def __init__(self, spacecraft: Spacecraft):
+        self.spacecraft = spacecraft
+        # sequence number of the last document emitted; the full snapshot is 0
+        self.sequence: int = -1
+        self._members: Dict[str, object] = {}
+        # id(object) -> ArrayField values as of the last document, for objects bound to a fleet engine
+        self._array_values: Dict[int, dict] = {}
+
+    def _tracked_objects(self) -> List[Tuple[str, object]]:
+        sc = self.spacecraft
+        objects = [("spacecraft", sc), ("power_bus", sc.power_bus), ("spacecraft_bus", sc.spacecraft_bus),
+                   ("spacecraft_computer", sc.spacecraft_computer)]
+        if sc.hull is not None:
+            objects.append(("hull", sc.hull))
+        return objects
+
+    def _mark_clean(self) -> None:
+        for _, obj in self._tracked_objects():
+            obj.mark_clean()
+        for component in self.spacecraft.spacecraft_components:
+            component.mark_clean()
+        self._members = {component.name: component for component in self.spacecraft.spacecraft_components}
+        live = {id(obj) for _, obj in self._tracked_objects()} | {id(c) for c in self._members.values()}
+        self._array_values = {key: values for key, values in self._array_values.items() if key in live}
+
+    def snapshot(self) -> dict:
+        """Full serialize() document; starts a new chain of deltas."""
+        document = serialize(self.spacecraft)
+        self._array_values = {}
+        for obj in [obj for _, obj in self._tracked_objects()] + self.spacecraft.spacecraft_components:
+            _changed_attributes(obj, self._array_values)
+        self._mark_clean()
+        self.sequence = 0
+        return document
+
+    def delta(self) -> dict:
+        """Everything that changed since the previous snapshot or delta."""
+        if self.sequence < 0:
+            raise RuntimeError("Take a full snapshot before asking for deltas")
+        sc = self.spacecraft
+
+        objects = {}
+        for path, obj in self._tracked_objects():
+            changes = _changed_attributes(obj, self._array_values)
+            if changes:
+                objects[path] = changes
+
+        current = {component.name: component for component in sc.spacecraft_components}
+        removed = [name for name, component in self._members.items() if current.get(name) is not component]
+        added = []
+        components = {}
+        for name, component in current.items():
+            if self._members.get(name) is not component:
+                added.append({"name": name, "buses": [bus for bus in _BUSES if name in getattr(sc, bus).components],
+                              "document": serialize(component)})
+                continue
+            changes = _changed_attributes(component, self._array_values)
+            if changes:
+                components[name] = changes
+
+        self._mark_clean()
+        self.sequence += 1
+        return {"__delta__": DELTA_VERSION, "ident": sc.ident, "sequence": self.sequence, "objects": objects,
+                "components": components, "removed": removed, "added": added}
+
+
+def _object_locations(value, locations: Optional[dict] = None) -> Dict[int, tuple]:
+    """__id__ -> (container, key) of every object document nested in value."""
+    locations = {} if locations is None else locations
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        for key, child in (node.items() if isinstance(node, dict) else enumerate(node)):
+            if isinstance(child, dict):
+                if "__id__" in child and "__type__" in child:
+                    locations[child["__id__"]] = (node, key)
+                stack.append(child)
+            elif isinstance(child, list):
+                stack.append(child)
+    return locations
+
+
+def _definitions(value) -> Dict[int, dict]:
+    """__id__ -> object document, for every object document in value."""
+    return {number: container[key] for number, (container, key) in _object_locations([value]).items()}
+
+
+def _is_ref(value) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and "__ref__" in value
+
+
+class _Splice:
+    """Copies delta values into a document, renumbering their objects past the ones it has."""
+
+    def __init__(self, document: dict):
+        self.objects = _definitions(document)
+        self.next_id = max(self.objects, default=-1) + 1
+        # object documents dropped from the document, in case something still refers to them
+        self.dropped: Dict[int, dict] = {}
+
+    def copy(self, value):
+        offset = self.next_id
+        result = self._renumbered(value, offset)
+        added = _definitions(result)
+        self.objects.update(added)
+        self.next_id = max(added, default=offset - 1) + 1
+        return result
+
+    def _renumbered(self, value, offset: int):
+        if isinstance(value, list):
+            return [self._renumbered(item, offset) for item in value]
+        if not isinstance(value, dict):
+            return value
+        result = {key: self._renumbered(item, offset) for key, item in value.items()}
+        if "__id__" in result and "__type__" in result:
+            result["__id__"] += offset
+        elif _is_ref(result):
+            result["__ref__"] += offset
+        return result
+
+    def resolve(self, value):
+        """The object document a {"__ref__": id} stands for; other values unchanged."""
+        return self.objects.get(value["__ref__"], value) if _is_ref(value) else value
+
+    def drop(self, value) -> None:
+        self.dropped.update(_definitions(value))
+
+    def update(self, target: dict, changes: dict) -> None:
+        for name in changes:
+            if name in target:
+                self.drop(target[name])
+        target.update(self.copy(changes))
+
+
+def _bus_documents(document: dict, bus: str, splice: _Splice) -> list:
+    """Every document of a bus in a spacecraft document; the computer's bus references are serialized too."""
+    found = []
+    for owner in (document, splice.resolve(document.get("spacecraft_computer"))):
+        bus_document = splice.resolve(owner.get(bus)) if isinstance(owner, dict) else None
+        if isinstance(bus_document, dict) and "components" in bus_document \
+                and not any(bus_document is other for other in found):
+            found.append(bus_document)
+    return found
+
+
+def _component_documents(document: dict, name: str, splice: _Splice) -> list:
+    """Every document of a component in a spacecraft document: its list entry and its bus entries."""
+    candidates = list(document.get("spacecraft_components", ()))
+    for bus in _BUSES:
+        for bus_document in _bus_documents(document, bus, splice):
+            if name in bus_document["components"]:
+                candidates.append(bus_document["components"][name])
+    found = []
+    for candidate in map(splice.resolve, candidates):
+        if isinstance(candidate, dict) and candidate.get("name") == name \
+                and not any(candidate is other for other in found):
+            found.append(candidate)
+    return found
+
+
+def _restore_order(document: dict, dropped: Dict[int, dict]) -> None:
+    """
+    Make every reference in the document follow the object it refers to, as deserialize()
+    needs: the first reference to an object that is defined further on, or was dropped
+    from the document, takes the place of its definition.
+    """
+    locations = _object_locations(document)
+    defined = set()
+
+    def visit(node) -> None:
+        if isinstance(node, dict) and "__id__" in node and "__type__" in node:
+            defined.add(node["__id__"])
+        for key in (list(node) if isinstance(node, dict) else range(len(node))):
+            child = node[key]
+            if _is_ref(child) and child["__ref__"] not in defined:
+                number = child["__ref__"]
+                if number in locations:
+                    container, position = locations.pop(number)
+                    child = node[key] = container[position]
+                    container[position] = {"__ref__": number}
+                elif number in dropped:
+                    child = node[key] = dropped.pop(number)
+                else:
+                    raise ValueError(f"Reference to unknown object {number}")
+            if isinstance(child, (dict, list)):
+                visit(child)
+
+    visit(document)
+
+
+def apply_delta(document: dict, delta: dict) -> None:
+    """Apply one delta to a full spacecraft document in place."""
+    if delta.get("__delta__") != DELTA_VERSION:
+        raise ValueError("Not a delta snapshot")
+    if document.get("ident") != delta["ident"]:
+        raise ValueError(f"Delta for {delta['ident']} cannot be applied to {document.get('ident')}")
+    splice = _Splice(document)
+
+    for name in delta["removed"]:
+        components = document.get("spacecraft_components", [])
+        splice.drop([item for item in components if item.get("name") == name])
+        document["spacecraft_components"] = [item for item in components if item.get("name") != name]
+        for bus in _BUSES:
+            for bus_document in _bus_documents(document, bus, splice):
+                splice.drop(bus_document["components"].pop(name, None))
+
+    objects = delta["objects"]
+    # the spacecraft first: it may have replaced one of the other objects outright
+    for path in sorted(objects, key=lambda p: p != "spacecraft"):
+        if path == "spacecraft":
+            targets = [document]
+        elif path in _BUSES:
+            targets = _bus_documents(document, path, splice)
+        else:
+            targets = [splice.resolve(document[path])]
+        for target in targets:
+            splice.update(target, objects[path])
+
+    for item in delta["added"]:
+        component = splice.copy(item["document"])
+        document.setdefault("spacecraft_components", []).append(component)
+        for bus in item["buses"]:
+            for bus_document in _bus_documents(document, bus, splice):
+                bus_document["components"][item["name"]] = {"__ref__": component["__id__"]}
+
+    for name, changes in delta["components"].items():
+        targets = _component_documents(document, name, splice)
+        if not targets:
+            raise ValueError(f"Delta changes unknown component {name}")
+        for target in targets:
+            splice.update(target, changes)
+
+    _restore_order(document, splice.dropped)
+
+
+def compact(base: dict, deltas: Iterable[dict], base_sequence: Optional[int] = None) -> dict:
+    """
+    Fold a chain of deltas into a copy of the base document. The deltas must be
+    consecutive, starting right after `base_sequence` when that is given.
+    """
+    document = copy.deepcopy(base)
+    sequence = base_sequence
+    for delta in deltas:
+        if sequence is not None and delta.get("sequence") != sequence + 1:
+            raise ValueError(f"Delta {delta.get('sequence')} does not follow {sequence}")
+        apply_delta(document, delta)
+        sequence = delta["sequence"]
+    return document
@@ -0,0 +1,299 @@
+"""
+On-disk fleet snapshot store with random access by spacecraft ident.
+
+Layout, all integers little-endian, every entry and payload aligned to ALIGNMENT bytes:
+
+    header      MAGIC, then index offset, index length, data end, generation (u64 each)
+    entries     u8 kind (PUT or REMOVE), u16 ident length, u64 payload length, ident,
+                padding, payload (a binary snapshot, see utils/snapshot.py)
+    index       u32 count, then per ship: u16 ident length, ident, u64 payload offset,
+                u64 payload length
+
+The index, itself stored like an entry, covers everything written before it; entries
+after it up to the data end form the tail, which readers replay on top of it. Updating a
+ship appends one entry and rewrites the header, so it costs the size of the record; the
+index is rewritten once the tail grows past a quarter of it. Space taken by replaced
+records is reclaimed by `compact()`.
+
+Readers map the file read-only, so any number of processes share its pages through the
+page cache; `refresh()` picks up what a writer committed or compacted since. There must be
+at most one writer at a time.
+"""
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.snapshot import dumps, loads
+
+MAGIC = b"HVFLEET1"
+ALIGNMENT = 64
+
+PUT = 1
+REMOVE = 2
+_INDEX = 3
+
+_HEADER = struct.Struct("<QQQQ")
+_ENTRY = struct.Struct("<BHQ")
+_INDEX_ENTRY = struct.Struct("<QQ")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+_MIN_TAIL_BEFORE_INDEX = 64
+
+
+def _align(offset: int) -> int:
+    return offset + (-offset % ALIGNMENT)
+
+
+def _entry_header(kind: int, ident: bytes, length: int) -> bytes:
+    header = _ENTRY.pack(kind, len(ident), length) + ident
+    return header + bytes(_align(len(header)) - len(header))
+
+
+class FleetStore:
+    """
+    mode "r" opens an existing store read-only, "w" creates or truncates one, and "a"
+    opens one for reading and writing, creating it if missing.
+    """
+
+    def __init__(self, path: str, mode: str = "r", fsync: bool = False):
+        if mode not in ("r", "w", "a"):
+            raise ValueError(f"Unknown mode {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.fsync = fsync
+        # ident -> (payload offset, payload length)
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self._index_offset = 0
+        self._index_length = 0
+        self._data_end = ALIGNMENT
+        self._generation = 0
+        self._tail_entries = 0
+        self._map: Optional[mmap.mmap] = None
+
+        if mode == "r":
+            self._file = open(path, "rb")
+        elif mode == "w" or not os.path.exists(path) or os.path.getsize(path) == 0:
+            self._file = open(path, "w+b")
+            self._write_header()
+            self._file.flush()
+        else:
+            self._file = open(path, "r+b")
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, ident: str) -> bool:
+        return ident in self.index
+
+    def idents(self) -> List[str]:
+        return list(self.index)
+
+    # -- reading
+
+    def _remap(self) -> mmap.mmap:
+        # arrays handed out by get(copy=False) keep the old mapping alive until they go away
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _view(self, end: int) -> mmap.mmap:
+        if self._map is None or len(self._map) < end:
+            return self._remap()
+        return self._map
+
+    def _load(self) -> None:
+        data = self._view(ALIGNMENT)
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a fleet store")
+        index_offset, index_length, data_end, generation = _HEADER.unpack_from(data, len(MAGIC))
+        data = self._view(data_end)
+
+        self.index = {}
+        if index_length:
+            (count,) = _U32.unpack_from(data, index_offset)
+            offset = index_offset + _U32.size
+            for _ in range(count):
+                (size,) = _U16.unpack_from(data, offset)
+                ident = data[offset + 2:offset + 2 + size].decode("utf-8")
+                offset += 2 + size
+                self.index[ident] = _INDEX_ENTRY.unpack_from(data, offset)
+                offset += _INDEX_ENTRY.size
+        self._index_offset = index_offset
+        self._index_length = index_length
+        self._tail_entries = 0
+        self._replay(_align(index_offset + index_length) if index_length else ALIGNMENT, data_end)
+        self._data_end = data_end
+        self._generation = generation
+
+    def _replay(self, offset: int, end: int) -> None:
+        """Apply the entries between offset and end to the in-memory index."""
+        data = self._view(end)
+        while offset < end:
+            kind, size, length = _ENTRY.unpack_from(data, offset)
+            ident_start = offset + _ENTRY.size
+            ident = data[ident_start:ident_start + size].decode("utf-8")
+            payload = _align(ident_start + size)
+            if kind == PUT:
+                self.index[ident] = (payload, length)
+            elif kind == REMOVE:
+                self.index.pop(ident, None)
+            if kind != _INDEX:
+                self._tail_entries += 1
+            offset = _align(payload + length)
+
+    def refresh(self) -> bool:
+        """Pick up changes committed by a writer since the store was opened. Returns True if any."""
+        if os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino:
+            # compacted into a new file
+            self._close_file()
+            self._file = open(self.path, "rb" if self.mode == "r" else "r+b")
+            self._load()
+            return True
+        self._file.seek(len(MAGIC))
+        header = self._file.read(_HEADER.size)
+        index_offset, index_length, data_end, generation = _HEADER.unpack(header)
+        if generation == self._generation:
+            return False
+        if index_offset == self._index_offset and data_end >= self._data_end:
+            self._replay(self._data_end, data_end)
+            self._data_end = data_end
+            self._generation = generation
+        else:
+            self._load()
+        return True
+
+    def get_raw(self, ident: str) -> memoryview:
+        """The encoded record of a ship, as a view of the mapped file."""
+        offset, length = self.index[ident]
+        return memoryview(self._view(offset + length))[offset:offset + length]
+
+    def get(self, ident: str, copy: bool = True) -> Spacecraft:
+        """
+        Decode one ship. With copy=False its arrays are read-only views of the mapped file
+        instead of a private copy of the record.
+        """
+        record = self.get_raw(ident)
+        return loads(bytearray(record) if copy else record)
+
+    def __iter__(self) -> Iterator[Spacecraft]:
+        for ident in list(self.index):
+            yield self.get(ident)
+
+    def is_current(self, spacecraft: Spacecraft) -> bool:
+        """True if the stored record of this ship encodes exactly its current state."""
+        return spacecraft.ident in self.index and self.get_raw(spacecraft.ident) == dumps(spacecraft)
+
+    # -- writing
+
+    def _check_writable(self) -> None:
+        if self.mode == "r":
+            raise PermissionError(f"{self.path} was opened read-only")
+
+    def _write_header(self) -> None:
+        self._file.seek(0)
+        self._file.write(MAGIC + _HEADER.pack(self._index_offset, self._index_length, self._data_end,
+                                              self._generation))
+        self._file.write(bytes(ALIGNMENT - len(MAGIC) - _HEADER.size))
+
+    def _append(self, kind: int, ident: str, payload: bytes = b"") -> int:
+        """Write one entry at the data end and return the offset of its payload."""
+        header = _entry_header(kind, ident.encode("utf-8"), len(payload))
+        offset = self._data_end
+        self._file.seek(offset)
+        self._file.write(header)
+        self._file.write(payload)
+        padding = -(offset + len(header) + len(payload)) % ALIGNMENT
+        if padding:
+            self._file.write(bytes(padding))
+        self._data_end = offset + len(header) + len(payload) + padding
+        return offset + len(header)
+
+    def _commit(self) -> None:
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._generation += 1
+        self._write_header()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def put_many(self, spacecraft: Iterable[Spacecraft]) -> int:
+        """Write or replace ships and commit once. Returns the number written."""
+        self._check_writable()
+        written = 0
+        for ship in spacecraft:
+            payload = dumps(ship)
+            offset = self._append(PUT, ship.ident, payload)
+            self.index[ship.ident] = (offset, len(payload))
+            self._tail_entries += 1
+            written += 1
+        self._maybe_write_index()
+        self._commit()
+        return written
+
+    def put(self, spacecraft: Spacecraft) -> None:
+        self.put_many([spacecraft])
+
+    def remove(self, ident: str) -> None:
+        self._check_writable()
+        if ident not in self.index:
+            raise KeyError(ident)
+        self._append(REMOVE, ident)
+        del self.index[ident]
+        self._tail_entries += 1
+        self._maybe_write_index()
+        self._commit()
+
+    def _maybe_write_index(self) -> None:
+        if self._tail_entries > max(_MIN_TAIL_BEFORE_INDEX, len(self.index) // 4):
+            self._write_index()
+
+    def _write_index(self) -> None:
+        parts = [_U32.pack(len(self.index))]
+        for ident, (offset, length) in self.index.items():
+            data = ident.encode("utf-8")
+            parts.append(_U16.pack(len(data)) + data + _INDEX_ENTRY.pack(offset, length))
+        payload = b"".join(parts)
+        self._index_offset = self._append(_INDEX, "", payload)
+        self._index_length = len(payload)
+        self._tail_entries = 0
+
+    def compact(self) -> None:
+        """Rewrite the store with only the live records, and an index covering all of them."""
+        self._check_writable()
+        temporary = f"{self.path}.compact"
+        with FleetStore(temporary, mode="w", fsync=self.fsync) as target:
+            for ident in list(self.index):
+                record = bytes(self.get_raw(ident))
+                offset = target._append(PUT, ident, record)
+                target.index[ident] = (offset, len(record))
+            target._write_index()
+            target._commit()
+        self._close_file()
+        os.replace(temporary, self.path)
+        self._file = open(self.path, "r+b")
+        self._load()
+
+    def _close_file(self) -> None:
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # still exported to arrays from get(copy=False); closed once they are gone
+                pass
+            self._map = None
+        self._file.close()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._close_file()
@@ -0,0 +1,80 @@
+"""
+Streaming fleet snapshots: newline-delimited JSON, one spacecraft per line.
+
+The first line is a header, {"__fleet_stream__": FORMAT_VERSION}; every following line is
+the JSON document serialize() would produce for one spacecraft. Writing streams each
+spacecraft's text straight from the object graph (see ser.iter_serialize), and reading
+parses one line at a time, so memory stays bounded by the largest spacecraft rather than
+the fleet. Works with text or binary file objects, including socket.makefile().
+"""
+import io
+import json
+from typing import Iterable, Iterator
+
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.ser import DeserializationError, deserialize, iter_serialize
+
+FORMAT_VERSION = 1
+
+_HEADER_KEY = "__fleet_stream__"
+
+
+def write_fleet(spacecraft: Iterable[Spacecraft], fp, buffer_size: int = 1 << 16) -> int:
+    """
+    Stream the spacecraft (e.g. `fleet.spacecraft.values()`, or a generator) to fp and
+    return how many were written. Text is handed to fp in chunks of about buffer_size.
+    """
+    encode = not isinstance(fp, io.TextIOBase)
+    pending = []
+    pending_size = 0
+
+    def emit(text: str) -> None:
+        nonlocal pending_size
+        pending.append(text)
+        pending_size += len(text)
+        if pending_size >= buffer_size:
+            flush()
+
+    def flush() -> None:
+        nonlocal pending_size
+        if pending:
+            chunk = "".join(pending)
+            fp.write(chunk.encode("ascii") if encode else chunk)
+            pending.clear()
+            pending_size = 0
+
+    emit(json.dumps({_HEADER_KEY: FORMAT_VERSION}) + "\n")
+    count = 0
+    for ship in spacecraft:
+        for piece in iter_serialize(ship):
+            emit(piece)
+        emit("\n")
+        count += 1
+    flush()
+    return count
+
+
+def iter_documents(fp) -> Iterator[dict]:
+    """Yield the serialized document of each spacecraft without constructing it."""
+    lines = iter(fp)
+    header = next(lines, None)
+    try:
+        version = json.loads(header).get(_HEADER_KEY) if header else None
+    except (ValueError, AttributeError):
+        version = None
+    if version != FORMAT_VERSION:
+        raise DeserializationError("Not a fleet stream")
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise DeserializationError(f"Malformed fleet stream record: {e}")
+
+
+def iter_fleet(fp) -> Iterator[Spacecraft]:
+    """Yield the spacecraft of a fleet stream one at a time."""
+    for document in iter_documents(fp):
+        yield deserialize(document)
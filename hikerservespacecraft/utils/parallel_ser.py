@@ -0,0 +1,181 @@
+"""
+Fleet-scale serialization across worker processes.
+
+`serialize_many` splits the spacecraft into contiguous shards, encodes each shard in a
+worker process and returns the encoded documents in input order; `deserialize_many` does
+the reverse. Shards travel between processes as a capture: a pickle of the object graph that
+honours `__serialize_exclude__`, so callbacks, caches and open journals attached to a
+spacecraft are left behind exactly as serialize() leaves them out.
+
+A restored object graph has to be rebuilt in the calling process whichever way it is
+encoded. Workers do the expensive part, decoding the documents, and hand back captures;
+loading those is plain C unpickling and several times cheaper than decoding, which bounds
+the speedup of `deserialize_many` on multi-core hosts.
+
+Taking a capture is the only part that has to run on the simulation thread, so
+`SnapshotPool.snapshot_in_background` takes one and returns straight away with a future of
+the encoded documents, computed by the pool while the simulation keeps ticking.
+"""
+import copyreg
+import gc
+import io
+import json
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from hikerservespacecraft.utils import snapshot
+from hikerservespacecraft.utils.ser import _plan_for, deserialize, serialize
+
+FORMATS = ("json", "binary")
+
+
+class _CapturePickler(pickle.Pickler):
+
+    def reducer_override(self, obj):
+        cls = type(obj)
+        if isinstance(obj, type):
+            return NotImplemented
+        plan = _plan_for(cls)
+        if not plan.has_dict:
+            return NotImplemented
+        excluded = plan.exclusions_for(obj)
+        if excluded.isdisjoint(obj.__dict__):
+            return NotImplemented
+        state = {name: value for name, value in plan.get_state(obj).items() if name not in excluded}
+        # object first, state after, so reference cycles through obj pickle fine
+        return copyreg.__newobj__, (cls,), state
+
+
+def capture(objects: Any) -> bytes:
+    """A consistent, self-contained copy of an object graph, for encoding elsewhere."""
+    buffer = io.BytesIO()
+    _CapturePickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(objects)
+    return buffer.getvalue()
+
+
+def _load_capture(captured: bytes) -> Any:
+    """Unpickle a capture with the cyclic collector paused; it only slows building a large graph."""
+    if not gc.isenabled():
+        return pickle.loads(captured)
+    gc.disable()
+    try:
+        return pickle.loads(captured)
+    finally:
+        gc.enable()
+
+
+def _encode(obj: Any, fmt: str):
+    if fmt == "binary":
+        return snapshot.dumps(obj)
+    return json.dumps(serialize(obj))
+
+
+def _decode(data, fmt: str) -> Any:
+    if fmt == "binary":
+        return snapshot.loads(data)
+    return deserialize(data)
+
+
+def _encode_shard(captured: bytes, fmt: str) -> list:
+    return [_encode(obj, fmt) for obj in pickle.loads(captured)]
+
+
+def _decode_shard(encoded: list, fmt: str) -> bytes:
+    return capture([_decode(data, fmt) for data in encoded])
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+
+
+class SnapshotPool:
+    """
+    Worker processes for fleet snapshots. Keep one around to avoid paying the worker
+    start-up on every snapshot.
+    """
+
+    def __init__(self, workers: Optional[int] = None, start_method: Optional[str] = None):
+        self.workers: int = max(1, workers or multiprocessing.cpu_count())
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context(start_method))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _shards(self, items: Sequence) -> List[list]:
+        count = min(self.workers, len(items))
+        return [[items[i] for i in rows] for rows in np.array_split(range(len(items)), count)] if count else []
+
+    def snapshot_in_background(self, spacecraft: Sequence, fmt: str = "json") -> Future:
+        """
+        Capture the spacecraft now and encode them in the pool. The returned future yields
+        the encoded documents in input order.
+        """
+        _check_format(fmt)
+        captured = [capture(shard) for shard in self._shards(list(spacecraft))]
+        futures = [self._executor.submit(_encode_shard, shard, fmt) for shard in captured]
+        return _gather(futures, lambda results: [document for shard in results for document in shard])
+
+    def serialize_many(self, spacecraft: Sequence, fmt: str = "json") -> list:
+        """JSON strings (or binary snapshots with fmt="binary") of the spacecraft, in order."""
+        return self.snapshot_in_background(spacecraft, fmt).result()
+
+    def deserialize_many(self, encoded: Sequence, fmt: str = "json") -> list:
+        """
+        Spacecraft decoded from serialize_many output, in order. Shards are decoded in the
+        pool; the calling thread only unpickles their captures, in order, while later shards
+        are still decoding.
+        """
+        _check_format(fmt)
+        futures = [self._executor.submit(_decode_shard, shard, fmt) for shard in self._shards(list(encoded))]
+        return [obj for future in futures for obj in _load_capture(future.result())]
+
+
+def _gather(futures: List[Future], combine) -> Future:
+    """One future for the combined results of several, failing with the first error."""
+    gathered: Future = Future()
+    gathered.set_running_or_notify_cancel()
+    lock = threading.Lock()
+    remaining = [len(futures)]
+
+    def done(future: Future) -> None:
+        with lock:
+            if gathered.done():
+                return
+            if future.exception() is not None:
+                gathered.set_exception(future.exception())
+                return
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        gathered.set_result(combine([f.result() for f in futures]))
+
+    if not futures:
+        gathered.set_result(combine([]))
+    for future in futures:
+        future.add_done_callback(done)
+    return gathered
+
+
+def serialize_many(spacecraft: Sequence, fmt: str = "json", workers: Optional[int] = None,
+                   start_method: Optional[str] = None) -> list:
+    with SnapshotPool(workers=workers, start_method=start_method) as pool:
+        return pool.serialize_many(spacecraft, fmt)
+
+
+def deserialize_many(encoded: Sequence, fmt: str = "json", workers: Optional[int] = None,
+                     start_method: Optional[str] = None) -> list:
+    with SnapshotPool(workers=workers, start_method=start_method) as pool:
+        return pool.deserialize_many(encoded, fmt)
@@ -4,13 +4,12 @@ import inspect
 import json
 import pkgutil
 import dataclasses
-from typing import Any, Dict, Iterable, Set
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
 import numpy as np
 
 from hikerservespacecraft.hull import Hull
 from hikerservespacecraft.spacecraft import Spacecraft
 from hikerservespacecraft.spacecraft_bus import SpacecraftBus, PowerBus
-from hikerservespacecraft.spacecraft_constructor import get_initial_spacecraft
 
 
 class SerializationError(Exception):
@@ -30,162 +29,475 @@ dataclass field metadata `metadata={'serialize': False}`, and `__serialize__` /
 
 
 extra_classes={}
-core = {cls.__name__: cls for cls in [Spacecraft, Hull, SpacecraftBus, PowerBus]}
-_classes = {**core, **(extra_classes or {})}
-# payloads are discovered lazily during deserialize
 
-
-def _load_payload_classes() -> Dict[str, type]:
-
-    payload_classes: Dict[str, type] = {}
+# fully qualified type tag -> class, for everything deserialize may construct
+_TYPE_REGISTRY: Dict[str, type] = {}
+# bare class name -> class, for documents written before tags were qualified; None when ambiguous
+_SHORT_NAMES: Dict[str, Optional[type]] = {}
+_payloads_discovered = False
+
+
+def type_tag(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def register_type(cls: Optional[type] = None, *, tag: Optional[str] = None):
+    """
+    Make a class constructible by deserialize, under its fully qualified name (or `tag`).
+    Usable as a plain call or as a class decorator.
+    """
+    def register(klass: type) -> type:
+        klass_tag = tag or type_tag(klass)
+        existing = _TYPE_REGISTRY.get(klass_tag)
+        if existing is not None and existing is not klass:
+            raise ValueError(f"Type tag {klass_tag} is already registered to {existing!r}")
+        _TYPE_REGISTRY[klass_tag] = klass
+        short_name = klass.__name__
+        if _SHORT_NAMES.setdefault(short_name, klass) is not klass:
+            _SHORT_NAMES[short_name] = None
+        return klass
+
+    return register if cls is None else register(cls)
+
+
+def _discover_payload_classes() -> None:
+    """Import every payload module and register its classes, once."""
+    global _payloads_discovered
+    if _payloads_discovered:
+        return
+    _payloads_discovered = True
+    for klass in (extra_classes or {}).values():
+        register_type(klass)
+
+    pkg_name = "hikerservespacecraft.payloads"
     try:
-        pkg_name = "hikerservespacecraft.payloads"
         pkg = importlib.import_module(pkg_name)
-        for finder, modname, ispkg in pkgutil.walk_packages(pkg.__path__, pkg.__name__ + "."):
-            try:
-                mod = importlib.import_module(modname)
-                for name, obj in inspect.getmembers(mod, inspect.isclass):
-                    if getattr(obj, "__module__", "").startswith(pkg_name):
-                        payload_classes.setdefault(name, obj)
-            except Exception:
-                continue
     except Exception:
-        payload_classes = {}
-
-    _PAYLOAD_CLASSES_CACHE = payload_classes
-    return payload_classes
-
+        return
+    for finder, modname, ispkg in pkgutil.walk_packages(pkg.__path__, pkg.__name__ + "."):
+        try:
+            mod = importlib.import_module(modname)
+        except Exception:
+            continue
+        for name, obj in inspect.getmembers(mod, inspect.isclass):
+            if obj.__module__ == modname:
+                register_type(obj)
 
 
+def resolve_type(tag: str) -> type:
+    """Class for a type tag; bare class names from older documents resolve if unambiguous."""
+    cls = _TYPE_REGISTRY.get(tag)
+    if cls is not None:
+        return cls
+    _discover_payload_classes()
+    if "." in tag:
+        cls = _TYPE_REGISTRY.get(tag)
+    else:
+        cls = _SHORT_NAMES.get(tag)
+        if cls is None and tag in _SHORT_NAMES:
+            raise DeserializationError(f"Ambiguous class type: {tag}")
+    if cls is None:
+        raise DeserializationError(f"Unknown class type: {tag}")
+    return cls
 
 
-_PAYLOAD_CLASSES_CACHE: Dict[str, type] = _load_payload_classes()
+for _core_class in (Spacecraft, Hull, SpacecraftBus, PowerBus):
+    register_type(_core_class)
 
 
 def _collect_exclude_names(obj: Any) -> Set[str]:
     excluded: Set[str] = set()
     cls = type(obj)
     for source in (getattr(obj, "__serialize_exclude__", None), getattr(cls, "__serialize_exclude__", None)):
-        if source is None:
-            continue
-        if isinstance(source, str):
-            excluded.add(source)
-        elif isinstance(source, Iterable):
-            excluded.update(str(x) for x in source)
-        else:
-            excluded.add(str(source))
+        _add_exclude_names(excluded, source)
     return excluded
 
+
+def _add_exclude_names(excluded: Set[str], source: Any) -> None:
+    if source is None:
+        return
+    if isinstance(source, str):
+        excluded.add(source)
+    elif isinstance(source, Iterable):
+        excluded.update(str(x) for x in source)
+    else:
+        excluded.add(str(source))
+
+
 def _should_serialize_attr(obj: Any, name: str) -> bool:
-    # dataclass field metadata override
-    if dataclasses.is_dataclass(obj):
-        for f in dataclasses.fields(obj):
-            if f.name == name and f.metadata.get("serialize") is False:
-                return False
-    if name in _collect_exclude_names(obj):
-        return False
-    return True
+    return name not in _plan_for(type(obj)).exclusions_for(obj)
+
+
+class _SerializationPlan:
+    """
+    How instances of one class are serialized, worked out once per class: which hook
+    supplies the state, which names are excluded (`__serialize_exclude__` and dataclass
+    fields with metadata serialize=False) and which slots to emit.
+    """
+
+    def __init__(self, cls: type):
+        self.type_name = type_tag(cls)
+        self.has_serialize_hook = hasattr(cls, "__serialize__")
+        # object.__getstate__ just hands back __dict__, which vars() does without the call
+        self.uses_getstate = getattr(cls, "__getstate__", object.__getstate__) is not object.__getstate__
+        self.has_dict = any("__dict__" in vars(klass) for klass in cls.__mro__)
+
+        # exclusions accumulate down the hierarchy: a subclass adds to its bases' names
+        excluded: Set[str] = set()
+        for klass in cls.__mro__:
+            _add_exclude_names(excluded, vars(klass).get("__serialize_exclude__"))
+        if dataclasses.is_dataclass(cls):
+            excluded.update(f.name for f in dataclasses.fields(cls) if f.metadata.get("serialize") is False)
+        self.excluded: frozenset = frozenset(excluded)
+
+        slots = []
+        for klass in reversed(cls.__mro__):
+            names = vars(klass).get("__slots__", ())
+            for name in ((names,) if isinstance(names, str) else names):
+                if name not in ("__dict__", "__weakref__") and name not in excluded and name not in slots:
+                    slots.append(name)
+        self.slots = tuple(slots)
+
+    def exclusions_for(self, obj: Any) -> frozenset:
+        # an instance may carry its own __serialize_exclude__ on top of the class one
+        if self.has_dict and "__serialize_exclude__" in getattr(obj, "__dict__", ()):
+            return self.excluded | _collect_exclude_names(obj) | {"__serialize_exclude__"}
+        return self.excluded
+
+    def get_state(self, obj: Any) -> dict:
+        if self.uses_getstate:
+            try:
+                state = obj.__getstate__() or {}
+                if isinstance(state, dict):
+                    return state
+            except Exception:
+                pass
+        if self.has_dict:
+            return obj.__dict__
+        return {}
+
+
+_SERIALIZATION_PLANS: Dict[type, _SerializationPlan] = {}
+
+
+def _plan_for(cls: type) -> _SerializationPlan:
+    plan = _SERIALIZATION_PLANS.get(cls)
+    if plan is None:
+        plan = _SERIALIZATION_PLANS[cls] = _SerializationPlan(cls)
+    return plan
+
+
+_PRIMITIVE_TYPES = (int, float, str, bool, type(None))
+_CONTAINER_TYPES = (tuple, list, set, frozenset, dict)
+# values that cannot hold a list or dict; exact types, for a set lookup
+_PLAIN_TYPES = frozenset(_PRIMITIVE_TYPES)
+_LEAF_TYPES = _PRIMITIVE_TYPES + (np.ndarray, np.generic)
+
+
+class _Memo:
+    """
+    Objects emitted so far in one serialization, numbered in order of first emission.
+    The first occurrence of an object carries "__id__"; later ones become {"__ref__": id}.
+    Lists and dicts reached more than once (`shared`, see _shared_containers) are numbered
+    the same way, written as {"__type__": "list" | "dict", "__id__": id, "items": ...}.
+    """
+    __slots__ = ("ids", "objects", "shared")
+
+    def __init__(self, shared: Set[int] = frozenset()):
+        self.ids: Dict[int, int] = {}
+        # holds every numbered object, so its id() cannot be reused by a temporary meanwhile
+        self.objects: list = []
+        self.shared = shared
+
+    def add(self, obj: Any) -> int:
+        number = self.ids[id(obj)] = len(self.objects)
+        self.objects.append(obj)
+        return number
+
+    def rollback(self, mark: int) -> None:
+        """Forget the objects numbered from mark on, whose output was discarded."""
+        for obj in self.objects[mark:]:
+            del self.ids[id(obj)]
+        del self.objects[mark:]
+
+
+def _shared_containers(obj: Any) -> Set[int]:
+    """
+    id()s of the lists and dicts reachable from obj more than once, e.g. a material dict
+    held by several hulls. serialize and iter_serialize both ask this up front, so they
+    agree on which containers get an "__id__". Values supplied by __serialize__ hooks are
+    not looked into; containers only shared through them are written out at every occurrence.
+    """
+    seen: Set[int] = set()
+    shared: Set[int] = set()
+    visited: Set[int] = set()
+    # keeps every container alive, so its id() cannot be reused by a temporary state dict
+    reached: list = []
+    stack: list = [obj]
+    push = stack.append
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (list, dict)):
+            oid = id(item)
+            if oid in seen:
+                shared.add(oid)
+                continue
+            seen.add(oid)
+            reached.append(item)
+            for value in (item.values() if isinstance(item, dict) else item):
+                if type(value) not in _PLAIN_TYPES:
+                    push(value)
+        elif isinstance(item, (tuple, set, frozenset)):
+            for value in item:
+                if type(value) not in _PLAIN_TYPES:
+                    push(value)
+        elif not isinstance(item, _LEAF_TYPES):
+            oid = id(item)
+            if oid in visited:
+                continue
+            visited.add(oid)
+            plan = _plan_for(type(item))
+            if plan.has_serialize_hook:
+                continue
+            excluded = plan.exclusions_for(item)
+            try:
+                for name, value in plan.get_state(item).items():
+                    if type(value) not in _PLAIN_TYPES and name not in excluded:
+                        push(value)
+                for slot in plan.slots:
+                    if hasattr(item, slot):
+                        push(getattr(item, slot))
+            except Exception:
+                # serialize falls back to repr() for what it cannot read
+                continue
+    return shared
+
+
+def _recursion_placeholder(obj: Any) -> dict:
+    # only reachable through containers nested past _max_depth or hook values containing
+    # themselves; objects and shared lists and dicts are written as references instead
+    return {"__recursion__": True, "__type__": type_tag(type(obj)), "__repr__": repr(obj)}
+
 
 def serialize(obj: Any, _max_depth: int = 50) -> Any:
     try:
-        return _serialize(obj, set(), 0, _max_depth)
+        return _serialize(obj, _Memo(_shared_containers(obj)), set(), 0, _max_depth)
     except Exception as e:
         raise SerializationError(f"Error during serialization: {e}")
 
-def _serialize(obj: Any, _seen: Set[int], _depth: int, _max_depth: int) -> Any:
-    if _seen is None:
-        _seen = set()
-
-    if _depth > _max_depth:
-        return {"__recursion__": True, "__repr__": repr(obj)}
-
+def _serialize(obj: Any, memo: _Memo, _seen: Set[int], _depth: int, _max_depth: int) -> Any:
     # primitives
-    if isinstance(obj, (int, float, str, bool, type(None))):
+    if isinstance(obj, _PRIMITIVE_TYPES):
         return obj
 
     oid = id(obj)
-    if oid in _seen:
-        return {"__recursion__": True, "__type__": type(obj).__name__, "__repr__": repr(obj)}
+    number = memo.ids.get(oid)
+    if number is not None:
+        return {"__ref__": number}
+    if _depth > _max_depth or oid in _seen:
+        return _recursion_placeholder(obj)
+
+    # containers
+    if isinstance(obj, _CONTAINER_TYPES):
+        _seen.add(oid)
+        try:
+            if oid in memo.shared:
+                number = memo.add(obj)
+                if isinstance(obj, list):
+                    items = [_serialize(i, memo, _seen, _depth + 1, _max_depth) for i in obj]
+                    return {"__type__": "list", "__id__": number, "items": items}
+                items = {str(k): _serialize(v, memo, _seen, _depth + 1, _max_depth) for k, v in obj.items()}
+                return {"__type__": "dict", "__id__": number, "items": items}
+            if isinstance(obj, tuple):
+                return {"__type__": "tuple", "items": [_serialize(i, memo, _seen, _depth + 1, _max_depth) for i in obj]}
+            if isinstance(obj, list):
+                return [_serialize(i, memo, _seen, _depth + 1, _max_depth) for i in obj]
+            if isinstance(obj, set):
+                return {"__type__": "set", "items": [_serialize(i, memo, _seen, _depth + 1, _max_depth) for i in obj]}
+            if isinstance(obj, frozenset):
+                return {"__type__": "frozenset",
+                        "items": [_serialize(i, memo, _seen, _depth + 1, _max_depth) for i in obj]}
+            return {str(k): _serialize(v, memo, _seen, _depth + 1, _max_depth) for k, v in obj.items()}
+        finally:
+            _seen.discard(oid)
+
+    # numpy arrays and scalars
+    if isinstance(obj, np.ndarray):
+        # store as nested python lists + dtype string so JSON-serializable
+        try:
+            return {"__type__": "ndarray", "items": obj.tolist(), "dtype": str(obj.dtype)}
+        except Exception:
+            return {"__type__": "ndarray", "items": obj.tolist()}
+    if isinstance(obj, np.generic):
+        # numpy scalar -> native python scalar
+        try:
+            return obj.item()
+        except Exception:
+            return repr(obj)
 
-    _seen.add(oid)
-    try:
-        # containers
-        if isinstance(obj, tuple):
-            return {"__type__": "tuple", "items": [_serialize(i, _seen, _depth + 1, _max_depth) for i in obj]}
-        if isinstance(obj, list):
-            return [_serialize(i, _seen, _depth + 1, _max_depth) for i in obj]
-        if isinstance(obj, set):
-            return {"__type__": "set", "items": [_serialize(i, _seen, _depth + 1, _max_depth) for i in obj]}
-        if isinstance(obj, frozenset):
-            return {"__type__": "frozenset", "items": [_serialize(i, _seen, _depth + 1, _max_depth) for i in obj]}
-        if isinstance(obj, dict):
-            return {str(k): _serialize(v, _seen, _depth + 1, _max_depth) for k, v in obj.items()}
-
-        # numpy arrays and scalars
-        if isinstance(obj, np.ndarray):
-            # store as nested python lists + dtype string so JSON-serializable
-            try:
-                return {"__type__": "ndarray", "items": obj.tolist(), "dtype": str(obj.dtype)}
-            except Exception:
-                return {"__type__": "ndarray", "items": obj.tolist()}
-        if isinstance(obj, np.generic):
-            # numpy scalar -> native python scalar
-            try:
-                return obj.item()
-            except Exception:
-                return repr(obj)
+    plan = _plan_for(type(obj))
 
-        # full custom serialization hook
-        if hasattr(obj, "__serialize__"):
-            try:
-                custom = obj.__serialize__()
-                return _serialize(custom, _seen, _depth + 1, _max_depth)
-            except Exception:
-                # fall back to other mechanisms
-                pass
+    # full custom serialization hook
+    if plan.has_serialize_hook:
+        mark = len(memo.objects)
+        try:
+            custom = obj.__serialize__()
+            return _serialize(custom, memo, _seen, _depth + 1, _max_depth)
+        except Exception:
+            # fall back to other mechanisms
+            memo.rollback(mark)
 
-        # prefer __getstate__ if present
-        state = None
-        if hasattr(obj, "__getstate__"):
-            try:
-                state = obj.__getstate__() or {}
-            except Exception:
-                state = None
+    excluded = plan.exclusions_for(obj)
+    result = {"__type__": plan.type_name, "__id__": memo.add(obj)}
+    for k, v in plan.get_state(obj).items():
+        if k in excluded:
+            continue
+        mark = len(memo.objects)
+        try:
+            result[k] = _serialize(v, memo, _seen, _depth + 1, _max_depth)
+        except Exception:
+            memo.rollback(mark)
+            result[k] = repr(v)
 
-        # custom object handling: use state or vars/slots
-        if state is None:
+    for slot in plan.slots:
+        if hasattr(obj, slot):
+            mark = len(memo.objects)
             try:
-                state = dict(vars(obj))
-            except TypeError:
-                state = {}
+                result[slot] = _serialize(getattr(obj, slot), memo, _seen, _depth + 1, _max_depth)
+            except Exception:
+                memo.rollback(mark)
+                result[slot] = repr(getattr(obj, slot))
+
+    return result
+
+_TEXT, _VALUE, _ATTRIBUTE, _LEAVE = range(4)
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+def _encode_primitive(obj: Any) -> str:
+    # the same text json.dumps writes for these
+    if obj is None:
+        return "null"
+    if obj is True:
+        return "true"
+    if obj is False:
+        return "false"
+    if isinstance(obj, str):
+        return _encode_str(obj)
+    if isinstance(obj, int):
+        return int.__repr__(obj)
+    if obj != obj:
+        return "NaN"
+    if obj == float("inf"):
+        return "Infinity"
+    if obj == -float("inf"):
+        return "-Infinity"
+    return float.__repr__(obj)
+
+
+def iter_serialize(obj: Any, _max_depth: int = 50) -> Iterator[str]:
+    """
+    Yield the JSON text of serialize(obj) in pieces, walking the object graph as it goes
+    instead of building the document first. "".join(iter_serialize(obj)) equals
+    json.dumps(serialize(obj)).
+    """
+    memo = _Memo(_shared_containers(obj))
+    seen: Set[int] = set()
+    stack: list = [(_VALUE, obj, 0)]
+    while stack:
+        kind, item, depth = stack.pop()
+        if kind == _TEXT:
+            yield item
+            continue
+        if kind == _LEAVE:
+            seen.discard(item)
+            continue
+        if isinstance(item, _PRIMITIVE_TYPES):
+            yield _encode_primitive(item)
+            continue
+        oid = id(item)
+        number = memo.ids.get(oid)
+        if number is not None:
+            yield f'{{"__ref__": {number}}}'
+            continue
+        if depth > _max_depth or oid in seen:
+            yield json.dumps(_recursion_placeholder(item))
+            continue
+        if isinstance(item, np.generic):
+            stack.append((kind, item.item(), depth))
+            continue
 
-        result = {"__type__": type(obj).__name__}
-        for k, v in state.items():
-            if not _should_serialize_attr(obj, k):
+        shared = oid in memo.shared
+        try:
+            expansion = _expand(item, len(memo.objects), shared)
+        except Exception as e:
+            if kind == _ATTRIBUTE:
+                # same per-attribute fallback as serialize
+                yield _encode_str(repr(item))
                 continue
-            try:
-                result[k] = _serialize(v, _seen, _depth + 1, _max_depth)
-            except SerializationError:
-                result[k] = repr(v)
-            except Exception:
-                result[k] = repr(v)
-
-        # __slots__
-        slots = getattr(type(obj), "__slots__", ())
-        if isinstance(slots, str):
-            slots = (slots,)
-        for slot in slots:
-            if hasattr(obj, slot) and _should_serialize_attr(obj, slot):
-                try:
-                    result[slot] = _serialize(getattr(obj, slot), _seen, _depth + 1, _max_depth)
-                except Exception:
-                    result[slot] = repr(getattr(obj, slot))
-
-        return result
-    finally:
-        _seen.discard(oid)
+            raise SerializationError(f"Error during serialization: {e}")
+
+        if len(expansion) == 1:
+            # an object's __serialize__ result stands in for it
+            stack.append((_VALUE, expansion[0], depth + 1))
+            continue
+        if isinstance(item, _CONTAINER_TYPES):
+            seen.add(oid)
+            stack.append((_LEAVE, oid, depth))
+            if shared:
+                memo.add(item)
+        elif not isinstance(item, np.ndarray):
+            memo.add(item)
+        opening, closing, children = expansion
+        yield opening
+        stack.append((_TEXT, closing, depth))
+        for child_kind, prefix, child in reversed(children):
+            stack.append((child_kind, child, depth + 1))
+            if prefix:
+                stack.append((_TEXT, prefix, depth))
+
+
+def _expand(obj: Any, number: int, shared: bool = False) -> tuple:
+    """
+    (opening text, closing text, [(kind, text before the child, child), ...]) for a node
+    of iter_serialize, or (replacement,) when a __serialize__ hook supplies one. An object,
+    or a shared list or dict, is opened with `number` as its "__id__".
+    """
+    if shared and isinstance(obj, (list, dict)):
+        opening = '{"__type__": "' + ("list" if isinstance(obj, list) else "dict") + f'", "__id__": {number}, "items": '
+        inner_opening, inner_closing, children = _expand(obj, number)
+        return opening + inner_opening, inner_closing + "}", children
+    for kind, name in ((tuple, "tuple"), (list, None), (set, "set"), (frozenset, "frozenset")):
+        if isinstance(obj, kind):
+            children = [(_VALUE, ", " if index else "", item) for index, item in enumerate(obj)]
+            if name is None:
+                return "[", "]", children
+            return '{"__type__": "' + name + '", "items": [', "]}", children
+    if isinstance(obj, dict):
+        return "{", "}", [(_VALUE, (", " if index else "") + _encode_str(str(k)) + ": ", v)
+                          for index, (k, v) in enumerate(obj.items())]
+    if isinstance(obj, np.ndarray):
+        return json.dumps(_serialize(obj, _Memo(), set(), 0, 0)), "", []
+
+    plan = _plan_for(type(obj))
+    if plan.has_serialize_hook:
+        try:
+            return (obj.__serialize__(),)
+        except Exception:
+            pass
+    excluded = plan.exclusions_for(obj)
+    attributes = {k: v for k, v in plan.get_state(obj).items() if k not in excluded}
+    for slot in plan.slots:
+        if hasattr(obj, slot):
+            attributes[slot] = getattr(obj, slot)
+    opening = '{"__type__": ' + _encode_str(plan.type_name) + f', "__id__": {number}'
+    return opening, "}", [(_ATTRIBUTE, ", " + _encode_str(k) + ": ", v) for k, v in attributes.items()]
+
 
 def deserialize(data: Any, fmt: str = "json") -> Any:
+    if fmt == "binary":
+        from hikerservespacecraft.utils.snapshot import loads
+        return loads(data)
     try:
         if fmt == "json" and isinstance(data, str):
             data = json.loads(data)
@@ -195,75 +507,113 @@ def deserialize(data: Any, fmt: str = "json") -> Any:
     except Exception as e:
         raise DeserializationError(f"Error during deserialization: {e}")
 
-def _deserialize_recursive(data: Any) -> Any:
-    # build classes mapping with discovered payload classes
-    classes = {**_classes, **_load_payload_classes()}
+def _deserialize_ndarray(value: dict) -> np.ndarray:
+    items = value.get("items")
+    dtype = value.get("dtype")
+    if items is None:
+        return np.array([])
+    try:
+        if dtype:
+            return np.array(items, dtype=np.dtype(dtype))
+        return np.array(items)
+    except Exception:
+        # fallback to best-effort conversion
+        try:
+            return np.array(items)
+        except Exception:
+            raise DeserializationError("Failed to reconstruct ndarray")
 
-    def handle_primitive(value):
-        return value
 
-    def handle_list(value):
-        return [_deserialize_recursive(item) for item in value]
+_SEQUENCE_TYPES = {"tuple": tuple, "set": set, "frozenset": frozenset}
+_SHARED_TYPES = ("list", "dict")
 
-    def handle_set(value):
-        return set(_deserialize_recursive(item) for item in value["items"])
 
-    def handle_frozenset(value):
-        return frozenset(_deserialize_recursive(item) for item in value["items"])
+def _deserialize_recursive(data: Any) -> Any:
+    """
+    Rebuild the object graph with an explicit work stack, so the cost is linear in the
+    document and deep graphs cannot hit the recursion limit.
+
+    Every stack entry either decodes `value` into `target[key]`, or, once all of a
+    node's children are decoded, finishes that node (tuples and sets are built from
+    their decoded items, objects get their attributes set in document order). Values are
+    decoded in document order, so an object or shared container is created, and
+    registered under its "__id__", before any {"__ref__": id} to it is reached. "__recursion__" placeholders
+    stand for a value that was not serialized and decode to None.
+    """
+    root = [None]
+    refs: Dict[int, Any] = {}
+    stack = [(False, data, root, 0)]
+    while stack:
+        finish, value, target, key = stack.pop()
+        if finish:
+            value(target, key)
+            continue
 
-    def handle_tuple(value):
-        return tuple(_deserialize_recursive(item) for item in value["items"])
+        if isinstance(value, (int, float, str, bool, type(None))):
+            target[key] = value
+        elif isinstance(value, list):
+            items = target[key] = [None] * len(value)
+            stack.extend((False, value[i], items, i) for i in reversed(range(len(value))))
+        elif isinstance(value, dict):
+            tag = value.get("__type__")
+            if "__recursion__" in value:
+                target[key] = None
+            elif tag is None:
+                if "__ref__" in value and len(value) == 1:
+                    try:
+                        target[key] = refs[value["__ref__"]]
+                    except (KeyError, TypeError):
+                        raise DeserializationError(f"Reference to unknown object {value['__ref__']!r}")
+                    continue
+                result = target[key] = dict.fromkeys(value)
+                stack.extend((False, value[k], result, k) for k in reversed(list(value)))
+            elif tag == "ndarray":
+                target[key] = _deserialize_ndarray(value)
+            elif tag in _SHARED_TYPES and "__id__" in value:
+                raw = value["items"]
+                if tag == "list":
+                    items = [None] * len(raw)
+                    keys = range(len(raw))
+                else:
+                    items = dict.fromkeys(raw)
+                    keys = list(raw)
+                target[key] = refs[value["__id__"]] = items
+                stack.extend((False, raw[k], items, k) for k in reversed(keys))
+            elif tag in _SEQUENCE_TYPES:
+                raw = value["items"]
+                items = [None] * len(raw)
+                stack.append((True, _finish_sequence(_SEQUENCE_TYPES[tag], items), target, key))
+                stack.extend((False, raw[i], items, i) for i in reversed(range(len(raw))))
+            else:
+                cls = resolve_type(tag)
+                obj = target[key] = cls.__new__(cls)
+                if "__id__" in value:
+                    refs[value["__id__"]] = obj
+                state = {k: None for k in value if k != "__type__" and k != "__id__"}
+                stack.append((True, _finish_object(obj, state), target, key))
+                stack.extend((False, value[k], state, k) for k in reversed(list(state)))
+        else:
+            raise DeserializationError(f"Type {type(value)} not deserializable")
+    return root[0]
 
-    def handle_ndarray(value):
-        items = value.get("items")
-        dtype = value.get("dtype")
-        if items is None:
-            return np.array([])
-        try:
-            if dtype:
-                return np.array(items, dtype=np.dtype(dtype))
-            return np.array(items)
-        except Exception:
-            # fallback to best-effort conversion
-            try:
-                return np.array(items)
-            except Exception:
-                raise DeserializationError("Failed to reconstruct ndarray")
-
-    def handle_custom_class(value):
-        class_name = value.pop("__type__")
-        cls = classes.get(class_name)
-        if cls is None:
-            raise DeserializationError(f"Unknown class type: {class_name}")
-        obj = cls.__new__(cls)
-        for key, val in value.items():
-            setattr(obj, key, _deserialize_recursive(val))
-        return obj
 
-    type_dispatch = {
-        "set": handle_set,
-        "frozenset": handle_frozenset,
-        "tuple": handle_tuple,
-        "ndarray": handle_ndarray,
-    }
+def _finish_sequence(kind: type, items: list):
+    def finish(target, key):
+        target[key] = kind(items)
+    return finish
 
-    if isinstance(data, (int, float, str, bool, type(None))):
-        return handle_primitive(data)
-    if isinstance(data, list):
-        return handle_list(data)
-    if isinstance(data, dict):
-        if "__type__" in data:
-            t = data["__type__"]
-            if t in type_dispatch:
-                return type_dispatch[t](data)
-            return handle_custom_class(dict(data))  # copy to avoid mutating input
-        return {k: _deserialize_recursive(v) for k, v in data.items()}
 
-    raise DeserializationError(f"Type {type(data)} not deserializable")
+def _finish_object(obj: Any, state: dict):
+    def finish(target, key):
+        for name, val in state.items():
+            setattr(obj, name, val)
+    return finish
 
 
 if __name__ == '__main__':
     # Example usage
+    from hikerservespacecraft.spacecraft_constructor import get_initial_spacecraft
+
     default_initial_spacecraft_dict = serialize(get_initial_spacecraft())
     default_initial_spacecraft_json = json.dumps(default_initial_spacecraft_dict)
 
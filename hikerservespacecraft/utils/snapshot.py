@@ -0,0 +1,432 @@
+"""
+Binary snapshot format, the compact counterpart of the JSON documents from ser.py.
+
+It walks the same object graph as `serialize` (same hooks, exclusions and type tags)
+but writes it as a tagged binary stream:
+
+    MAGIC
+    header          string table offset, array table offset, body offset, file length (u64 each)
+    string table    u32 count, then (u32 length, utf-8 bytes) per string
+    array table     u32 count, then per array: u8 dtype length, dtype, u8 ndim, u64 shape...,
+                    u64 offset, u64 byte length
+    body            the root value
+    array data      raw C-ordered buffers, each aligned to ARRAY_ALIGNMENT bytes
+
+Type tags, attribute names and string values are interned in the string table and
+referenced by index. Objects, lists and dicts are numbered in the order they are written,
+and one that was written already is stored as a reference to its number, as in the JSON
+documents (snapshots with the older MAGIC_V1 only number objects). Numeric arrays are
+stored as raw buffers, so loading wraps them with np.frombuffer instead of parsing text:
+`load_snapshot` reads the file into one buffer that every array is a view of, or with
+mmap=True leaves the arrays as read-only views of the mapped file. All integers are
+little-endian.
+"""
+import mmap as _mmap
+import struct
+from typing import Any, Dict, List
+
+import numpy as np
+
+from hikerservespacecraft.utils.ser import DeserializationError, SerializationError, _Memo, _plan_for, \
+    resolve_type, type_tag
+
+MAGIC = b"HVSNAP2\n"
+MAGIC_V1 = b"HVSNAP1\n"
+ARRAY_ALIGNMENT = 64
+
+_HEADER = struct.Struct("<QQQQ")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_TAGGED_U32 = struct.Struct("<BI")
+_TAGGED_U32_U32 = struct.Struct("<BII")
+_TAGGED_INT64 = struct.Struct("<Bq")
+_TAGGED_FLOAT64 = struct.Struct("<Bd")
+
+_NONE, _TRUE, _FALSE, _INT, _BIG_INT, _FLOAT, _STR, _LIST, _TUPLE, _SET, _FROZENSET, _DICT, _OBJECT, \
+    _ARRAY, _OBJECT_ARRAY, _REF = b"NTFiIdsltSZmoaOr"
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+_ONE_BYTE = {None: bytes([_NONE]), True: bytes([_TRUE]), False: bytes([_FALSE])}
+_SEQUENCES = ((tuple, _TUPLE), (list, _LIST), (set, _SET), (frozenset, _FROZENSET))
+
+
+class _Writer:
+
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self.body: List[bytes] = []
+        self.strings: Dict[str, int] = {}
+        self.arrays: List[np.ndarray] = []
+        self.seen: set = set()
+        self.memo = _Memo()
+
+    def intern(self, text: str) -> int:
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    def write(self, obj: Any, depth: int) -> None:
+        out = self.body
+        if obj is None or obj is True or obj is False:
+            out.append(_ONE_BYTE[obj])
+            return
+        if isinstance(obj, str):
+            out.append(_TAGGED_U32.pack(_STR, self.intern(obj)))
+            return
+        if isinstance(obj, int) and not isinstance(obj, bool):
+            if _INT64_MIN <= obj <= _INT64_MAX:
+                out.append(_TAGGED_INT64.pack(_INT, obj))
+            else:
+                out.append(_TAGGED_U32.pack(_BIG_INT, self.intern(str(obj))))
+            return
+        if isinstance(obj, float):
+            out.append(_TAGGED_FLOAT64.pack(_FLOAT, obj))
+            return
+
+        oid = id(obj)
+        number = self.memo.ids.get(oid)
+        if number is not None:
+            out.append(_TAGGED_U32.pack(_REF, number))
+            return
+        if depth > self.max_depth:
+            self.write({"__recursion__": True, "__repr__": repr(obj)}, depth - 1)
+            return
+        if oid in self.seen:
+            self.write({"__recursion__": True, "__type__": type_tag(type(obj)), "__repr__": repr(obj)}, depth - 1)
+            return
+
+        self.seen.add(oid)
+        try:
+            self._write_composite(obj, depth)
+        finally:
+            self.seen.discard(oid)
+
+    def _write_composite(self, obj: Any, depth: int) -> None:
+        out = self.body
+        for kind, tag in _SEQUENCES:
+            if isinstance(obj, kind):
+                out.append(_TAGGED_U32.pack(tag, len(obj)))
+                if tag == _LIST:
+                    self.memo.add(obj)
+                for item in obj:
+                    self.write(item, depth + 1)
+                return
+        if isinstance(obj, dict):
+            out.append(_TAGGED_U32.pack(_DICT, len(obj)))
+            self.memo.add(obj)
+            for key, value in obj.items():
+                out.append(_U32.pack(self.intern(str(key))))
+                self.write(value, depth + 1)
+            return
+
+        if isinstance(obj, np.ndarray):
+            if obj.dtype.hasobject:
+                out.append(_U8.pack(_OBJECT_ARRAY))
+                self.write(obj.tolist(), depth)
+            else:
+                out.append(_TAGGED_U32.pack(_ARRAY, len(self.arrays)))
+                self.arrays.append(np.ascontiguousarray(obj))
+            return
+        if isinstance(obj, np.generic):
+            self.write(obj.item(), depth)
+            return
+
+        plan = _plan_for(type(obj))
+        if plan.has_serialize_hook:
+            try:
+                custom = obj.__serialize__()
+            except Exception:
+                pass
+            else:
+                self.write(custom, depth + 1)
+                return
+
+        excluded = plan.exclusions_for(obj)
+        attributes = [(name, value) for name, value in plan.get_state(obj).items() if name not in excluded]
+        for slot in plan.slots:
+            if hasattr(obj, slot):
+                attributes.append((slot, getattr(obj, slot)))
+
+        out.append(_TAGGED_U32_U32.pack(_OBJECT, self.intern(plan.type_name), len(attributes)))
+        self.memo.add(obj)
+        for name, value in attributes:
+            out.append(_U32.pack(self.intern(name)))
+            mark = len(out)
+            objects = len(self.memo.objects)
+            try:
+                self.write(value, depth + 1)
+            except Exception:
+                # same per-attribute fallback as serialize
+                del out[mark:]
+                self.memo.rollback(objects)
+                self.write(repr(value), depth + 1)
+
+    def chunks(self) -> List[bytes]:
+        """The complete file as a list of buffers, arrays included without copying."""
+        strings = [_U32.pack(len(self.strings))]
+        for text in self.strings:
+            data = text.encode("utf-8")
+            strings.append(_U32.pack(len(data)))
+            strings.append(data)
+        strings = b"".join(strings)
+
+        strings_offset = len(MAGIC) + _HEADER.size
+        arrays_offset = strings_offset + len(strings)
+        array_table_size = _U32.size + sum(_U8.size + len(a.dtype.str) + _U8.size + _U64.size * (a.ndim + 2)
+                                           for a in self.arrays)
+        body_offset = arrays_offset + array_table_size
+        body = b"".join(self.body)
+
+        table = [_U32.pack(len(self.arrays))]
+        data: List[Any] = []
+        position = body_offset + len(body)
+        for array in self.arrays:
+            padding = -position % ARRAY_ALIGNMENT
+            if padding:
+                data.append(bytes(padding))
+            position += padding
+            dtype = array.dtype.str.encode("ascii")
+            table.append(_U8.pack(len(dtype)) + dtype + _U8.pack(array.ndim))
+            table.extend(_U64.pack(size) for size in array.shape)
+            table.append(_U64.pack(position) + _U64.pack(array.nbytes))
+            data.append(array.reshape(-1).view(np.uint8) if array.nbytes else b"")
+            position += array.nbytes
+
+        header = _HEADER.pack(strings_offset, arrays_offset, body_offset, position)
+        return [MAGIC, header, strings, b"".join(table), body, *data]
+
+
+def dumps(obj: Any, _max_depth: int = 50) -> bytes:
+    return b"".join(_write(obj, _max_depth))
+
+
+def save_snapshot(obj: Any, path: str, _max_depth: int = 50) -> int:
+    """Write a binary snapshot of obj to path and return its size in bytes."""
+    chunks = _write(obj, _max_depth)
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        return f.tell()
+
+
+def _write(obj: Any, max_depth: int) -> List[bytes]:
+    writer = _Writer(max_depth)
+    try:
+        writer.write(obj, 0)
+        return writer.chunks()
+    except Exception as e:
+        raise SerializationError(f"Error during serialization: {e}")
+
+
+class _Frame:
+    __slots__ = ("tag", "items", "remaining", "key", "obj")
+
+    def __init__(self, tag: int, items, remaining: int, obj=None):
+        self.tag = tag
+        self.items = items
+        self.remaining = remaining
+        self.key = None
+        self.obj = obj
+
+
+class _Reader:
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        view = memoryview(buffer)
+        magic = bytes(view[:len(MAGIC)])
+        if magic != MAGIC and magic != MAGIC_V1:
+            raise DeserializationError("Not a binary snapshot")
+        # whether lists and dicts are numbered along with objects
+        self.numbers_containers = magic == MAGIC
+        strings_offset, arrays_offset, body_offset, length = _HEADER.unpack_from(buffer, len(MAGIC))
+        if length > len(view):
+            raise DeserializationError("Truncated snapshot")
+
+        (count,) = _U32.unpack_from(buffer, strings_offset)
+        offset = strings_offset + _U32.size
+        self.strings: List[str] = []
+        for _ in range(count):
+            (size,) = _U32.unpack_from(buffer, offset)
+            offset += _U32.size
+            self.strings.append(str(view[offset:offset + size], "utf-8"))
+            offset += size
+
+        (count,) = _U32.unpack_from(buffer, arrays_offset)
+        offset = arrays_offset + _U32.size
+        self.arrays: List[np.ndarray] = []
+        for _ in range(count):
+            (size,) = _U8.unpack_from(buffer, offset)
+            dtype = np.dtype(str(view[offset + 1:offset + 1 + size], "ascii"))
+            offset += 1 + size
+            (ndim,) = _U8.unpack_from(buffer, offset)
+            offset += 1
+            shape = struct.unpack_from(f"<{ndim}Q", buffer, offset)
+            offset += 8 * ndim
+            start, nbytes = struct.unpack_from("<QQ", buffer, offset)
+            offset += 16
+            if start + nbytes > length or nbytes != dtype.itemsize * int(np.prod(shape)):
+                raise DeserializationError("Array data out of bounds")
+            if nbytes:
+                array = np.frombuffer(buffer, dtype=dtype, count=nbytes // dtype.itemsize, offset=start)
+            else:
+                array = np.empty(0, dtype=dtype)
+            self.arrays.append(array.reshape(shape))
+        self.body_offset = body_offset
+
+    def read(self) -> Any:
+        """Decode the body with an explicit frame stack, like ser._deserialize_recursive."""
+        buffer = self.buffer
+        strings = self.strings
+        numbers_containers = self.numbers_containers
+        offset = self.body_offset
+        objects: List[Any] = []
+        stack: List[_Frame] = []
+        root = _Frame(_LIST, [], 1)
+        stack.append(root)
+
+        while stack:
+            frame = stack[-1]
+            if frame.remaining == 0:
+                stack.pop()
+                value = _finish(frame)
+                if not stack:
+                    break
+                _deliver(stack[-1], value)
+                continue
+
+            if frame.tag in (_DICT, _OBJECT):
+                (name,) = _U32.unpack_from(buffer, offset)
+                offset += 4
+                frame.key = strings[name]
+
+            tag = buffer[offset]
+            offset += 1
+            if tag == _NONE:
+                value = None
+            elif tag == _TRUE:
+                value = True
+            elif tag == _FALSE:
+                value = False
+            elif tag == _INT:
+                (value,) = _INT64.unpack_from(buffer, offset)
+                offset += 8
+            elif tag == _FLOAT:
+                (value,) = _FLOAT64.unpack_from(buffer, offset)
+                offset += 8
+            elif tag == _STR:
+                (index,) = _U32.unpack_from(buffer, offset)
+                offset += 4
+                value = strings[index]
+            elif tag == _BIG_INT:
+                (index,) = _U32.unpack_from(buffer, offset)
+                offset += 4
+                value = int(strings[index])
+            elif tag == _ARRAY:
+                (index,) = _U32.unpack_from(buffer, offset)
+                offset += 4
+                value = self.arrays[index]
+            elif tag in (_LIST, _TUPLE, _SET, _FROZENSET):
+                (count,) = _U32.unpack_from(buffer, offset)
+                offset += 4
+                items = []
+                if tag == _LIST and numbers_containers:
+                    objects.append(items)
+                stack.append(_Frame(tag, items, count))
+                continue
+            elif tag == _DICT:
+                (count,) = _U32.unpack_from(buffer, offset)
+                offset += 4
+                items = {}
+                if numbers_containers:
+                    objects.append(items)
+                stack.append(_Frame(tag, items, count))
+                continue
+            elif tag == _OBJECT:
+                type_index, count = struct.unpack_from("<II", buffer, offset)
+                offset += 8
+                cls = resolve_type(strings[type_index])
+                obj = cls.__new__(cls)
+                objects.append(obj)
+                stack.append(_Frame(tag, {}, count, obj))
+                continue
+            elif tag == _REF:
+                (index,) = _U32.unpack_from(buffer, offset)
+                offset += 4
+                if index >= len(objects):
+                    raise DeserializationError(f"Reference to unknown object {index}")
+                value = objects[index]
+            elif tag == _OBJECT_ARRAY:
+                stack.append(_Frame(tag, [], 1))
+                continue
+            else:
+                raise DeserializationError(f"Unknown tag {tag!r} at offset {offset - 1}")
+            _deliver(frame, value)
+
+        return root.items[0]
+
+
+def _deliver(frame: _Frame, value: Any) -> None:
+    if frame.tag in (_DICT, _OBJECT):
+        frame.items[frame.key] = value
+    else:
+        frame.items.append(value)
+    frame.remaining -= 1
+
+
+def _finish(frame: _Frame) -> Any:
+    tag = frame.tag
+    if tag == _LIST:
+        return frame.items
+    if tag == _DICT:
+        # a placeholder for a value that was not serialized, as in ser._deserialize_recursive
+        return None if "__recursion__" in frame.items else frame.items
+    if tag == _OBJECT:
+        obj = frame.obj
+        for name, value in frame.items.items():
+            setattr(obj, name, value)
+        return obj
+    if tag == _TUPLE:
+        return tuple(frame.items)
+    if tag == _SET:
+        return set(frame.items)
+    if tag == _FROZENSET:
+        return frozenset(frame.items)
+    return np.array(frame.items[0], dtype=object)
+
+
+def loads(data) -> Any:
+    """
+    Rebuild an object graph from a binary snapshot. Arrays are views of `data`: writable
+    if it is a bytearray or a writable memoryview, read-only for bytes.
+    """
+    try:
+        return _Reader(data).read()
+    except DeserializationError:
+        raise
+    except Exception as e:
+        raise DeserializationError(f"Error during deserialization: {e}")
+
+
+def load_snapshot(path: str, mmap: bool = False) -> Any:
+    """
+    Load a snapshot file. By default the file is read into one bytearray and every array
+    is a writable view of it. With mmap=True the arrays are read-only views of the mapped
+    file and their data is only paged in when touched.
+    """
+    with open(path, "rb") as f:
+        if mmap:
+            data = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+        else:
+            size = f.seek(0, 2)
+            f.seek(0)
+            # over-allocate so the buffer can start on an ARRAY_ALIGNMENT boundary in memory too
+            raw = bytearray(size + ARRAY_ALIGNMENT)
+            shift = -np.frombuffer(raw, dtype=np.uint8).ctypes.data % ARRAY_ALIGNMENT
+            data = memoryview(raw)[shift:shift + size]
+            f.readinto(data)
+    return loads(data)
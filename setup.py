@@ -17,7 +17,7 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=[
-        # Add your dependencies here, e.g., "numpy>=1.21.0"
+        "numpy>=1.21.0",
     ],
     extras_require={
         "dev": [
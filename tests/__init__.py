@@ -0,0 +1,20 @@
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.spacecraft import Spacecraft
+
+
+def make_spacecraft(ident: str = "sc", boot: bool = False, activate: bool = False) -> Spacecraft:
+    """
+    The two-payload test spacecraft: a CesiumSulphurBattery "battery" and a SubspaceHarvester
+    "harvester" with default settings, named after its ident. `boot` boots its computer and
+    `activate` also activates both payloads.
+    """
+    sc = Spacecraft(name=ident, ident=ident)
+    sc.add_spacecraft_component(CesiumSulphurBattery(name="battery", description="test", mass=1, volume=1))
+    sc.add_spacecraft_component(SubspaceHarvester(name="harvester", description="test", mass=1, volume=1))
+    if boot or activate:
+        sc.spacecraft_computer.route_command({"device_id": "main_computer", "command": "boot", "args": {}})
+    if activate:
+        for device_id in ("battery", "harvester"):
+            sc.spacecraft_computer.route_command({"device_id": device_id, "command": "activate", "args": {}})
+    return sc
@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+
+from hikerservespacecraft.runtime.async_runtime import AsyncSimulationRuntime
+from tests import make_spacecraft
+
+
+class _FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAsyncSimulationRuntime(unittest.TestCase):
+
+    def test_concurrent_sessions_get_their_results(self):
+        async def scenario():
+            runtime = AsyncSimulationRuntime(make_spacecraft(), dt_s=0.005)
+            async with runtime:
+                boot = await runtime.execute({"device_id": "main_computer", "command": "boot", "args": {}})
+
+                async def session(device_id: str):
+                    await runtime.execute({"device_id": device_id, "command": "activate", "args": {}})
+                    return await runtime.execute({"device_id": device_id, "command": "get_current_power_output"
+                                                  if device_id == "harvester" else "get_current_capacity",
+                                                  "args": {}})
+
+                results = await asyncio.gather(session("harvester"), session("battery"))
+            return boot, results, runtime
+
+        boot, results, runtime = asyncio.run(scenario())
+        self.assertTrue(boot.success)
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(runtime.commands_routed, 5)
+        self.assertGreater(runtime.tick_count, 0)
+
+    def test_catches_up_deterministically(self):
+        clock = _FakeClock()
+
+        async def scenario():
+            runtime = AsyncSimulationRuntime(make_spacecraft(), dt_s=0.05, clock=clock)
+            task = runtime.start(max_ticks=5)
+            await asyncio.sleep(0)
+            clock.now = 0.25
+            await task
+            return runtime
+
+        runtime = asyncio.run(scenario())
+        self.assertEqual(runtime.tick_count, 5)
+        self.assertAlmostEqual(runtime.sim_time_s, 0.25)
+        self.assertEqual(runtime.dropped_ticks, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
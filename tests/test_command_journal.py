@@ -0,0 +1,94 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from hikerservespacecraft.runtime.async_runtime import AsyncSimulationRuntime
+from hikerservespacecraft.runtime.command_journal import CommandJournal, read_journal, replay
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.ser import deserialize, serialize
+from tests import make_spacecraft
+
+
+def _state(sc: Spacecraft) -> tuple:
+    battery = sc.power_bus.components["battery"]
+    harvester = sc.power_bus.components["harvester"]
+    return (float(battery.current_energy_level_GJ), float(harvester.current_power_output),
+            float(harvester.target_output), harvester.is_active, sc.spacecraft_computer.is_booted)
+
+
+class TestCommandJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "commands.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_runtime_journal_replays_to_the_same_state(self):
+        sc = make_spacecraft()
+        snapshot = deserialize(serialize(sc))
+
+        async def scenario():
+            with CommandJournal(self.path, fsync=False) as journal:
+                runtime = AsyncSimulationRuntime(sc, dt_s=0.5, journal=journal)
+                runtime.submit({"device_id": "main_computer", "command": "boot", "args": {}})
+                runtime.submit({"device_id": "harvester", "command": "activate", "args": {}})
+                runtime.submit({"device_id": "battery", "command": "activate", "args": {}})
+                runtime.step()
+                for i in range(20):
+                    runtime.submit({"device_id": "harvester", "command": "set_target_output", "args": [i * 4e-4]})
+                    runtime.submit({"device_id": "battery", "command": "get_current_capacity", "args": {}})
+                    runtime.step()
+
+        asyncio.run(scenario())
+
+        records = list(read_journal(self.path))
+        self.assertEqual([tick for tick, _, _ in records], list(range(21)))
+        # queries are not journaled
+        self.assertEqual(sum(len(commands) for _, _, commands in records), 23)
+
+        self.assertEqual(replay(snapshot, self.path), 21)
+        self.assertEqual(_state(snapshot), _state(sc))
+
+    def test_truncated_tail_is_ignored(self):
+        sc = make_spacecraft()
+        with CommandJournal(self.path, computer=sc.spacecraft_computer) as journal:
+            sc.spacecraft_computer.route_command({"device_id": "main_computer", "command": "boot", "args": {}})
+            journal.end_tick(1.0)
+            sc.spacecraft_computer.route_command({"device_id": "battery", "command": "activate", "args": {}})
+            journal.end_tick(1.0)
+            journal.sync()
+        self.assertIsNone(sc.spacecraft_computer.command_journal)
+
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual(list(read_journal(self.path)), [(0, 1.0, [("main_computer", "boot", {})])])
+
+        # reopening drops the cut-short record and carries on after the last complete one
+        with CommandJournal(self.path, computer=sc.spacecraft_computer, fsync=False) as journal:
+            self.assertEqual(journal.tick, 1)
+            sc.spacecraft_computer.route_command({"device_id": "battery", "command": "activate", "args": {}})
+            journal.end_tick(1.0)
+        self.assertEqual(list(read_journal(self.path)), [(0, 1.0, [("main_computer", "boot", {})]),
+                                                         (1, 1.0, [("battery", "activate", {})])])
+        with self.assertRaises(ValueError):
+            CommandJournal(self.path, start_tick=1, fsync=False)
+
+    def test_failed_commands_are_not_journaled(self):
+        sc = make_spacecraft()
+        computer = sc.spacecraft_computer
+        with CommandJournal(self.path, computer=computer, fsync=False) as journal:
+            computer.route_command({"device_id": "main_computer", "command": "boot", "args": {}})
+            computer.route_command({"device_id": "harvester", "command": "activate", "args": {}})
+            response = computer.route_command({"device_id": "harvester", "command": "set_target_output",
+                                               "args": [-1.0]})
+            self.assertFalse(response.success)
+            journal.end_tick(1.0)
+        self.assertEqual(list(read_journal(self.path)),
+                         [(0, 1.0, [("main_computer", "boot", {}), ("harvester", "activate", {})])])
+
+
+if __name__ == "__main__":
+    unittest.main()
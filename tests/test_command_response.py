@@ -0,0 +1,39 @@
+import datetime
+import unittest
+
+from hikerservespacecraft.command_response import CommandResponse
+
+
+class TestCommandResponse(unittest.TestCase):
+
+    def test_lazy_fields_and_to_dict(self):
+        response = CommandResponse(success=True, device_type="Thruster", message="{} thrust set to: {}",
+                                   message_args=("main", 5.0))
+        self.assertEqual(response.to_dict(), {"success": True, "message": "main thrust set to: 5.0", "return": {}})
+        self.assertEqual(response.log, [])
+        self.assertFalse(hasattr(response, "__dict__"))
+
+        stamp = datetime.datetime.fromisoformat(response.datestamp)
+        self.assertLess(abs((datetime.datetime.now() - stamp).total_seconds()), 5)
+
+        response.add_log_entry("fired")
+        self.assertTrue(response.log[0].startswith("["))
+        self.assertTrue(response.log[0].endswith("] fired"))
+
+        response.message = "overridden"
+        self.assertEqual(response.message, "overridden")
+
+    def test_copy_is_independent(self):
+        response = CommandResponse(success=True, return_data={"levels": [1.0]}, message="{} ok", message_args=("b",))
+        response.add_log_entry("read")
+        duplicate = response.copy()
+        duplicate.return_data["levels"].append(2.0)
+        duplicate.add_log_entry("again")
+        self.assertEqual(response.return_data, {"levels": [1.0]})
+        self.assertEqual(len(response.log), 1)
+        self.assertEqual(duplicate.to_dict(), {"success": True, "message": "b ok", "return": {"levels": [1.0, 2.0]}})
+        self.assertEqual(duplicate.datestamp, response.datestamp)
+
+
+if __name__ == "__main__":
+    unittest.main()
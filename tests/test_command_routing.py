@@ -0,0 +1,155 @@
+import unittest
+
+from hikerservespacecraft.fleet.fleet import ALL_SPACECRAFT, Fleet
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.spacecraft import Spacecraft
+from tests import make_spacecraft
+
+
+class TestCommandRouting(unittest.TestCase):
+
+    def test_routes_through_cached_table(self):
+        sc = make_spacecraft(boot=True)
+        computer = sc.spacecraft_computer
+        computer.route_command({"device_id": "harvester", "command": "activate", "args": {}})
+
+        response = computer.route_command({"device_id": "harvester", "command": "set_target_output",
+                                           "args": [0.005]})
+        self.assertTrue(response.success)
+        self.assertEqual(response.return_data, {"target_output": 0.005})
+
+    def test_error_responses(self):
+        computer = make_spacecraft(boot=True).spacecraft_computer
+
+        self.assertEqual(computer.route_command({"device_id": "nope", "command": "activate", "args": {}})["message"],
+                         "nope not found")
+        self.assertEqual(computer.route_command({"device_id": "battery", "command": "explode", "args": {}})["message"],
+                         "Command explode not found for battery")
+        self.assertEqual(computer.route_command({"device_id": "battery", "command": "get_max_capacity",
+                                                 "args": {}})["message"], "CesiumSulphurBattery is offline")
+
+    def test_table_is_invalidated_when_components_are_added(self):
+        sc = make_spacecraft(boot=True)
+        computer = sc.spacecraft_computer
+        computer.route_command({"device_id": "battery", "command": "activate", "args": {}})
+
+        sc.add_spacecraft_component(CesiumSulphurBattery(name="battery_2", description="test", mass=1, volume=1))
+        response = computer.route_command({"device_id": "battery_2", "command": "activate", "args": {}})
+        self.assertTrue(response.success)
+        self.assertIn("battery_2", computer.list_commandable_devices().return_data["commandable_devices"])
+
+    def test_arguments_are_coerced_and_validated(self):
+        sc = make_spacecraft(boot=True)
+        computer = sc.spacecraft_computer
+        computer.route_command({"device_id": "harvester", "command": "activate", "args": {}})
+
+        response = computer.route_command({"device_id": "harvester", "command": "set_target_output",
+                                           "args": {"target_power": "0.004"}})
+        self.assertEqual(response.return_data, {"target_output": 0.004})
+
+        for args, message in (([], "missing argument 'target_power'"),
+                              (["fast"], "argument 'target_power' must be float, got 'fast'"),
+                              ([True], "argument 'target_power' must be float, got True"),
+                              ([1.0, 2.0], "takes 1 argument(s) but 2 were given"),
+                              ({"power": 1.0}, "unexpected argument 'power'"),
+                              (5, "arguments must be a list or a dict, got int"),
+                              ("abc", "arguments must be a list or a dict, got str"),
+                              ("7", "arguments must be a list or a dict, got str")):
+            response = computer.route_command({"device_id": "harvester", "command": "set_target_output",
+                                               "args": args})
+            self.assertFalse(response.success)
+            self.assertEqual(response.message, f"Invalid arguments for set_target_output: {message}")
+        self.assertEqual(sc.power_bus.components["harvester"].target_output, 0.004)
+
+        response = computer.route_command({"device_id": "harvester", "command": "activate", "args": 5})
+        self.assertFalse(response.success)
+        self.assertEqual(response.message,
+                         "Invalid arguments for activate: arguments must be a list or a dict, got int")
+        response = sc.power_bus.components["harvester"].execute(cmd="activate", args=5)
+        self.assertFalse(response.success)
+
+        # called directly, without the routing layer, the methods still validate their input
+        harvester = sc.power_bus.components["harvester"]
+        self.assertEqual(harvester.set_target_output("0.002").return_data, {"target_output": 0.002})
+        for method in (harvester.set_target_output, harvester.set_maximum_power_output):
+            response = method("fast")
+            self.assertFalse(response.success)
+            self.assertEqual(response.message, "Invalid numeric value")
+
+    def test_query_responses_are_cached_per_tick(self):
+        sc = make_spacecraft(boot=True)
+        computer = sc.spacecraft_computer
+        computer.route_command({"device_id": "battery", "command": "activate", "args": {}})
+        query = {"device_id": "battery", "command": "get_current_capacity", "args": {}}
+
+        battery = sc.power_bus.components["battery"]
+        battery.max_capacity_GJ = 10.0
+        first = computer.route_command(query)
+        level = first.return_data["current_level_GJ"]
+        # a caller changing its response does not change what later callers get
+        first.return_data["current_level_GJ"] = -1.0
+        # nor does state written behind the computer's back before the next tick: the answer is cached
+        battery.current_energy_level_GJ = level + 1.0
+        cached = computer.route_command(query)
+        self.assertIsNot(cached, first)
+        self.assertEqual(cached.return_data, {"current_level_GJ": level})
+        self.assertIsNot(computer.route_command(query), cached)
+
+        sc.tick(1.0)
+        after_tick = computer.route_command(query)
+        self.assertNotEqual(after_tick.return_data["current_level_GJ"], level)
+
+        computer.route_command({"device_id": "harvester", "command": "activate", "args": {}})
+        self.assertEqual(computer.route_command(query).return_data, after_tick.return_data)
+
+        computer.route_command({"device_id": "battery", "command": "deactivate", "args": {}})
+        self.assertEqual(computer.route_command(query)["message"], "CesiumSulphurBattery is offline")
+
+    def test_batch_boots_first_and_keeps_order(self):
+        sc = Spacecraft(name="sc")
+        sc.add_spacecraft_component(CesiumSulphurBattery(name="battery", description="test", mass=1, volume=1))
+        sc.add_spacecraft_component(SubspaceHarvester(name="harvester", description="test", mass=1, volume=1))
+
+        results = sc.spacecraft_computer.route_commands([
+            {"device_id": "harvester", "command": "activate", "args": {}},
+            {"device_id": "harvester", "command": "set_target_output", "args": [0.005]},
+            {"device_id": "nope", "command": "activate", "args": {}},
+            {"device_id": "main_computer", "command": "boot", "args": {}},
+        ])
+
+        self.assertTrue(all(r.success for r in (results[0], results[1], results[3])))
+        self.assertEqual(results[1].return_data, {"target_output": 0.005})
+        self.assertEqual(results[2]["message"], "nope not found")
+
+    def test_batch_stop_on_failure(self):
+        sc = make_spacecraft(boot=True)
+        computer = sc.spacecraft_computer
+        batch = [{"device_id": "battery", "command": "get_max_capacity", "args": {}},
+                 {"device_id": "harvester", "command": "activate", "args": {}}]
+
+        results = computer.route_commands(batch, stop_on_failure=True)
+        self.assertEqual(results[0]["message"], "CesiumSulphurBattery is offline")
+        self.assertEqual(results[1]["message"], "skipped after an earlier failure")
+        self.assertFalse(sc.power_bus.components["harvester"].is_active)
+
+        # a malformed command stops the whole batch before anything runs
+        results = computer.route_commands([batch[1], {"device_id": "battery", "args": {}}], stop_on_failure=True)
+        self.assertEqual(results[0]["message"], "skipped after an earlier failure")
+        self.assertEqual(results[1]["message"], "command not specified")
+
+    def test_fleet_wide_activate(self):
+        fleet = Fleet()
+        for name in ("a", "b", "c"):
+            fleet.add_spacecraft(make_spacecraft(name, boot=True))
+
+        results = fleet.route_commands([{"spacecraft": ALL_SPACECRAFT, "device_id": "harvester",
+                                         "command": "activate", "args": {}}])
+
+        self.assertEqual([ident for ident, _ in results], list(fleet.spacecraft))
+        self.assertTrue(all(response.success for _, response in results))
+        self.assertTrue(all(sc.power_bus.components["harvester"].is_active for sc in fleet.get_spacecraft()))
+
+
+if __name__ == "__main__":
+    unittest.main()
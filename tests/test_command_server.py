@@ -0,0 +1,91 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from hikerservespacecraft.runtime.async_runtime import AsyncSimulationRuntime
+from hikerservespacecraft.runtime.command_client import CommandClient, CommandError
+from hikerservespacecraft.runtime.command_protocol import COMMAND, ERROR, HEADER, ProtocolError, decode_value, \
+    encode_value, read_frame
+from hikerservespacecraft.runtime.command_server import CommandServer
+from tests import make_spacecraft
+
+BOOT = {"device_id": "main_computer", "command": "boot", "args": {}}
+
+
+class TestCommandProtocol(unittest.TestCase):
+
+    def test_round_trip(self):
+        value = {"device_id": "thruster", "args": [1, -2.5, True, None, "ü", b"\x00", 2 ** 70], "nested": {"a": []}}
+        self.assertEqual(decode_value(encode_value(value)), value)
+
+    def test_rejects_malformed_payloads(self):
+        for data in (b"", b"s\x00\x00\x00\x09abc", b"Q", b"NN", b"i\x00",
+                     b"m\x00\x00\x00\x01l\x00\x00\x00\x00N", b"m\x00\x00\x00\x01i" + bytes(8) + b"N"):
+            with self.assertRaises(ProtocolError):
+                decode_value(data)
+
+
+class TestCommandServer(unittest.TestCase):
+
+    def test_pipelined_commands_over_unix_socket(self):
+        async def scenario():
+            sc = make_spacecraft()
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "commands.sock")
+                async with CommandServer(sc) as server:
+                    await server.start_unix(path)
+                    async with CommandClient(path=path, pool_size=2) as client:
+                        self.assertTrue((await client.execute(BOOT))["success"])
+                        cmds = [{"device_id": "harvester", "command": "activate", "args": {}}] + [
+                            {"device_id": "harvester", "command": "set_target_output", "args": [1e-5 * i]}
+                            for i in range(1, 201)]
+                        responses = await client.execute_many(cmds)
+                        concurrent = await asyncio.gather(*(client.execute({"device_id": "nope", "command": "x",
+                                                                             "args": {}}) for _ in range(10)))
+                    self.assertEqual(server.commands_served, 212)
+                self.assertFalse(os.path.exists(path))
+            return sc, responses, concurrent
+
+        sc, responses, concurrent = asyncio.run(scenario())
+        self.assertTrue(all(response["success"] for response in responses))
+        self.assertEqual(responses[-1]["return"], {"target_output": 200 * 1e-5})
+        self.assertEqual(sc.power_bus.components["harvester"].target_output, 200 * 1e-5)
+        self.assertTrue(all(response["message"] == "nope not found" for response in concurrent))
+
+    def test_batches_and_errors_over_tcp_with_runtime(self):
+        async def scenario():
+            sc = make_spacecraft()
+            runtime = AsyncSimulationRuntime(sc, dt_s=0.005)
+            async with runtime, CommandServer(sc, runtime=runtime) as server:
+                await server.start_tcp()
+                _, port = server.address
+                async with CommandClient(port=port) as client:
+                    batch = await client.execute_batch([
+                        {"device_id": "battery", "command": "activate", "args": {}},
+                        BOOT,
+                        {"device_id": "battery", "command": "get_max_capacity", "args": {}},
+                    ])
+                    with self.assertRaises(CommandError):
+                        await client.execute(["not", "a", "dict"])
+                    after_error = await client.execute({"device_id": "battery", "command": "deactivate", "args": {}})
+
+                # a dict keyed by a list: answered with an ERROR frame
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                payload = b"m\x00\x00\x00\x01l\x00\x00\x00\x00N"
+                writer.write(HEADER.pack(len(payload) + 5, 7, COMMAND) + payload)
+                await writer.drain()
+                _, kind, message = await read_frame(reader)
+                writer.close()
+                await writer.wait_closed()
+            return batch, after_error, kind, message
+
+        batch, after_error, kind, message = asyncio.run(scenario())
+        self.assertEqual(kind, ERROR)
+        self.assertIn("Dictionary keys must be strings", message["message"])
+        self.assertEqual([response["success"] for response in batch], [True, True, True])
+        self.assertTrue(after_error["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+from hikerservespacecraft.active_component import ActiveComponent
+from hikerservespacecraft.array_backed import is_array_bound
+from hikerservespacecraft.fleet.fleet import Fleet
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.payloads.propulsion.linear_thrust_profile import LinearThrustProfile
+from hikerservespacecraft.payloads.propulsion.simple_electric_thruster import SimpleElectricThruster
+from hikerservespacecraft.payloads.propulsion.thruster import Thruster
+from hikerservespacecraft.power_component import PowerComponent, POWER_CONSUMER, POWER_STORAGE
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.tick_scheduler import TickScheduler
+
+
+def _thruster(name: str) -> SimpleElectricThruster:
+    return SimpleElectricThruster(name=name, description="test", mass=5, volume=1,
+                                  thrust_profile=LinearThrustProfile(min_thrust=0, max_thrust=100, min_power=0,
+                                                                     max_power=100))
+
+
+class _Counter(ActiveComponent):
+
+    def __init__(self, name: str):
+        super().__init__(name, "test", mass=1, volume=1)
+        self.is_active = True
+        self.ticks = 0
+
+    def tick(self, dt_s: float) -> dict:
+        self.ticks += 1
+        return {}
+
+
+class TestComponentRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.sc = Spacecraft(name="sc")
+        self.battery = CesiumSulphurBattery(name="battery", description="test", mass=1, volume=1)
+        self.sc.add_spacecraft_component(self.battery)
+        self.sc.add_spacecraft_component(SubspaceHarvester(name="harvester", description="test", mass=1, volume=1))
+        self.sc.add_spacecraft_component(_thruster("t1"))
+        self.sc.add_spacecraft_component(_thruster("t2"))
+
+    def test_lookups(self):
+        registry = self.sc.get_component_registry()
+        self.assertIs(self.sc.get_component("battery"), self.battery)
+        self.assertEqual(registry.by_category("power/storage"), (self.battery,))
+        self.assertEqual(len(registry.by_category("power")), 2)
+        self.assertEqual([c.name for c in self.sc.get_propulsion_components()], ["t1", "t2"])
+        self.assertEqual(len(registry.by_class(PowerComponent)), 4)
+        self.assertEqual(self.sc.power_bus.get_components_by_power_type(POWER_CONSUMER),
+                         registry.by_power_type(POWER_CONSUMER))
+
+    def test_remove_updates_indexes_and_buses(self):
+        self.sc.remove_spacecraft_component("t1")
+        self.sc.remove_spacecraft_component("battery")
+
+        self.assertEqual([c.name for c in self.sc.get_propulsion_components()], ["t2"])
+        self.assertFalse(self.sc.get_component_registry().has_category("power/storage"))
+        self.assertNotIn("t1", self.sc.power_bus.components)
+        self.assertEqual(self.sc.power_bus.get_components_by_power_type(POWER_STORAGE), ())
+        self.assertEqual(self.sc.mass, 6)
+        self.assertEqual(self.sc.spacecraft_computer.boot().message,
+                         "main_computer boot failed: No energy storage components found.")
+
+        with self.assertRaises(KeyError):
+            self.sc.remove_spacecraft_component("t1")
+        with self.assertRaises(ValueError):
+            self.sc.add_spacecraft_component(_thruster("t2"))
+
+    def test_removed_components_leave_fleet_engines_and_schedulers(self):
+        fleet = Fleet()
+        fleet.add_spacecraft(self.sc)
+        harvester = self.sc.get_component("harvester")
+        self.assertTrue(is_array_bound(harvester))
+
+        removed = self.sc.remove_spacecraft_component("harvester")
+        self.assertIs(removed, harvester)
+        self.assertFalse(is_array_bound(harvester))
+        self.assertNotIn(harvester, fleet.generation.components)
+        output = harvester.current_power_output
+        fleet.tick(1.0)
+        self.assertEqual(harvester.current_power_output, output)
+
+        counter = _Counter("counter")
+        self.sc.add_spacecraft_component(counter)
+        scheduler = TickScheduler(self.sc)
+        scheduler.tick(1.0)
+        self.assertEqual(counter.ticks, 1)
+        self.sc.remove_spacecraft_component("counter")
+        for _ in range(3):
+            scheduler.tick(1.0)
+        self.assertEqual(counter.ticks, 1)
+
+        # a component added after the scheduler was built is scheduled on the next tick
+        late = _Counter("late")
+        self.sc.add_spacecraft_component(late)
+        scheduler.tick(1.0)
+        self.assertEqual(late.ticks, 1)
+
+    def test_registry_is_rebuilt_when_missing(self):
+        # as after deserialization, which restores attributes but not the derived indexes
+        del self.sc.__dict__["_registry"]
+        del self.sc.power_bus.__dict__["_registry"]
+        self.assertEqual(len(self.sc.get_component_registry().by_class(Thruster)), 2)
+        self.assertEqual(len(self.sc.power_bus.get_components_by_power_type(POWER_CONSUMER)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from hikerservespacecraft.dirty_tracking import DirtyTracked
+from hikerservespacecraft.fleet.fleet import Fleet
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.delta import DeltaTracker, compact
+from hikerservespacecraft.utils.ser import deserialize, serialize
+from tests import make_spacecraft
+
+
+def _set_target(sc: Spacecraft, target: float) -> None:
+    sc.spacecraft_computer.route_command({"device_id": "harvester", "command": "set_target_output",
+                                          "args": [target]})
+
+
+class TestDirtyTracking(unittest.TestCase):
+
+    def test_assignments_are_recorded_after_mark_clean(self):
+        battery = CesiumSulphurBattery(name="battery", description="test", mass=1, volume=1)
+        battery.is_active = True
+        self.assertFalse(battery.is_tracking_changes())
+        self.assertEqual(battery.get_dirty_attributes(), frozenset())
+
+        battery.mark_clean()
+        battery.is_active = False
+        battery.mark_dirty("description")
+        self.assertEqual(battery.get_dirty_attributes(), {"is_active", "description"})
+        self.assertNotIn("_dirty_attributes", serialize(battery))
+
+    def test_untracked_classes_keep_plain_assignment(self):
+        class Probe(DirtyTracked):
+            pass
+
+        probe = Probe()
+        self.assertIs(Probe.__setattr__, object.__setattr__)
+        probe.mark_clean()
+        probe.reading = 1.0
+        self.assertEqual(probe.get_dirty_attributes(), {"reading"})
+        self.assertIsNot(Probe.__setattr__, object.__setattr__)
+
+
+class TestDeltaSnapshots(unittest.TestCase):
+
+    def test_delta_holds_only_changed_fields(self):
+        sc = make_spacecraft(activate=True)
+        tracker = DeltaTracker(sc)
+        tracker.snapshot()
+        _set_target(sc, 1e-5)
+        delta = tracker.delta()
+
+        self.assertEqual(delta["sequence"], 1)
+        self.assertEqual(delta["components"], {"harvester": {"target_output": 1e-5}})
+        self.assertEqual(delta["objects"], {})
+        self.assertEqual(tracker.delta()["components"], {})
+
+    def test_compacted_chain_matches_full_snapshot(self):
+        sc = make_spacecraft(activate=True)
+        tracker = DeltaTracker(sc)
+        base = tracker.snapshot()
+        deltas = []
+        for i in range(10):
+            _set_target(sc, 1e-5 * i)
+            sc.tick(0.5)
+            if i == 3:
+                sc.remove_spacecraft_component("battery")
+            if i == 6:
+                sc.add_spacecraft_component(CesiumSulphurBattery(name="battery", description="new", mass=2,
+                                                                 volume=1))
+            deltas.append(tracker.delta())
+
+        document = compact(base, deltas, base_sequence=0)
+        restored = deserialize(document)
+        # the re-added battery is numbered past the base document, otherwise the same graph
+        self.assertEqual(serialize(restored), serialize(sc))
+        self.assertEqual(restored.get_component("battery").description, "new")
+        self.assertIs(restored.power_bus.components["battery"], restored.get_component("battery"))
+
+        with self.assertRaises(ValueError):
+            compact(base, deltas[:2] + deltas[3:], base_sequence=0)
+
+    def test_fleet_engine_fields_are_diffed(self):
+        sc = make_spacecraft(activate=True)
+        fleet = Fleet()
+        fleet.add_spacecraft(sc)
+        tracker = DeltaTracker(sc)
+        base = tracker.snapshot()
+
+        deltas = []
+        for i in range(5):
+            _set_target(sc, 2e-5 * i)
+            fleet.tick(0.5)
+            deltas.append(tracker.delta())
+
+        # static engine-held fields such as the ramp rate are not re-emitted
+        self.assertNotIn("ramp_rate", deltas[-1]["components"]["harvester"])
+        self.assertEqual(compact(base, deltas, base_sequence=0), serialize(sc))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.payloads.propulsion.linear_thrust_profile import LinearThrustProfile
+from hikerservespacecraft.payloads.propulsion.simple_electric_thruster import SimpleElectricThruster
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.tickable import fast_forward
+
+
+def _make_spacecraft(thrust: float) -> Spacecraft:
+    sc = Spacecraft(name="sc")
+    for index, (level, capacity, rate) in enumerate([(1.0, 6.0, 0.4), (4.0, 8.0, 0.3)]):
+        battery = CesiumSulphurBattery(name=f"battery_{index}", description="test", mass=1, volume=1)
+        battery.current_energy_level_GJ = level
+        battery.max_capacity_GJ = capacity
+        battery.max_charging_rate_A = rate
+        battery.max_discharging_rate_A = rate
+        sc.add_spacecraft_component(battery)
+
+    harvester = SubspaceHarvester(name="harvester", description="test", mass=1, volume=1)
+    harvester.maximum_power_output = 1.5
+    harvester.efficiency = 0.8
+    harvester.ramp_rate = 0.02
+    sc.add_spacecraft_component(harvester)
+
+    thruster = SimpleElectricThruster(name="thruster", description="test", mass=1, volume=1,
+                                      thrust_profile=LinearThrustProfile(min_power=0, max_power=1,
+                                                                         min_thrust=0, max_thrust=100))
+    sc.add_spacecraft_component(thruster)
+    thruster.activate()
+    thruster.set_thrust(thrust)
+    return sc
+
+
+class TestFastForward(unittest.TestCase):
+
+    def _assert_close_to_fine_ticking(self, thrust: float, duration_s: float):
+        dt_s = 1e-3
+        ticked = _make_spacecraft(thrust)
+        for _ in range(int(round(duration_s / dt_s))):
+            ticked.tick(dt_s)
+
+        advanced = _make_spacecraft(thrust)
+        advanced.advance(duration_s)
+
+        for name in ("battery_0", "battery_1"):
+            self.assertAlmostEqual(ticked.power_bus.components[name].current_energy_level_GJ,
+                                   advanced.power_bus.components[name].current_energy_level_GJ, delta=2e-3)
+        self.assertAlmostEqual(ticked.power_bus.components["harvester"].current_power_output,
+                               advanced.power_bus.components["harvester"].current_power_output)
+
+    def test_charging_through_ramp_and_full_battery(self):
+        # ramp completes at 75 s, battery_0 fills on the way
+        self._assert_close_to_fine_ticking(thrust=10.0, duration_s=120.0)
+
+    def test_deficit_crossing_to_surplus_and_empty_battery(self):
+        # demand exceeds output until the ramp catches up, draining battery_0 first
+        self._assert_close_to_fine_ticking(thrust=90.0, duration_s=80.0)
+
+    def test_long_coast_is_exact_in_steady_state(self):
+        sc = _make_spacecraft(thrust=0.0)
+        sc.advance(1e7)
+        self.assertEqual(sc.power_bus.components["battery_0"].current_energy_level_GJ, 6.0)
+        self.assertEqual(sc.power_bus.components["battery_1"].current_energy_level_GJ, 8.0)
+        self.assertEqual(sc.power_bus.components["battery_0"].current_power_flow_A, 0.0)
+
+    def test_non_positive_step_is_rejected(self):
+        sc = _make_spacecraft(thrust=10.0)
+        for max_step_s in (0.0, -1.0):
+            with self.assertRaises(ValueError):
+                sc.advance(10.0, max_step_s)
+            with self.assertRaises(ValueError):
+                fast_forward(sc.power_bus.components["thruster"], 10.0, max_step_s)
+        self.assertEqual(sc.power_bus.components["battery_0"].current_energy_level_GJ, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import time
+import unittest
+
+from hikerservespacecraft.command_response import CommandResponse
+from hikerservespacecraft.commandable import command
+from hikerservespacecraft.fleet.runner import ShardedFleetRunner
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+from hikerservespacecraft.spacecraft import Spacecraft
+from tests import make_spacecraft
+
+
+def _make_spacecraft(index: int) -> Spacecraft:
+    sc = make_spacecraft(f"sc_{index}")
+    battery = sc.get_component("battery")
+    battery.max_capacity_GJ = 100.0
+    battery.max_charging_rate_A = 1.0
+    harvester = sc.get_component("harvester")
+    harvester.maximum_power_output = float(index + 1)
+    harvester.efficiency = 1.0
+    return sc
+
+
+class _FaultyHarvester(SubspaceHarvester):
+
+    @command
+    def recalibrate(self) -> CommandResponse:
+        raise RuntimeError("calibration lost")
+
+    @command
+    def stall(self) -> CommandResponse:
+        time.sleep(2.0)
+        return CommandResponse(True, "stalled")
+
+
+class TestShardedFleetRunner(unittest.TestCase):
+
+    def test_lockstep_ticks_and_command_routing(self):
+        fleet = [_make_spacecraft(i) for i in range(6)]
+        with ShardedFleetRunner(fleet, workers=3, tick_timeout_s=30) as runner:
+            ticket = runner.submit_command("sc_4", {"device_id": "main_computer", "command": "boot", "args": {}})
+            runner.tick(1.0)
+            responses = runner.collect_command_responses()
+            self.assertTrue(responses[ticket]["success"])
+
+            runner.run(2, 1.0)
+            produced = runner.get_metric("produced").copy()
+            flow = runner.get_metric("storage_flow").copy()
+
+        self.assertEqual(list(produced), [float(i + 1) for i in range(6)])
+        self.assertEqual(list(flow), [1.0] * 6)
+
+    def test_failing_command_does_not_stop_the_runner(self):
+        fleet = [_make_spacecraft(i) for i in range(2)]
+        fleet[1].add_spacecraft_component(_FaultyHarvester(name="faulty", description="test", mass=1, volume=1))
+        with ShardedFleetRunner(fleet, workers=2, tick_timeout_s=30) as runner:
+            boot = runner.submit_command("sc_1", {"device_id": "main_computer", "command": "boot", "args": {}})
+            faulty = runner.submit_command("sc_1", {"device_id": "faulty", "command": "activate", "args": {}})
+            broken = runner.submit_command("sc_1", {"device_id": "faulty", "command": "recalibrate", "args": {}})
+            runner.tick(1.0)
+            activate = runner.submit_command("sc_1", {"device_id": "harvester", "command": "activate", "args": {}})
+            runner.tick(1.0)
+            responses = runner.collect_command_responses()
+
+        self.assertTrue(responses[boot]["success"])
+        self.assertTrue(responses[faulty]["success"])
+        self.assertFalse(responses[broken]["success"])
+        self.assertIn("recalibrate on sc_1 failed", responses[broken]["message"])
+        self.assertIn("calibration lost", responses[broken]["message"])
+        self.assertTrue(responses[activate]["success"])
+
+    def test_dead_worker_fails_the_run(self):
+        with ShardedFleetRunner([_make_spacecraft(i) for i in range(4)], workers=2) as runner:
+            runner.tick(1.0)
+            runner._processes[1].kill()
+            start = time.monotonic()
+            with self.assertRaises(RuntimeError) as raised:
+                runner.tick(1.0)
+        self.assertLess(time.monotonic() - start, 10.0)
+        self.assertIn("worker 1 exited with code -9", str(raised.exception))
+
+    def test_slow_tick_fails_the_run(self):
+        fleet = [_make_spacecraft(0)]
+        fleet[0].add_spacecraft_component(_FaultyHarvester(name="faulty", description="test", mass=1, volume=1))
+        with ShardedFleetRunner(fleet, workers=1, tick_timeout_s=0.5) as runner:
+            runner.submit_command("sc_0", {"device_id": "main_computer", "command": "boot", "args": {}})
+            runner.submit_command("sc_0", {"device_id": "faulty", "command": "activate", "args": {}})
+            runner.submit_command("sc_0", {"device_id": "faulty", "command": "stall", "args": {}})
+            with self.assertRaises(RuntimeError) as raised:
+                runner.tick(1.0)
+        self.assertIn("tick not completed within 0.5 s", str(raised.exception))
+
+    def test_unknown_ident_is_rejected(self):
+        runner = ShardedFleetRunner([_make_spacecraft(0)], workers=1)
+        with self.assertRaises(ValueError):
+            runner.submit_command("missing", {"device_id": "main_computer", "command": "boot", "args": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
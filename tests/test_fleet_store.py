@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hikerservespacecraft.utils.fleet_store import FleetStore
+from hikerservespacecraft.utils.ser import serialize
+from tests import make_spacecraft
+
+
+class TestFleetStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fleet.store")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_random_access_by_ident(self):
+        ships = [make_spacecraft(f"sc-{i}") for i in range(200)]
+        ships[7].position_m = np.array([1.0, 2.0, 3.0])
+        with FleetStore(self.path, mode="w") as store:
+            self.assertEqual(store.put_many(ships), 200)
+
+        with FleetStore(self.path) as store:
+            self.assertEqual(len(store), 200)
+            self.assertIn("sc-150", store)
+            restored = store.get("sc-7")
+            self.assertEqual(serialize(restored), serialize(ships[7]))
+            self.assertTrue(restored.position_m.flags.writeable)
+
+            shared = store.get("sc-7", copy=False)
+            np.testing.assert_array_equal(shared.position_m, [1.0, 2.0, 3.0])
+            self.assertFalse(shared.position_m.flags.writeable)
+            self.assertTrue(store.is_current(ships[7]))
+            del shared
+            with self.assertRaises(PermissionError):
+                store.put(ships[0])
+
+    def test_updates_are_seen_by_open_readers(self):
+        with FleetStore(self.path, mode="w") as writer, FleetStore(self.path) as reader:
+            # enough updates to pass the index rewrite threshold several times
+            for i in range(300):
+                ship = make_spacecraft(f"sc-{i % 40}")
+                ship.mass = float(i)
+                writer.put(ship)
+            writer.remove("sc-3")
+
+            self.assertTrue(reader.refresh())
+            self.assertFalse(reader.refresh())
+            self.assertEqual(len(reader), 39)
+            self.assertNotIn("sc-3", reader)
+            self.assertEqual(reader.get("sc-19").mass, 299.0)
+
+        with FleetStore(self.path, mode="a") as store, FleetStore(self.path) as reader:
+            self.assertEqual(store.get("sc-19").mass, 299.0)
+            size = os.path.getsize(self.path)
+            store.compact()
+            self.assertTrue(reader.refresh())
+            self.assertEqual(reader.get("sc-0").mass, 280.0)
+            self.assertLess(os.path.getsize(self.path), size)
+            self.assertEqual(sorted(store.idents()), sorted(f"sc-{i}" for i in range(40) if i != 3))
+            self.assertEqual(store.get("sc-0").mass, 280.0)
+
+        with FleetStore(self.path) as store:
+            self.assertEqual(len(store), 39)
+            self.assertEqual(store.get("sc-39").mass, 279.0)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"x" * 128)
+        with self.assertRaises(ValueError):
+            FleetStore(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
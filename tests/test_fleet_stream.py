@@ -0,0 +1,60 @@
+import io
+import json
+import unittest
+
+import numpy as np
+
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.fleet_stream import iter_documents, iter_fleet, write_fleet
+from hikerservespacecraft.utils.ser import DeserializationError, iter_serialize, serialize
+from tests import make_spacecraft
+
+
+def _make_spacecraft(ident: str) -> Spacecraft:
+    sc = make_spacecraft(ident)
+    # a newline the stream has to escape
+    sc.get_component("harvester").description = "line\nbreak"
+    return sc
+
+
+class TestIterSerialize(unittest.TestCase):
+
+    def test_matches_json_dumps_of_serialize(self):
+        sc = _make_spacecraft("sc")
+        sc.power_bus.components["battery"].extra = {"t": (1, {2}), 3: [frozenset(), [], {}], "nan": float("nan"),
+                                                    "array": np.arange(4.0), "scalar": np.int64(5)}
+        for value in (sc, [], {}, (), None, 1.5, "é", [[1, [2]]]):
+            self.assertEqual("".join(iter_serialize(value)), json.dumps(serialize(value)))
+
+
+class TestFleetStream(unittest.TestCase):
+
+    def test_round_trip_text_and_binary(self):
+        for fp in (io.StringIO(), io.BytesIO()):
+            # a generator: the writer never needs the whole fleet at once
+            count = write_fleet((_make_spacecraft(f"sc-{i}") for i in range(5)), fp, buffer_size=100)
+            self.assertEqual(count, 5)
+
+            fp.seek(0)
+            ships = list(iter_fleet(fp))
+            self.assertEqual([ship.ident for ship in ships], [f"sc-{i}" for i in range(5)])
+            self.assertEqual(serialize(ships[2]), serialize(_make_spacecraft("sc-2")))
+
+    def test_scan_documents(self):
+        fp = io.BytesIO()
+        write_fleet([_make_spacecraft("a"), _make_spacecraft("b")], fp)
+        fp.seek(0)
+        self.assertEqual([document["ident"] for document in iter_documents(fp)], ["a", "b"])
+
+    def test_rejects_other_streams(self):
+        with self.assertRaises(DeserializationError):
+            list(iter_fleet(io.StringIO('{"ident": "a"}\n')))
+
+        fp = io.StringIO()
+        write_fleet([_make_spacecraft("a")], fp)
+        with self.assertRaises(DeserializationError):
+            list(iter_fleet(io.StringIO(fp.getvalue()[:-40])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import random
+import unittest
+
+import numpy as np
+
+from hikerservespacecraft.fleet.generation_engine import GenerationEngine
+from hikerservespacecraft.payloads.energy_generation.energy_generation_component import EnergyGenerationComponent
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+
+
+def _make_generator(rng: random.Random, index: int) -> EnergyGenerationComponent:
+    gen = EnergyGenerationComponent(name=f"gen_{index}", description="test", mass=1, volume=1,
+                                    maximum_power_output=rng.uniform(0, 100),
+                                    efficiency=rng.uniform(0.1, 1.0),
+                                    ramp_rate=rng.uniform(0.5, 20))
+    gen.current_power_output = rng.uniform(0, 100)
+    gen.target_output = rng.choice([None, rng.uniform(0, 150)])
+    gen.enabled = rng.random() > 0.2
+    return gen
+
+
+class TestGenerationEngine(unittest.TestCase):
+
+    def test_step_matches_scalar_tick(self):
+        rng = random.Random(7)
+        scalar = [_make_generator(rng, i) for i in range(200)]
+        rng = random.Random(7)
+        bound = [_make_generator(rng, i) for i in range(200)]
+
+        engine = GenerationEngine(initial_capacity=4)
+        for gen in bound:
+            engine.add(gen)
+
+        for _ in range(10):
+            expected = [gen.tick(0.5) for gen in scalar]
+            energy = engine.step(0.5)
+            np.testing.assert_allclose(energy, expected)
+
+        for a, b in zip(scalar, bound):
+            self.assertAlmostEqual(a.current_power_output, b.current_power_output)
+
+    def test_bound_component_is_a_view(self):
+        gen = SubspaceHarvester(name="harvester", description="test", mass=1, volume=1)
+        engine = GenerationEngine()
+        engine.add(gen)
+
+        gen.set_target_output(0.005)
+        self.assertEqual(engine.view("target_output")[0], 0.005)
+        self.assertIsInstance(gen.target_output, float)
+
+        engine.step(1.0)
+        response = gen.get_current_power_output()
+        self.assertEqual(response.return_data["current_power_output"], 0.005)
+        self.assertEqual(gen.__getstate__()["current_power_output"], 0.005)
+        self.assertNotIn("_array_engine", gen.__getstate__())
+
+    def test_remove_writes_back_and_compacts(self):
+        gens = [EnergyGenerationComponent(name=f"g{i}", description="", mass=1, volume=1,
+                                          maximum_power_output=i) for i in range(3)]
+        engine = GenerationEngine()
+        for gen in gens:
+            engine.add(gen)
+        engine.step(1e6)
+
+        engine.remove(gens[0])
+        self.assertIsNone(gens[0].get_array_engine())
+        self.assertEqual(gens[0].current_power_output, 0.0)
+        self.assertEqual(len(engine), 2)
+        self.assertEqual(engine.slot_of(gens[2]), 0)
+        self.assertEqual(gens[2].current_power_output, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from hikerservespacecraft import instrumentation
+from hikerservespacecraft.instrumentation import LatencyHistogram, bucket_index, bucket_upper_bound
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.spacecraft import Spacecraft
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_buckets_bound_relative_error(self):
+        for value in (0, 7, 15, 16, 17, 1000, 123_456_789, 2 ** 62 + 5):
+            upper = bucket_upper_bound(bucket_index(value))
+            self.assertGreaterEqual(upper, value)
+            self.assertLessEqual(upper - value, max(value / 8, 0))
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 1001):
+            histogram.record(value * 1000)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 500_000, delta=500_000 / 8)
+        self.assertAlmostEqual(histogram.percentile(99), 990_000, delta=990_000 / 8)
+        self.assertEqual(histogram.percentile(100), 1_000_000)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_records_commands_and_ticks_only_when_enabled(self):
+        sc = Spacecraft(name="sc")
+        sc.add_spacecraft_component(CesiumSulphurBattery(name="battery", description="test", mass=1, volume=1))
+        sc.add_spacecraft_component(SubspaceHarvester(name="harvester", description="test", mass=1, volume=1))
+        computer = sc.spacecraft_computer
+        computer.route_command({"device_id": "main_computer", "command": "boot", "args": {}})
+        self.assertEqual(instrumentation.snapshot(), {"commands": {}, "ticks": {}})
+
+        recorder = instrumentation.enable()
+        computer.route_command({"device_id": "harvester", "command": "activate", "args": {}})
+        computer.route_commands([{"device_id": "battery", "command": "activate", "args": {}}])
+        for _ in range(3):
+            sc.tick(0.1)
+
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(set(snapshot["commands"]), {"harvester/activate", "battery/activate"})
+        self.assertEqual(snapshot["ticks"]["SubspaceHarvester"]["count"], 3)
+        self.assertEqual(snapshot["ticks"]["CesiumSulphurBattery"]["count"], 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spacecraft.prom")
+            recorder.write_prometheus(path)
+            with open(path) as f:
+                text = f.read()
+        self.assertIn('hikerverse_command_latency_seconds_count{device="harvester",command="activate"} 1', text)
+        self.assertIn('hikerverse_component_tick_seconds_bucket{component_class="SubspaceHarvester",le="+Inf"} 3',
+                      text)
+
+        self.assertIs(instrumentation.disable(), recorder)
+        sc.tick(0.1)
+        self.assertEqual(recorder.snapshot()["ticks"]["SubspaceHarvester"]["count"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
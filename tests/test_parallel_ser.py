@@ -0,0 +1,85 @@
+import json
+import pickle
+import time
+import unittest
+
+from hikerservespacecraft.fleet.fleet import Fleet
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils import snapshot
+from hikerservespacecraft.utils.parallel_ser import SnapshotPool, _decode_shard, _load_capture, capture, deserialize_many, \
+    serialize_many
+from hikerservespacecraft.utils.ser import deserialize, serialize
+from tests import make_spacecraft
+
+
+def _make_spacecraft(ident: str) -> Spacecraft:
+    sc = make_spacecraft(ident, boot=True)
+    # a listener cannot be pickled, and is not part of a snapshot
+    sc.spacecraft_computer.add_command_listener(lambda device_id, command_: None)
+    return sc
+
+
+class TestParallelSerialization(unittest.TestCase):
+
+    def test_capture_leaves_out_excluded_attributes(self):
+        sc = _make_spacecraft("sc")
+        with self.assertRaises(Exception):
+            pickle.dumps(sc)
+        copy = pickle.loads(capture(sc))
+        self.assertEqual(serialize(copy), serialize(sc))
+        # the listener stays behind, and the copy still routes commands
+        response = copy.spacecraft_computer.route_command({"device_id": "harvester", "command": "activate",
+                                                           "args": {}})
+        self.assertTrue(response.success)
+
+    def test_round_trip_in_order(self):
+        ships = [_make_spacecraft(f"sc-{i}") for i in range(7)]
+        fleet = Fleet()
+        for ship in ships:
+            fleet.add_spacecraft(ship)
+        fleet.tick(0.5)
+
+        documents = serialize_many(ships, workers=3)
+        self.assertEqual(documents, [json.dumps(serialize(ship)) for ship in ships])
+        restored = deserialize_many(documents, workers=3)
+        self.assertEqual([ship.ident for ship in restored], [ship.ident for ship in ships])
+        self.assertEqual(serialize(restored[4]), serialize(ships[4]))
+        for ship in restored:
+            response = ship.spacecraft_computer.route_command({"device_id": "harvester", "command": "activate",
+                                                               "args": {}})
+            self.assertTrue(response.success)
+
+    def test_background_snapshot_is_taken_at_call_time(self):
+        ships = [_make_spacecraft(f"sc-{i}") for i in range(4)]
+        with SnapshotPool(workers=2) as pool:
+            future = pool.snapshot_in_background(ships, fmt="binary")
+            ships[0].mass = 1234.0
+            restored = pool.deserialize_many(future.result(), fmt="binary")
+            self.assertEqual(restored[0].mass, 101)
+            self.assertEqual(pool.serialize_many([]), [])
+            with self.assertRaises(ValueError):
+                pool.serialize_many(ships, fmt="xml")
+
+    def test_restore_leaves_little_work_on_the_calling_thread(self):
+        # what deserialize_many still does serially is loading the captures the workers return
+        ships = [_make_spacecraft(f"sc-{i}") for i in range(200)]
+
+        def best_of(function) -> float:
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        for fmt, encode, decode in (("json", lambda ship: json.dumps(serialize(ship)), deserialize),
+                                    ("binary", snapshot.dumps, snapshot.loads)):
+            documents = [encode(ship) for ship in ships]
+            captured = _decode_shard(documents, fmt)
+            decoding = best_of(lambda: [decode(document) for document in documents])
+            loading = best_of(lambda: _load_capture(captured))
+            self.assertLess(loading, decoding / 3, fmt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import random
+import unittest
+
+from hikerservespacecraft.fleet.fleet import Fleet
+from hikerservespacecraft.payloads.energy_generation.subspace_harvester import SubspaceHarvester
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.payloads.propulsion.linear_thrust_profile import LinearThrustProfile
+from hikerservespacecraft.payloads.propulsion.simple_electric_thruster import SimpleElectricThruster
+from hikerservespacecraft.power_component import POWER_STORAGE
+from hikerservespacecraft.spacecraft import Spacecraft
+
+
+def _make_spacecraft(rng: random.Random, index: int) -> Spacecraft:
+    sc = Spacecraft(name=f"sc_{index}", ident=f"sc_{index}")
+    for b in range(2):
+        battery = CesiumSulphurBattery(name=f"battery_{b}", description="test", mass=1, volume=1)
+        battery.max_capacity_GJ = rng.uniform(5, 20)
+        battery.current_energy_level_GJ = rng.uniform(0, battery.max_capacity_GJ)
+        battery.max_charging_rate_A = rng.uniform(0.5, 3)
+        battery.max_discharging_rate_A = rng.uniform(0.5, 3)
+        sc.add_spacecraft_component(battery)
+
+    harvester = SubspaceHarvester(name="harvester", description="test", mass=1, volume=1)
+    harvester.maximum_power_output = rng.uniform(0, 5)
+    harvester.ramp_rate = 1.0
+    sc.add_spacecraft_component(harvester)
+
+    thruster = SimpleElectricThruster(name="thruster", description="test", mass=1, volume=1,
+                                      thrust_profile=LinearThrustProfile(min_power=0, max_power=10,
+                                                                         min_thrust=0, max_thrust=100))
+    sc.add_spacecraft_component(thruster)
+    thruster.activate()
+    thruster.set_thrust(rng.uniform(0, 100))
+    return sc
+
+
+class _SteppedHarvester(SubspaceHarvester):
+    """Overrides tick, so the fleet cannot vectorize its power bus."""
+
+    def tick(self, dt_s: float) -> dict:
+        return super().tick(dt_s)
+
+
+class TestPowerBusDispatch(unittest.TestCase):
+
+    def test_surplus_charges_storage_within_rate(self):
+        sc = _make_spacecraft(random.Random(1), 0)
+        sc.power_bus.components["thruster"].set_thrust(0.0)
+        for battery in sc.power_bus.get_components_by_power_type(POWER_STORAGE):
+            battery.current_energy_level_GJ = 0.0
+            battery.max_charging_rate_A = 0.25
+        sc.power_bus.components["harvester"].maximum_power_output = 4.0
+        sc.power_bus.components["harvester"].ramp_rate = 100.0
+
+        balance = sc.tick(1.0)
+        self.assertAlmostEqual(balance["storage_flow"], 0.5)
+        self.assertAlmostEqual(balance["curtailed"], 4.0 * 0.2 - 0.5)
+        self.assertEqual(balance["unserved"], 0.0)
+
+    def test_fleet_dispatch_matches_per_spacecraft_tick(self):
+        rng = random.Random(3)
+        scalar = [_make_spacecraft(rng, i) for i in range(50)]
+        rng = random.Random(3)
+        fleet = Fleet(initial_capacity=8)
+        for i in range(50):
+            fleet.add_spacecraft(_make_spacecraft(rng, i))
+
+        for _ in range(20):
+            balances = [sc.tick(0.5) for sc in scalar]
+            fleet.tick(0.5)
+
+        for i, sc in enumerate(scalar):
+            other = fleet.spacecraft[sc.ident]
+            for name in ("battery_0", "battery_1"):
+                self.assertAlmostEqual(sc.power_bus.components[name].current_energy_level_GJ,
+                                       other.power_bus.components[name].current_energy_level_GJ)
+            index = fleet._bus_index[sc.ident]
+            self.assertAlmostEqual(balances[i]["unserved"], fleet.last_power_balance["unserved"][index])
+            self.assertAlmostEqual(balances[i]["curtailed"], fleet.last_power_balance["curtailed"][index])
+
+    def test_fleet_without_vectorized_buses(self):
+        def make(rng: random.Random) -> Spacecraft:
+            sc = _make_spacecraft(rng, 0)
+            sc.remove_spacecraft_component("harvester")
+            harvester = _SteppedHarvester(name="harvester", description="test", mass=1, volume=1)
+            harvester.maximum_power_output = 4.0
+            harvester.ramp_rate = 1.0
+            sc.add_spacecraft_component(harvester)
+            return sc
+
+        scalar = make(random.Random(5))
+        fleet = Fleet()
+        fleet.add_spacecraft(make(random.Random(5)))
+        self.assertEqual(fleet._bus_index, {})
+
+        for _ in range(10):
+            balance = scalar.tick(0.5)
+            fleet.tick(0.5)
+
+        other = fleet.spacecraft[scalar.ident]
+        for name in ("battery_0", "battery_1"):
+            self.assertAlmostEqual(scalar.power_bus.components[name].current_energy_level_GJ,
+                                   other.power_bus.components[name].current_energy_level_GJ)
+        self.assertEqual(fleet.get_power_balance(scalar.ident), balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from hikerservespacecraft.fleet.fleet import Fleet
+from hikerservespacecraft.fleet.propagator import TranslationalPropagator
+from hikerservespacecraft.payloads.propulsion.linear_thrust_profile import LinearThrustProfile
+from hikerservespacecraft.payloads.propulsion.simple_electric_thruster import SimpleElectricThruster
+from hikerservespacecraft.spacecraft import Spacecraft
+
+
+def _make_spacecraft(index: int) -> Spacecraft:
+    sc = Spacecraft(name=f"sc_{index}", ident=f"sc_{index}")
+    for t, vector in enumerate([(1.0, 0.0, 0.0), (0.0, 0.6, 0.8)]):
+        thruster = SimpleElectricThruster(name=f"thruster_{t}", description="test", mass=50 + index, volume=1,
+                                          thrust_profile=LinearThrustProfile(min_power=0, max_power=10,
+                                                                             min_thrust=0, max_thrust=100))
+        thruster.thrust_vector = vector
+        sc.add_spacecraft_component(thruster)
+        thruster.activate()
+        thruster.set_thrust(float(10 * (index + t + 1)))
+    sc.velocity_m_s = np.array([0.0, 1.0, float(index)])
+    return sc
+
+
+class TestTranslationalPropagator(unittest.TestCase):
+
+    def test_fleet_matches_scalar_propagation(self):
+        scalar = [_make_spacecraft(i) for i in range(5)]
+        fleet = Fleet()
+        for i in range(5):
+            fleet.add_spacecraft(_make_spacecraft(i))
+
+        for _ in range(10):
+            for sc in scalar:
+                sc.tick(0.5)
+            fleet.tick(0.5)
+
+        for sc in scalar:
+            other = fleet.spacecraft[sc.ident]
+            np.testing.assert_allclose(other.position_m, sc.position_m)
+            np.testing.assert_allclose(other.velocity_m_s, sc.velocity_m_s)
+
+    def test_thrust_changes_are_seen_through_the_engine(self):
+        fleet = Fleet()
+        sc = _make_spacecraft(0)
+        fleet.add_spacecraft(sc)
+        for component in sc.get_propulsion_components():
+            component.deactivate()
+
+        fleet.tick(2.0)
+        np.testing.assert_allclose(sc.position_m, [0.0, 2.0, 0.0])
+
+    def test_advance_leaves_bound_spacecraft_to_the_fleet(self):
+        fleet = Fleet()
+        sc = _make_spacecraft(0)
+        fleet.add_spacecraft(sc)
+        sc.advance(2.0)
+        np.testing.assert_allclose(sc.position_m, [0.0, 0.0, 0.0])
+        np.testing.assert_allclose(sc.velocity_m_s, [0.0, 1.0, 0.0])
+
+    def test_acceleration_field_is_symplectic(self):
+        # unit harmonic oscillator: energy should stay bounded over many periods
+        propagator = TranslationalPropagator(acceleration_field=lambda positions: -positions)
+        sc = Spacecraft(name="probe")
+        sc.mass = 1.0
+        sc.position_m = np.array([1.0, 0.0, 0.0])
+        propagator.add_spacecraft(sc, group=0)
+
+        for _ in range(10000):
+            propagator.step(0.05, np.zeros((1, 3)))
+
+        energy = 0.5 * np.dot(sc.velocity_m_s, sc.velocity_m_s) + 0.5 * np.dot(sc.position_m, sc.position_m)
+        self.assertAlmostEqual(energy, 0.5, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import dataclasses
+import json
+import unittest
+
+from hikerservespacecraft.hull import Hull
+from hikerservespacecraft.payloads.power_storage.cesium_sulphur_battery import CesiumSulphurBattery
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.ser import DeserializationError, _plan_for, deserialize, iter_serialize, \
+    register_type, serialize, type_tag
+from tests import make_spacecraft
+
+
+@dataclasses.dataclass
+class _Record:
+    kept: int = 1
+    dropped: int = dataclasses.field(default=2, metadata={"serialize": False})
+
+
+class _Slotted:
+    __slots__ = ("a", "b")
+
+    def __init__(self):
+        self.a = 1
+        self.b = [2]
+
+
+@register_type
+class _Probe:
+
+    def __init__(self):
+        self.readings = (1, {2, 3}, [4.5])
+
+
+@register_type
+class _Node:
+
+    def __init__(self, link=None):
+        self.link = link
+
+
+def _operate(sc: Spacecraft) -> None:
+    computer = sc.spacecraft_computer
+    for device_id, command_, args in (("main_computer", "boot", {}), ("battery", "activate", {}),
+                                      ("harvester", "activate", {}), ("harvester", "set_target_output", [1e-5])):
+        response = computer.route_command({"device_id": device_id, "command": command_, "args": args})
+        if not response.success:
+            raise AssertionError(f"{device_id} {command_} failed: {response.message}")
+    for _ in range(10):
+        sc.tick(0.5)
+
+
+class TestSerializationPlans(unittest.TestCase):
+
+    def test_plan_is_built_once_per_class(self):
+        self.assertIs(_plan_for(_Record), _plan_for(_Record))
+        self.assertIn("dropped", _plan_for(_Record).excluded)
+
+    def test_dataclass_and_instance_exclusions(self):
+        record = _Record()
+        self.assertEqual(serialize(record), {"__type__": type_tag(_Record), "__id__": 0, "kept": 1})
+
+        record.__serialize_exclude__ = ("kept",)
+        self.assertEqual(serialize(record), {"__type__": type_tag(_Record), "__id__": 0})
+        self.assertEqual(serialize(_Record()), {"__type__": type_tag(_Record), "__id__": 0, "kept": 1})
+
+    def test_slots(self):
+        self.assertEqual(serialize(_Slotted()), {"__type__": type_tag(_Slotted), "__id__": 0, "a": 1, "b": [2]})
+
+    def test_spacecraft_round_trip(self):
+        sc = make_spacecraft()
+        sc.spacecraft_computer.route_command({"device_id": "main_computer", "command": "boot", "args": {}})
+        sc.tick(1.0)
+
+        data = serialize(sc)
+        self.assertNotIn("_registry", data)
+        restored = deserialize(json.dumps(data))
+        self.assertIsInstance(restored, Spacecraft)
+        self.assertEqual(serialize(restored), data)
+        self.assertEqual(restored.get_component("battery").name, "battery")
+
+        self.assertEqual(data["__type__"], "hikerservespacecraft.spacecraft.Spacecraft")
+
+
+class TestSharedReferences(unittest.TestCase):
+
+    def test_shared_objects_are_serialized_once(self):
+        sc = make_spacecraft()
+        data = serialize(sc)
+        battery_id = data["spacecraft_components"][0]["__id__"]
+        self.assertEqual(data["power_bus"]["components"]["battery"], {"__ref__": battery_id})
+        self.assertEqual(data["spacecraft_computer"]["power_bus"], {"__ref__": data["power_bus"]["__id__"]})
+        self.assertNotIn("__recursion__", json.dumps(data))
+
+        restored = deserialize(json.dumps(data))
+        self.assertIs(restored.spacecraft_computer.power_bus, restored.power_bus)
+        self.assertIs(restored.power_bus.components["battery"], restored.spacecraft_components[0])
+
+        # the restored ship runs exactly like the original
+        _operate(sc)
+        _operate(restored)
+        self.assertGreater(restored.get_component("harvester").current_power_output, 0)
+        self.assertEqual(serialize(restored), serialize(sc))
+
+    def test_cycles_round_trip(self):
+        first = _Node()
+        first.link = _Node([first])
+        data = serialize(first)
+        self.assertEqual(data["link"]["link"], [{"__ref__": 0}])
+
+        restored = deserialize(json.dumps(data))
+        self.assertIs(restored.link.link[0], restored)
+
+    def test_unknown_reference_is_rejected(self):
+        with self.assertRaises(DeserializationError):
+            deserialize({"__type__": type_tag(_Node), "link": {"__ref__": 7}})
+
+    def test_documents_with_recursion_placeholders_still_load(self):
+        placeholder = {"__recursion__": True, "__type__": "hikerservespacecraft.spacecraft.Spacecraft",
+                       "__repr__": "<Spacecraft>"}
+        restored = deserialize({"__type__": type_tag(_Node), "link": placeholder})
+        self.assertIsInstance(restored, _Node)
+        self.assertIsNone(restored.link)
+        self.assertEqual(deserialize(json.dumps(serialize([[[1]]], _max_depth=1))), [[None]])
+
+    def test_shared_containers_are_serialized_once(self):
+        material = {"name": "titanium", "density": 4.5}
+        hulls = [Hull(material, 1, f"hull_{i}", [10, 10, 10]) for i in range(2)]
+        nested = []
+        nested.append(nested)
+
+        data = serialize([hulls, nested])
+        self.assertEqual(data[0][0]["material"], {"__type__": "dict", "__id__": 1, "items": material})
+        self.assertEqual(data[0][1]["material"], {"__ref__": 1})
+        self.assertEqual("".join(iter_serialize([hulls, nested])), json.dumps(data))
+
+        restored_hulls, restored_nested = deserialize(json.dumps(data))
+        self.assertIs(restored_hulls[0].material, restored_hulls[1].material)
+        self.assertEqual(restored_hulls[0].material, material)
+        self.assertIs(restored_nested[0], restored_nested)
+        # unshared containers are written as before
+        self.assertEqual(serialize({"a": [1]}), {"a": [1]})
+
+
+class TestTypeRegistry(unittest.TestCase):
+
+    def test_registered_class_round_trips(self):
+        restored = deserialize(json.dumps(serialize(_Probe())))
+        self.assertIsInstance(restored, _Probe)
+        self.assertEqual(restored.readings, (1, {2, 3}, [4.5]))
+
+    def test_unregistered_class_is_rejected(self):
+        class Unknown:
+            pass
+
+        with self.assertRaises(DeserializationError):
+            deserialize(serialize(Unknown()))
+
+    def test_bare_class_names_from_older_documents(self):
+        restored = deserialize({"__type__": "CesiumSulphurBattery", "name": "battery"})
+        self.assertIsInstance(restored, CesiumSulphurBattery)
+        self.assertEqual(restored.name, "battery")
+
+    def test_deep_nesting_does_not_recurse(self):
+        data = []
+        for _ in range(5000):
+            data = [data]
+        restored = deserialize(data)
+        for _ in range(5000):
+            restored = restored[0]
+        self.assertEqual(restored, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
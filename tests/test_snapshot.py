@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hikerservespacecraft.hull import Hull
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.utils.ser import DeserializationError, deserialize, serialize
+from hikerservespacecraft.utils.snapshot import ARRAY_ALIGNMENT, MAGIC_V1, dumps, load_snapshot, loads, save_snapshot
+from tests import make_spacecraft
+
+
+def _make_spacecraft() -> Spacecraft:
+    sc = make_spacecraft(boot=True)
+    sc.tick(1.0)
+    return sc
+
+
+class TestBinarySnapshot(unittest.TestCase):
+
+    def test_matches_json_document(self):
+        sc = _make_spacecraft()
+        restored = loads(dumps(sc))
+        self.assertIsInstance(restored, Spacecraft)
+        self.assertEqual(serialize(restored), serialize(sc))
+        self.assertEqual(serialize(deserialize(dumps(sc), fmt="binary")), serialize(sc))
+        self.assertIs(restored.spacecraft_computer.power_bus, restored.power_bus)
+        self.assertIs(restored.power_bus.components["battery"], restored.spacecraft_components[0])
+
+        # the restored ship takes commands and ticks like the original
+        for ship in (sc, restored):
+            computer = ship.spacecraft_computer
+            for device_id in ("battery", "harvester"):
+                self.assertTrue(computer.route_command({"device_id": device_id, "command": "activate",
+                                                        "args": {}}).success)
+            for _ in range(10):
+                ship.tick(0.5)
+        self.assertGreater(restored.get_component("harvester").current_power_output, 0)
+        self.assertEqual(serialize(restored), serialize(sc))
+
+    def test_values(self):
+        value = {"n": None, "b": [True, False], "i": -3, "big": 2 ** 80, "f": 1.5, "s": "é",
+                 "t": (1, (2,)), "set": {1, 2}, "fs": frozenset({"a"}), "np": np.float32(2.5)}
+        self.assertEqual(loads(dumps(value)), {**value, "np": 2.5})
+
+        # a placeholder for what was nested too deeply loads as None, as with JSON documents
+        self.assertEqual(loads(dumps([[[1]]], _max_depth=1)), [[None]])
+
+    def test_shared_containers_are_written_once(self):
+        material = {"name": "titanium", "density": 4.5}
+        hulls = [Hull(material, 1, f"hull_{i}", [10, 10, 10]) for i in range(2)]
+        nested = []
+        nested.append(nested)
+
+        restored_hulls, restored_nested = loads(dumps([hulls, nested]))
+        self.assertIs(restored_hulls[0].material, restored_hulls[1].material)
+        self.assertEqual(restored_hulls[0].material, material)
+        self.assertIs(restored_nested[0], restored_nested)
+        self.assertLess(len(dumps(hulls)), len(dumps([Hull(dict(material), 1, f"hull_{i}", [10, 10, 10])
+                                                      for i in range(2)])))
+
+    def test_reads_version_1_snapshots(self):
+        hull = Hull({"name": "titanium", "density": 4.5}, 1, "hull", [10, 10, 10])
+        data = dumps([hull, hull])
+        # the trailing reference is to the hull, number 1 after the outer list; version 1
+        # numbered objects only, so there it is number 0
+        self.assertTrue(data.endswith(b"r\x01\x00\x00\x00"))
+        version_1 = MAGIC_V1 + data[len(MAGIC_V1):-4] + b"\x00\x00\x00\x00"
+        first, second = loads(version_1)
+        self.assertIs(first, second)
+        self.assertEqual(first.material, hull.material)
+
+    def test_arrays_are_raw_aligned_views(self):
+        sc = _make_spacecraft()
+        battery = sc.power_bus.components["battery"]
+        battery.image = np.arange(12, dtype=np.float32).reshape(3, 4)
+        battery.mask = np.zeros((0, 2), dtype=np.int16)
+        battery.labels = np.array(["a", None], dtype=object)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sc.snapshot")
+            save_snapshot(sc, path)
+
+            for mmap in (False, True):
+                restored = load_snapshot(path, mmap=mmap).power_bus.components["battery"]
+                np.testing.assert_array_equal(restored.image, battery.image)
+                self.assertEqual(restored.image.dtype, np.float32)
+                self.assertEqual(restored.mask.shape, (0, 2))
+                self.assertEqual(restored.labels.tolist(), ["a", None])
+                # a view of the loaded buffer, not a copy
+                self.assertFalse(restored.image.flags.owndata)
+                self.assertEqual(restored.image.flags.writeable, not mmap)
+                if not mmap:
+                    self.assertEqual(restored.image.ctypes.data % ARRAY_ALIGNMENT, 0)
+                del restored
+
+    def test_rejects_other_data(self):
+        with self.assertRaises(DeserializationError):
+            loads(b"not a snapshot")
+        with self.assertRaises(DeserializationError):
+            loads(dumps(_make_spacecraft())[:-20])
+
+
+if __name__ == '__main__':
+    unittest.main()
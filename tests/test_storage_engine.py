@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from hikerservespacecraft.fleet.storage_engine import StorageEngine
+from hikerservespacecraft.payloads.power_storage.energy_storage_component import EnergyStorageComponent
+
+
+def _make_battery(rng: random.Random, index: int) -> EnergyStorageComponent:
+    battery = EnergyStorageComponent(name=f"battery_{index}", description="test", mass=1, volume=1)
+    battery.max_capacity_GJ = rng.uniform(10, 100)
+    battery.current_energy_level_GJ = rng.uniform(0, battery.max_capacity_GJ)
+    battery.current_power_flow_A = rng.uniform(-5, 5)
+    return battery
+
+
+class TestStorageEngine(unittest.TestCase):
+
+    def test_step_matches_scalar_tick(self):
+        rng = random.Random(11)
+        scalar = [_make_battery(rng, i) for i in range(100)]
+        rng = random.Random(11)
+        bound = [_make_battery(rng, i) for i in range(100)]
+
+        engine = StorageEngine(initial_capacity=8)
+        for battery in bound:
+            engine.add(battery)
+
+        for _ in range(30):
+            for battery in scalar:
+                battery.tick(1.0)
+            engine.step(1.0)
+
+        for a, b in zip(scalar, bound):
+            self.assertAlmostEqual(a.current_energy_level_GJ, b.current_energy_level_GJ)
+            self.assertAlmostEqual(a.get_current_capacity().return_data["current_level_GJ"],
+                                   b.get_current_capacity().return_data["current_level_GJ"])
+
+    def test_clamps_to_capacity(self):
+        battery = EnergyStorageComponent(name="battery", description="test", mass=1, volume=1)
+        battery.max_capacity_GJ = 10.0
+        battery.current_power_flow_A = 4.0
+        engine = StorageEngine()
+        engine.add(battery)
+
+        engine.step(2.0)
+        self.assertEqual(battery.current_energy_level_GJ, 8.0)
+        engine.step(2.0)
+        self.assertEqual(battery.current_energy_level_GJ, 10.0)
+
+        battery.current_power_flow_A = -100.0
+        engine.step(1.0)
+        self.assertEqual(battery.current_energy_level_GJ, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
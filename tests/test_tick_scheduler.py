@@ -0,0 +1,118 @@
+import unittest
+
+import numpy as np
+
+from hikerservespacecraft.payloads.propulsion.linear_thrust_profile import LinearThrustProfile
+from hikerservespacecraft.payloads.propulsion.simple_electric_thruster import SimpleElectricThruster
+from hikerservespacecraft.spacecraft import Spacecraft
+from hikerservespacecraft.tick_scheduler import POWER_BUS_ENTRY, TickScheduler
+from hikerservespacecraft.utils.ser import deserialize, serialize
+from tests import make_spacecraft
+
+
+def _make_spacecraft() -> Spacecraft:
+    sc = make_spacecraft()
+    battery = sc.get_component("battery")
+    battery.max_capacity_GJ = 10.0
+    battery.max_charging_rate_A = 1.0
+    battery.max_discharging_rate_A = 1.0
+    harvester = sc.get_component("harvester")
+    harvester.maximum_power_output = 2.0
+    harvester.efficiency = 1.0
+    harvester.ramp_rate = 0.5
+    return sc
+
+
+class TestTickScheduler(unittest.TestCase):
+
+    def test_matches_plain_ticking_and_sleeps_when_steady(self):
+        reference = _make_spacecraft()
+        scheduled = _make_spacecraft()
+        scheduler = TickScheduler(scheduled)
+
+        for _ in range(200):
+            reference.tick(0.1)
+            scheduler.tick(0.1)
+
+        for name in ("battery", "harvester"):
+            for attr in ("current_energy_level_GJ", "current_power_output"):
+                if hasattr(reference.power_bus.components[name], attr):
+                    self.assertAlmostEqual(getattr(reference.power_bus.components[name], attr),
+                                           getattr(scheduled.power_bus.components[name], attr))
+
+        # harvester reached its target and the battery filled up, so the bus went to sleep
+        self.assertTrue(scheduler._entries[POWER_BUS_ENTRY].sleeping)
+        self.assertLess(scheduler.tick_calls, 200)
+
+    def test_propagates_like_plain_ticking(self):
+        def make() -> Spacecraft:
+            sc = _make_spacecraft()
+            thruster = SimpleElectricThruster(name="thruster", description="test", mass=50, volume=1,
+                                              thrust_profile=LinearThrustProfile(min_power=0, max_power=1,
+                                                                                 min_thrust=0, max_thrust=100))
+            sc.add_spacecraft_component(thruster)
+            thruster.activate()
+            thruster.set_thrust(20.0)
+            sc.velocity_m_s = np.array([0.0, 1.0, 0.0])
+            return sc
+
+        reference = make()
+        scheduled = make()
+        scheduler = TickScheduler(scheduled)
+        for _ in range(50):
+            reference.tick(0.1)
+            scheduler.tick(0.1)
+
+        self.assertGreater(np.linalg.norm(reference.position_m), 5.0)
+        np.testing.assert_allclose(scheduled.position_m, reference.position_m)
+        np.testing.assert_allclose(scheduled.velocity_m_s, reference.velocity_m_s)
+
+    def test_command_wakes_power_bus(self):
+        sc = _make_spacecraft()
+        scheduler = TickScheduler(sc)
+        for _ in range(200):
+            scheduler.tick(0.1)
+        self.assertTrue(scheduler._entries[POWER_BUS_ENTRY].sleeping)
+
+        sc.spacecraft_computer.route_command({"device_id": "main_computer", "command": "boot", "args": {}})
+        sc.spacecraft_computer.route_command({"device_id": "harvester", "command": "activate", "args": {}})
+        for _ in range(20):
+            scheduler.tick(0.1)
+        self.assertTrue(scheduler._entries[POWER_BUS_ENTRY].sleeping)
+
+        sc.spacecraft_computer.route_command({"device_id": "harvester", "command": "set_target_output",
+                                              "args": {"target_power": 1.0}})
+        self.assertFalse(scheduler._entries[POWER_BUS_ENTRY].sleeping)
+
+        calls = scheduler.tick_calls
+        scheduler.tick(0.1)
+        self.assertEqual(scheduler.tick_calls, calls + 1)
+
+    def test_deserialized_spacecraft_routes_commands(self):
+        sc = deserialize(serialize(_make_spacecraft()))
+        computer = sc.spacecraft_computer
+        self.assertTrue(computer.route_command({"device_id": "main_computer", "command": "boot", "args": {}}).success)
+        self.assertTrue(computer.route_command({"device_id": "harvester", "command": "activate", "args": {}}).success)
+
+        scheduler = TickScheduler(sc)
+        for _ in range(200):
+            scheduler.tick(0.1)
+        computer.route_command({"device_id": "harvester", "command": "set_target_output",
+                                "args": {"target_power": 1.0}})
+        self.assertFalse(scheduler._entries[POWER_BUS_ENTRY].sleeping)
+
+    def test_watch_predicate_wakes_entry(self):
+        sc = _make_spacecraft()
+        scheduler = TickScheduler(sc)
+        for _ in range(200):
+            scheduler.tick(0.1)
+
+        battery = sc.power_bus.components["battery"]
+        scheduler.watch(lambda: battery.current_energy_level_GJ < 5.0, wake=[POWER_BUS_ENTRY])
+        battery.current_energy_level_GJ = 1.0
+        scheduler.tick(0.1)
+        self.assertGreater(battery.current_energy_level_GJ, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()